@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Délais d'attente appris à partir des durées observées
+Chaque attente nommée (ouverture du formulaire, sauvegarde, rechargement de la
+liste...) mémorise ses durées réussies dans logs/wait_latencies.json. Son délai
+devient le percentile haut de l'historique multiplié par une marge, borné par
+TIMEOUT_MIN et TIMEOUT_MAX: une étape rapide échoue en quelques secondes au lieu
+de TIMEOUT. Une attente dépassée passe au délai maximal pour le reste de
+l'exécution, pour qu'une journée lente soit tolérée à la reprise de l'étape. Une
+attente facultative (confirmation, spinner) dont le dépassement est ignoré compte son
+délai comme une mesure, sans escalade, et son délai appris ne dépasse pas TIMEOUT
+"""
+
+import os
+import json
+import time
+import logging
+from pathlib import Path
+from dotenv import load_dotenv
+
+from log_analytics import percentile
+
+
+class AdaptiveTimeouts:
+    """Historique des durées par attente et délai appris correspondant"""
+
+    def __init__(self, default_timeout, history_file=None):
+        """Initialisation à partir du fichier .env"""
+        load_dotenv()
+
+        self.logger = logging.getLogger(__name__)
+        self.default_timeout = default_timeout
+        self.enabled = os.getenv('TIMEOUT_ADAPTIVE', 'true').lower() == 'true'
+        self.percentile = float(os.getenv('TIMEOUT_PERCENTILE', '95'))
+        self.margin = float(os.getenv('TIMEOUT_MARGIN', '1.5'))
+        self.min_timeout = float(os.getenv('TIMEOUT_MIN', '5'))
+        self.max_timeout = float(os.getenv('TIMEOUT_MAX', str(default_timeout * 2)))
+        self.min_samples = int(os.getenv('TIMEOUT_MIN_SAMPLES', '5'))
+        self.history_size = int(os.getenv('TIMEOUT_HISTORY', '50'))
+        self.history_file = Path(history_file or Path('logs') / 'wait_latencies.json')
+        self.samples = self.load() if self.enabled else {}
+        # Attentes dépassées pendant cette exécution: délai maximal jusqu'à la fin
+        self.escalated = set()
+        self.changed = False
+
+    def load(self):
+        try:
+            with open(self.history_file, 'r', encoding='utf-8') as f:
+                samples = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return samples if isinstance(samples, dict) else {}
+
+    def save(self):
+        """Persister les durées de l'exécution (écriture atomique)"""
+        if not self.changed:
+            return
+        try:
+            self.history_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp_file = self.history_file.with_suffix('.tmp')
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(self.samples, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_file, self.history_file)
+            self.changed = False
+        except OSError as e:
+            self.logger.warning("Durées des attentes non enregistrées: %s", str(e))
+
+    def timeout(self, key, tolerated=False):
+        """Délai de l'attente: appris si l'historique est suffisant, sinon TIMEOUT"""
+        if not self.enabled:
+            return self.default_timeout
+        if key in self.escalated:
+            return self.max_timeout
+        history = self.samples.get(key, [])
+        if len(history) < self.min_samples:
+            return self.default_timeout
+        learned = percentile(history, self.percentile) * self.margin
+        # Attente facultative: ses dépassements sont mesurés, la marge ne doit pas les faire croître
+        upper = min(self.default_timeout, self.max_timeout) if tolerated else self.max_timeout
+        return min(upper, max(self.min_timeout, learned))
+
+    def record(self, key, seconds):
+        """Mémoriser la durée d'une attente réussie (historique borné)"""
+        history = self.samples.setdefault(key, [])
+        history.append(round(seconds, 2))
+        del history[:-self.history_size]
+        self.changed = True
+
+    def until(self, key, wait, tolerated=False):
+        """Exécuter wait(délai) avec le délai de l'attente key et mémoriser sa durée
+
+        tolerated: l'appelant ignore le dépassement; le délai écoulé est alors mémorisé
+        comme une mesure au lieu de porter l'attente au délai maximal.
+        """
+        timeout = self.timeout(key, tolerated)
+        started = time.monotonic()
+        try:
+            result = wait(timeout)
+        except Exception:
+            # Délai écoulé (et non élément périmé ou page fermée): Selenium et Playwright lèvent des types distincts
+            elapsed = time.monotonic() - started
+            if self.enabled and elapsed >= timeout and tolerated:
+                self.record(key, timeout)
+            elif self.enabled and elapsed >= timeout and key not in self.escalated and timeout < self.max_timeout:
+                self.escalated.add(key)
+                self.logger.warning("Attente '%s' dépassée après %.1f s, délai porté à %.0f s "
+                                    "pour la suite de l'exécution", key, elapsed, self.max_timeout)
+            raise
+        if self.enabled:
+            self.record(key, time.monotonic() - started)
+        return result
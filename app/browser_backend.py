@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Moteurs d'automatisation du navigateur pour Satelix
+Interface commune (navigation, recherche, saisie, clic, attente, capture)
+avec une implémentation Selenium et une implémentation Playwright connectée
+en CDP au Chrome lancé par chromedriver
+
+Sélecteurs: CSS par défaut, XPath avec le préfixe 'xpath=' (syntaxe Playwright)
+Scripts: corps de fonction au format Selenium ('return ...', arguments[0])
+Portée: connexion, navigation et captures d'écran; la table des inventaires,
+les modales et les formulaires restent pilotés directement par Selenium
+"""
+
+import logging
+from abc import ABC, abstractmethod
+from functools import reduce
+
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+
+try:
+    from playwright.sync_api import sync_playwright
+except ImportError:
+    sync_playwright = None
+
+
+BACKENDS = ('selenium', 'playwright')
+
+
+class BrowserBackend(ABC):
+    """Interface commune des moteurs d'automatisation (un moteur incomplet n'est pas instanciable)"""
+
+    name = None
+
+    @abstractmethod
+    def navigate(self, url):
+        """Charger une URL"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def query(self, selector):
+        """True si au moins un élément correspond au sélecteur"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def fill(self, selector, value):
+        """Remplacer la valeur d'un champ"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def click(self, selector):
+        """Cliquer sur le premier élément correspondant"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def wait_for_any(self, selectors, timeout=None):
+        """Attendre qu'un des sélecteurs soit présent; retourne le premier trouvé"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def screenshot(self, path):
+        """Enregistrer une capture d'écran de la page"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def evaluate(self, script, *args):
+        """Exécuter un script dans la page et retourner son résultat (valeurs JSON uniquement)"""
+        raise NotImplementedError
+
+    @property
+    @abstractmethod
+    def current_url(self):
+        raise NotImplementedError
+
+    @abstractmethod
+    def cookies(self):
+        """Cookies de la session courante (nom -> valeur)"""
+        raise NotImplementedError
+
+    def close(self):
+        """Libérer les ressources du moteur (le navigateur reste géré par le driver)"""
+
+
+class SeleniumBackend(BrowserBackend):
+    """Moteur Selenium: une requête WebDriver par commande"""
+
+    name = 'selenium'
+
+    def __init__(self, driver, timeout=30):
+        self.driver = driver
+        self.timeout = timeout
+
+    @staticmethod
+    def locator(selector):
+        """Convertir un sélecteur en localisateur Selenium"""
+        if selector.startswith('xpath='):
+            return By.XPATH, selector[len('xpath='):]
+        return By.CSS_SELECTOR, selector
+
+    def navigate(self, url):
+        self.driver.get(url)
+
+    def query(self, selector):
+        return bool(self.driver.find_elements(*self.locator(selector)))
+
+    def fill(self, selector, value):
+        element = WebDriverWait(self.driver, self.timeout).until(
+            EC.presence_of_element_located(self.locator(selector)))
+        element.clear()
+        element.send_keys(value)
+
+    def click(self, selector):
+        WebDriverWait(self.driver, self.timeout).until(
+            EC.element_to_be_clickable(self.locator(selector))).click()
+
+    def wait_for_any(self, selectors, timeout=None):
+        def first_present(driver):
+            for selector in selectors:
+                if driver.find_elements(*self.locator(selector)):
+                    return selector
+            return False
+
+        return WebDriverWait(self.driver, timeout or self.timeout).until(first_present)
+
+    def screenshot(self, path):
+        self.driver.save_screenshot(str(path))
+
+    def evaluate(self, script, *args):
+        return self.driver.execute_script(script, *args)
+
+    @property
+    def current_url(self):
+        return self.driver.current_url
+
+    def cookies(self):
+        return {cookie['name']: cookie.get('value') for cookie in self.driver.get_cookies()}
+
+
+class PlaywrightBackend(BrowserBackend):
+    """Moteur Playwright attaché en CDP à l'onglet piloté par Selenium (attente automatique)"""
+
+    name = 'playwright'
+
+    def __init__(self, driver, timeout=30):
+        if sync_playwright is None:
+            raise RuntimeError("Module playwright non installé (pip install playwright)")
+
+        address = driver.capabilities.get('goog:chromeOptions', {}).get('debuggerAddress')
+        if not address:
+            raise RuntimeError("Adresse de débogage Chrome indisponible")
+
+        self.timeout = timeout
+        self._playwright = sync_playwright().start()
+        try:
+            self.browser = self._playwright.chromium.connect_over_cdp(f"http://{address}")
+            self.page = self._find_page(driver.current_url)
+        except Exception:
+            self._playwright.stop()
+            raise
+        self.page.set_default_timeout(timeout * 1000)
+
+    def _find_page(self, url):
+        """Onglet correspondant à la fenêtre courante de Selenium"""
+        pages = [page for context in self.browser.contexts for page in context.pages]
+        if not pages:
+            raise RuntimeError("Aucun onglet Chrome accessible en CDP")
+        for page in pages:
+            if page.url == url:
+                return page
+        return pages[0]
+
+    def _locator(self, selector):
+        return self.page.locator(selector).first
+
+    def navigate(self, url):
+        self.page.goto(url, wait_until='domcontentloaded')
+
+    def query(self, selector):
+        return self.page.locator(selector).count() > 0
+
+    def fill(self, selector, value):
+        self._locator(selector).fill(value)
+
+    def click(self, selector):
+        self._locator(selector).click()
+
+    def wait_for_any(self, selectors, timeout=None):
+        combined = reduce(lambda left, right: left.or_(right),
+                          (self.page.locator(selector) for selector in selectors))
+        combined.first.wait_for(state='attached', timeout=(timeout or self.timeout) * 1000)
+        for selector in selectors:
+            if self.query(selector):
+                return selector
+        return selectors[0]
+
+    def screenshot(self, path):
+        self.page.screenshot(path=str(path))
+
+    def evaluate(self, script, *args):
+        return self.page.evaluate(f"(arguments) => {{ {script} }}", list(args))
+
+    @property
+    def current_url(self):
+        return self.page.url
+
+    def cookies(self):
+        return {cookie['name']: cookie.get('value') for cookie in self.page.context.cookies()}
+
+    def close(self):
+        # Détacher seulement: Chrome appartient à chromedriver et sera fermé par driver.quit()
+        try:
+            self._playwright.stop()
+        except Exception:
+            pass
+
+
+def create_backend(name, driver, timeout=30):
+    """Instancier le moteur demandé, avec repli sur Selenium s'il est indisponible"""
+    logger = logging.getLogger(__name__)
+    if name == 'playwright':
+        try:
+            backend = PlaywrightBackend(driver, timeout)
+            logger.info("Moteur d'automatisation: Playwright (CDP)")
+            return backend
+        except Exception as e:
+            logger.warning("Moteur Playwright indisponible (%s), utilisation de Selenium", str(e))
+    elif name not in BACKENDS:
+        logger.warning("Moteur d'automatisation inconnu: %s, utilisation de Selenium", name)
+    return SeleniumBackend(driver, timeout)
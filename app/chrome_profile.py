@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Profil Chrome persistant par environnement Satelix (serveur + utilisateur)
+Le cache HTTP (CSS, bundles JS, polices) est conservé d'une exécution à l'autre:
+le premier chargement de Satelix après le démarrage vient du disque. Le profil est
+protégé par un verrou (une exécution concurrente repasse sur un profil temporaire),
+son cache est borné et il est recréé périodiquement. Les cookies sont supprimés à
+chaque prise du profil pour que la connexion reste identique à celle d'un profil neuf
+"""
+
+import os
+import re
+import json
+import shutil
+import logging
+from datetime import datetime, timedelta
+from pathlib import Path
+from urllib.parse import urlparse
+
+from locks import FileLock
+
+
+METADATA_FILE = 'satelix_profile.json'
+
+# Fichiers de verrouillage laissés par un Chrome arrêté brutalement (profil "déjà utilisé")
+SINGLETON_FILES = ('SingletonLock', 'SingletonSocket', 'SingletonCookie', 'lockfile')
+
+# Cookies et état de session: supprimés à chaque prise du profil
+SESSION_FILES = ('Default/Cookies', 'Default/Cookies-journal', 'Default/Network/Cookies',
+                 'Default/Network/Cookies-journal', 'Default/Sessions', 'Default/Session Storage')
+
+# Caches purgés quand le budget est dépassé
+CACHE_DIRS = ('Default/Cache', 'Default/Code Cache', 'Default/GPUCache', 'GrShaderCache', 'ShaderCache')
+
+
+def tenant_name(url, user):
+    """Nom de dossier identifiant l'environnement: serveur, port et utilisateur"""
+    host = urlparse(url or '').netloc or 'satelix'
+    return re.sub(r'[^A-Za-z0-9]+', '_', f"{host}_{user or ''}").strip('_').lower()
+
+
+def directory_size(path):
+    """Taille cumulée des fichiers d'un dossier (octets)"""
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+
+class PersistentProfile:
+    """Dossier de profil Chrome réutilisé entre les exécutions, avec verrou et entretien"""
+
+    def __init__(self, base_dir, tenant, max_cache_mb=200, reset_days=7):
+        self.base_dir = Path(base_dir)
+        self.tenant = tenant
+        self.path = self.base_dir / tenant
+        self.metadata_file = self.path / METADATA_FILE
+        self.max_cache_bytes = int(max_cache_mb * 1024 * 1024)
+        self.reset_days = reset_days
+        self.lock = FileLock(self.base_dir / f"{tenant}.lock")
+        self.prepared = False
+        self.logger = logging.getLogger(__name__)
+
+    def load_metadata(self):
+        try:
+            with open(self.metadata_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def save_metadata(self, metadata):
+        tmp_file = self.metadata_file.with_suffix('.tmp')
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(metadata, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_file, self.metadata_file)
+
+    def acquire(self):
+        """Chemin du profil verrouillé pour cette exécution; None s'il est utilisé par une autre"""
+        if not self.lock.acquire():
+            owner = self.lock.owner() or {}
+            self.logger.warning("Profil Chrome persistant utilisé par le processus %s, profil temporaire utilisé",
+                                owner.get('pid'))
+            return None
+        if not self.prepared:
+            self._prepare()
+            self.prepared = True
+        return str(self.path.resolve())
+
+    def _prepare(self):
+        """Entretien avant le lancement de Chrome: réinitialisation périodique, budget du cache, session"""
+        metadata = self.load_metadata()
+        created = metadata.get('created_at')
+        expired = created and self.reset_days and \
+            datetime.now() - datetime.fromisoformat(created) > timedelta(days=self.reset_days)
+        if expired or (self.path.exists() and not metadata):
+            shutil.rmtree(self.path, ignore_errors=True)
+            self.logger.info("Profil Chrome persistant réinitialisé (%s)",
+                             f"plus de {self.reset_days} jours" if expired else "métadonnées absentes")
+            metadata = {}
+
+        self.path.mkdir(parents=True, exist_ok=True)
+        if not metadata:
+            metadata = {'created_at': datetime.now().isoformat(timespec='seconds'), 'runs': 0}
+            self.save_metadata(metadata)
+
+        for name in SINGLETON_FILES + SESSION_FILES:
+            target = self.path / name
+            if target.is_dir() and not target.is_symlink():
+                shutil.rmtree(target, ignore_errors=True)
+            elif target.exists() or target.is_symlink():
+                try:
+                    target.unlink()
+                except OSError:
+                    pass
+
+        cache_bytes = sum(directory_size(self.path / name) for name in CACHE_DIRS)
+        if cache_bytes > self.max_cache_bytes:
+            for name in CACHE_DIRS:
+                shutil.rmtree(self.path / name, ignore_errors=True)
+            self.logger.info("Cache du profil Chrome purgé (%.0f Mo > %.0f Mo)",
+                             cache_bytes / (1024 * 1024), self.max_cache_bytes / (1024 * 1024))
+        else:
+            self.logger.info("Profil Chrome persistant: %s (cache %.0f Mo, %d exécution(s))",
+                             self.path, cache_bytes / (1024 * 1024), metadata.get('runs', 0))
+
+    def cache_arguments(self):
+        """Arguments Chrome bornant le cache disque au budget du profil"""
+        return [f'--disk-cache-size={self.max_cache_bytes}']
+
+    def release(self):
+        """Comptabiliser l'exécution et libérer le verrou"""
+        if not self.lock.acquired:
+            return
+        try:
+            metadata = self.load_metadata()
+            if metadata:
+                metadata['runs'] = metadata.get('runs', 0) + 1
+                metadata['last_used'] = datetime.now().isoformat(timespec='seconds')
+                self.save_metadata(metadata)
+        except OSError as e:
+            self.logger.warning("Métadonnées du profil Chrome non enregistrées: %s", str(e))
+        self.prepared = False
+        self.lock.release()
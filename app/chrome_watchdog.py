@@ -0,0 +1,332 @@
+#!/usr/bin/env python3
+"""
+Surveillance des processus Chrome / chromedriver pendant une exécution Satelix
+Limites de durée par exécution et par étape (arrêt de l'arbre de processus en
+cas de dépassement), nettoyage des processus et profils orphelins au démarrage
+et suivi du pic de mémoire (RSS) du navigateur
+"""
+
+import os
+import json
+import time
+import shutil
+import signal
+import logging
+import tempfile
+import threading
+import subprocess
+from contextlib import contextmanager
+from pathlib import Path
+
+from locks import pid_alive
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+
+# Profil temporaire: satelix_chrome_<pid du processus Python>_<suffixe>, inscrit au registre
+PROFILE_PREFIX = 'satelix_chrome_'
+BROWSER_NAMES = ('chrome', 'chromium', 'chromedriver')
+
+
+def process_tree(pid):
+    """PID du processus et de tous ses descendants (vide si le processus n'existe plus)"""
+    if psutil:
+        try:
+            parent = psutil.Process(pid)
+            return [pid] + [child.pid for child in parent.children(recursive=True)]
+        except psutil.Error:
+            return []
+
+    if not Path('/proc').is_dir():
+        return [pid] if pid_alive(pid) else []
+
+    children = {}
+    for stat_file in Path('/proc').glob('[0-9]*/stat'):
+        try:
+            # Le nom du processus peut contenir des espaces: lire après la dernière parenthèse
+            fields = stat_file.read_text().rsplit(')', 1)[1].split()
+            children.setdefault(int(fields[1]), []).append(int(stat_file.parent.name))
+        except (OSError, IndexError, ValueError):
+            continue
+
+    if not pid_alive(pid):
+        return []
+    tree, pending = [], [pid]
+    while pending:
+        current = pending.pop()
+        tree.append(current)
+        pending.extend(children.get(current, []))
+    return tree
+
+
+def process_rss(pid):
+    """Mémoire résidente d'un processus en octets (None si indisponible)"""
+    if psutil:
+        try:
+            return psutil.Process(pid).memory_info().rss
+        except psutil.Error:
+            return None
+    try:
+        with open(f'/proc/{pid}/status', 'r') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+def process_cmdline(pid):
+    """Ligne de commande d'un processus ('' si indisponible)"""
+    if psutil:
+        try:
+            return ' '.join(psutil.Process(pid).cmdline())
+        except psutil.Error:
+            return ''
+    try:
+        with open(f'/proc/{pid}/cmdline', 'rb') as f:
+            return f.read().replace(b'\0', b' ').decode('utf-8', errors='replace')
+    except OSError:
+        return ''
+
+
+def process_started(pid):
+    """Instant de démarrage d'un processus (None si indisponible); distingue un PID réutilisé"""
+    if psutil:
+        try:
+            return psutil.Process(pid).create_time()
+        except psutil.Error:
+            return None
+    try:
+        # Champ 22 de /proc/<pid>/stat (tops d'horloge depuis le démarrage du système)
+        fields = Path(f'/proc/{pid}/stat').read_text().rsplit(')', 1)[1].split()
+        return int(fields[19])
+    except (OSError, IndexError, ValueError):
+        return None
+
+
+def process_name(pid):
+    """Nom de l'exécutable d'un processus ('' si indisponible)"""
+    if psutil:
+        try:
+            return psutil.Process(pid).name()
+        except psutil.Error:
+            return ''
+    try:
+        with open(f'/proc/{pid}/comm', 'r') as f:
+            return f.read().strip()
+    except OSError:
+        return ''
+
+
+def kill_tree(pid):
+    """Terminer un processus et tous ses descendants"""
+    if os.name == 'nt' and not psutil:
+        subprocess.run(['taskkill', '/PID', str(pid), '/T', '/F'],
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        return
+
+    # Enfants d'abord: Chrome relance des renderers tant que le parent vit
+    for member in reversed(process_tree(pid)):
+        try:
+            if psutil:
+                psutil.Process(member).kill()
+            else:
+                os.kill(member, signal.SIGKILL)
+        except Exception:
+            continue
+
+
+class ChromeWatchdog:
+    """Chien de garde des processus navigateur d'une exécution"""
+
+    def __init__(self, run_seconds=900, step_seconds=180, sample_seconds=2.0, registry_file=None):
+        """Initialisation avec les limites dures (0 = pas de limite)"""
+        self.run_seconds = run_seconds
+        self.step_seconds = step_seconds
+        self.sample_seconds = sample_seconds
+        self.logger = logging.getLogger(__name__)
+        # Profils temporaires créés par cet outil: seuls candidats au nettoyage
+        self.registry_file = Path(registry_file or Path('logs') / 'chrome_profiles.json')
+
+        self.driver_pid = None
+        self.profile_dir = None
+        self.run_deadline = None
+        self.step_deadline = None
+        self.step_name = None
+        self.breached = None
+        self.peak_rss = 0
+
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def create_profile_dir(self):
+        """Profil Chrome temporaire inscrit au registre (reconnaissable s'il est orphelin)"""
+        self.profile_dir = tempfile.mkdtemp(prefix=f"{PROFILE_PREFIX}{os.getpid()}_")
+        registry = self._load_registry()
+        registry[self.profile_dir] = {'pid': os.getpid(), 'started': process_started(os.getpid())}
+        self._save_registry(registry)
+        return self.profile_dir
+
+    def _load_registry(self):
+        try:
+            with open(self.registry_file, 'r', encoding='utf-8') as f:
+                registry = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return registry if isinstance(registry, dict) else {}
+
+    def _save_registry(self, registry):
+        """Écriture atomique du registre des profils"""
+        try:
+            self.registry_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp_file = self.registry_file.with_suffix('.tmp')
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(registry, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_file, self.registry_file)
+        except OSError as e:
+            self.logger.warning("Registre des profils Chrome non enregistré: %s", str(e))
+
+    @staticmethod
+    def _owner_alive(owner):
+        """Processus créateur encore en vie (même PID et même instant de démarrage)"""
+        pid = owner.get('pid')
+        if not pid_alive(pid):
+            return False
+        started = owner.get('started')
+        current = process_started(pid)
+        return started is None or current is None or current == started
+
+    @staticmethod
+    def _browser_pids():
+        """PID des processus Chrome / chromedriver (liste vide si non mesurable)"""
+        if not (psutil or Path('/proc').is_dir()):
+            return []
+        pids = [p.pid for p in psutil.process_iter()] if psutil else \
+            [int(path.name) for path in Path('/proc').glob('[0-9]*')]
+        return [pid for pid in pids if any(name in process_name(pid).lower() for name in BROWSER_NAMES)]
+
+    def reap_leftovers(self):
+        """Terminer les navigateurs et supprimer les profils inscrits au registre par des exécutions mortes
+
+        Les profils d'autres outils ou utilisateurs (scoped_dir* de chromedriver...) ne sont jamais touchés.
+        """
+        registry = self._load_registry()
+        stale = [profile_dir for profile_dir, owner in registry.items()
+                 if not (isinstance(owner, dict) and self._owner_alive(owner))]
+        killed = removed = 0
+        for profile_dir in stale:
+            for pid in self._browser_pids():
+                if f'--user-data-dir={profile_dir}' in process_cmdline(pid):
+                    kill_tree(pid)
+                    killed += 1
+            path = Path(profile_dir)
+            if path.name.startswith(PROFILE_PREFIX) and path.is_dir():
+                shutil.rmtree(path, ignore_errors=True)
+                removed += 1
+            del registry[profile_dir]
+        if stale:
+            self._save_registry(registry)
+
+        if killed or removed:
+            self.logger.warning("Nettoyage des restes d'exécutions précédentes: %d processus Chrome arrêté(s), "
+                                "%d profil(s) temporaire(s) supprimé(s)", killed, removed)
+        return killed, removed
+
+    def kill_profile_users(self, profile_dir):
+        """Terminer les navigateurs restés ouverts sur un profil persistant (exécution morte)"""
+        killed = 0
+        for pid in self._browser_pids():
+            if f'--user-data-dir={profile_dir}' in process_cmdline(pid):
+                kill_tree(pid)
+                killed += 1
+        if killed:
+            self.logger.warning("%d processus Chrome orphelin(s) arrêté(s) sur le profil %s", killed, profile_dir)
+        return killed
+
+    def attach(self, driver):
+        """Associer le driver Chrome lancé et démarrer la surveillance"""
+        try:
+            self.driver_pid = driver.service.process.pid
+        except AttributeError:
+            self.driver_pid = None
+        self.breached = None
+        self.peak_rss = 0
+
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._monitor, name='chrome-watchdog', daemon=True)
+            self._thread.start()
+
+    def start_run(self):
+        """Démarrer le chronomètre de l'exécution"""
+        with self._lock:
+            self.run_deadline = time.monotonic() + self.run_seconds if self.run_seconds else None
+            self.breached = None
+
+    @contextmanager
+    def step(self, name, seconds=None):
+        """Limiter la durée d'une étape"""
+        limit = self.step_seconds if seconds is None else seconds
+        with self._lock:
+            self.step_name = name
+            self.step_deadline = time.monotonic() + limit if limit else None
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.step_name = None
+                self.step_deadline = None
+
+    def _monitor(self):
+        """Boucle de surveillance: échantillonnage mémoire et contrôle des délais"""
+        while not self._stop.wait(self.sample_seconds):
+            pid = self.driver_pid
+            if not pid:
+                continue
+
+            rss = [process_rss(member) for member in process_tree(pid)]
+            total = sum(value for value in rss if value)
+            if total > self.peak_rss:
+                self.peak_rss = total
+
+            now = time.monotonic()
+            with self._lock:
+                reason = None
+                if self.run_deadline and now > self.run_deadline:
+                    reason = f"durée maximale d'exécution ({self.run_seconds}s)"
+                elif self.step_deadline and now > self.step_deadline:
+                    reason = f"durée maximale de l'étape {self.step_name}"
+                if reason is None or self.breached:
+                    continue
+                self.breached = reason
+
+            self.logger.error("Chien de garde: %s dépassée, arrêt du navigateur (PID %d)", reason, pid)
+            kill_tree(pid)
+
+    def stop(self):
+        """Arrêter la surveillance, nettoyer le profil et retourner le pic de mémoire (octets)"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.sample_seconds + 1)
+            self._thread = None
+
+        if self.driver_pid and process_tree(self.driver_pid):
+            # driver.quit() n'a pas abouti: ne pas laisser Chrome tourner
+            kill_tree(self.driver_pid)
+        self.driver_pid = None
+
+        if self.profile_dir:
+            shutil.rmtree(self.profile_dir, ignore_errors=True)
+            registry = self._load_registry()
+            if registry.pop(self.profile_dir, None) is not None:
+                self._save_registry(registry)
+            self.profile_dir = None
+
+        with self._lock:
+            self.run_deadline = None
+        return self.peak_rss
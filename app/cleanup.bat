@@ -1,21 +1,18 @@
 @echo off
 cd /d "%~dp0.."
 
-echo Nettoyage des anciens fichiers...
+echo Archivage et rétention des fichiers de logs...
 echo.
 
-REM Supprimer les logs de plus de 30 jours
-forfiles /p "data\logs" /m "*.log" /d -30 /c "cmd /c del @path" 2>nul
-
-REM Supprimer les captures d'écran de plus de 30 jours
-forfiles /p "data\logs" /m "*.png" /d -30 /c "cmd /c del @path" 2>nul
+REM Archives quotidiennes compressées dans logs\archives (manifest.json),
+REM conservation plus longue des exécutions en échec, budget de taille global
+python app\retention.py %*
 
 REM Supprimer les fichiers temporaires
-del /q data\logs\*.tmp 2>nul
+del /q logs\*.tmp 2>nul
 
-echo ✅ Nettoyage terminé
 echo.
-echo Les fichiers de plus de 30 jours ont été supprimés.
+python app\retention.py --status
 echo.
 
-exit /b 0
\ No newline at end of file
+exit /b 0
@@ -52,6 +52,7 @@ class SatelixCLI:
             Choice("schedule", "⏰ Programmer exécution quotidienne", enabled=True),
             Separator("─── MAINTENANCE ───"),
             Choice("logs", "📋 Consulter les logs", enabled=True),
+            Choice("stats", "📈 Statistiques des exécutions", enabled=True),
             Choice("cleanup", "🧹 Nettoyage des fichiers", enabled=True),
             Separator("─── DIAGNOSTIC ───"),
             Choice("diagnostic", "🔍 Diagnostic système", enabled=True),
@@ -83,6 +84,8 @@ class SatelixCLI:
             self.setup_schedule()
         elif action == "logs":
             self.show_logs()
+        elif action == "stats":
+            self.show_statistics()
         elif action == "cleanup":
             self.cleanup_files()
         elif action == "diagnostic":
@@ -242,7 +245,25 @@ class SatelixCLI:
             ).execute()
 
             if confirm:
-                self.run_script("app\\setup_schedule.bat")
+                self.update_env_values({
+                    "SCHEDULE_TIME": time_choice,
+                    "SCHEDULE_DAYS": ",".join(days)
+                })
+
+                mode = inquirer.select(
+                    message="Mode de planification:",
+                    choices=[
+                        Choice("service", "Service intégré (driver préchauffé, rattrapage des oublis)"),
+                        Choice("windows", "Planificateur de tâches Windows"),
+                    ],
+                    default="service"
+                ).execute()
+
+                if mode == "service":
+                    print(f"{Fore.CYAN}ℹ️  Le service tourne tant que cette fenêtre reste ouverte (Ctrl+C pour arrêter){Style.RESET_ALL}")
+                    self.run_script("python app\\satelix_simple.py --serve")
+                else:
+                    self.run_script("app\\setup_schedule.bat")
 
     def run_diagnostic(self):
         """Lancer le diagnostic"""
@@ -272,6 +293,13 @@ class SatelixCLI:
         print()
         self.run_script("app\\show_logs.bat")
 
+    def show_statistics(self):
+        """Afficher les tendances des exécutions (durées, étapes lentes, sélecteurs)"""
+        self.clear_screen()
+        print(f"{Fore.CYAN}{Style.BRIGHT}📈 STATISTIQUES DES EXÉCUTIONS{Style.RESET_ALL}")
+        print()
+        self.run_script("python app\\log_analytics.py report")
+
     def cleanup_files(self):
         """Nettoyage des fichiers"""
         self.clear_screen()
@@ -279,7 +307,7 @@ class SatelixCLI:
         print()
 
         confirm = inquirer.confirm(
-            message="Supprimer les fichiers de plus de 30 jours ?",
+            message="Archiver les anciens fichiers de logs et appliquer la rétention ?",
             default=True
         ).execute()
 
@@ -317,6 +345,22 @@ TIMEOUT=30
 
         print(f"{Fore.GREEN}✅ Configuration sauvegardée{Style.RESET_ALL}")
 
+    def update_env_values(self, values):
+        """Mettre à jour (ou ajouter) des clés dans le fichier .env"""
+        env_file = Path("app/.env")
+        lines = env_file.read_text(encoding="utf-8").splitlines() if env_file.exists() else []
+
+        remaining = dict(values)
+        for i, line in enumerate(lines):
+            key = line.split("=", 1)[0].strip()
+            if key in remaining:
+                lines[i] = f"{key}={remaining.pop(key)}"
+
+        lines.extend(f"{key}={value}" for key, value in remaining.items())
+
+        with open(env_file, "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+
     def test_connection(self):
         """Tester la connexion"""
         print(f"{Fore.YELLOW}🔄 Test de connexion en cours...{Style.RESET_ALL}")
@@ -0,0 +1,359 @@
+#!/usr/bin/env python3
+"""
+Exécution concurrente de créations d'inventaires dans un seul Chrome
+Un navigateur Playwright, N contextes isolés (chacun avec sa session Satelix)
+alimentés par une file de travaux asyncio (plusieurs dates et/ou dépôts)
+"""
+
+import os
+import re
+import time
+import asyncio
+import logging
+from datetime import datetime
+from pathlib import Path
+from dotenv import load_dotenv
+
+from locks import FileLock
+from run_state import RunState, RunCheckpoint
+from host_resolver import HostResolver
+
+try:
+    from playwright.async_api import async_playwright
+except ImportError:
+    async_playwright = None
+
+
+DEFAULT_INTITULE = 'Inventaire filtres'
+DEFAULT_DEPOT = 'DEPOT'
+VALORISATION = 'CMUP'
+
+# Sélecteurs résolus du parcours de création (mêmes éléments que le mode séquentiel)
+LOGIN_USER = "input[placeholder='Utilisateur / adresse mail']"
+LOGIN_PASSWORD = "input[placeholder='Mot de passe']"
+LOGIN_BUTTON = "xpath=//button[contains(text(), 'Se connecter')] | //button[@type='submit'] | //input[@type='submit']"
+LOGGED_IN = ".sidebar, nav, [role='navigation']"
+INVENTAIRES_READY = "table"
+CREATE_BUTTON = "button[title*='Nouvel'], a[title*='Nouvel']"
+FORM_READY = ".modal-body, form"
+INTITULE_FIELD = "input[name='intitule']"
+DEPOT_SELECT = "select[name*='depot'], select[id*='depot']"
+VALORISATION_SELECT = "select[name*='valorisation'], select[id*='valorisation']"
+# Cases cochées par le mode séquentiel (libellé en minuscules)
+CHECKBOX_LABELS = ('prix lot/série', 'capture des stocks')
+LABEL_XPATH = ("xpath=//label[contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', "
+               "'abcdefghijklmnopqrstuvwxyz'), '{}')]")
+# Case associée à un libellé: contenue dans le libellé, ou juste avant / après
+LABEL_CHECKBOX = ("xpath=.//input[@type='checkbox'] | preceding-sibling::input[@type='checkbox'][1] | "
+                  "following-sibling::input[@type='checkbox'][1]")
+DATE_FIELD = "input[type='date'], input[name*='date']"
+SAVE_BUTTON = ("xpath=//button[contains(translate(text(), 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', "
+               "'abcdefghijklmnopqrstuvwxyz'), 'ajouter')]")
+SPINNER = "#modalSpinner"
+
+
+class InventoryJob:
+    """Création d'un inventaire pour une date (et éventuellement un dépôt)"""
+
+    __slots__ = ('target_date', 'intitule', 'depot', 'attempts', 'status', 'duration')
+
+    def __init__(self, target_date, intitule=DEFAULT_INTITULE, depot=None):
+        self.target_date = target_date
+        self.intitule = intitule
+        self.depot = depot
+        self.attempts = 0
+        self.status = None
+        self.duration = None
+
+    @property
+    def date_str(self):
+        return self.target_date.strftime('%d/%m/%Y')
+
+    @property
+    def label(self):
+        return f"{self.date_str} ({self.depot})" if self.depot else self.date_str
+
+    def checkpoint(self, resume=True):
+        """Point de reprise partagé avec le mode séquentiel"""
+        prefix = 'inventaire'
+        if self.depot:
+            prefix += '_' + re.sub(r'[^A-Za-z0-9]+', '_', self.depot)
+        return RunCheckpoint(Path('logs') / 'checkpoints', self.target_date, resume=resume, prefix=prefix)
+
+
+class ContextWorker:
+    """Contexte de navigation isolé avec sa propre session Satelix"""
+
+    def __init__(self, number, pool):
+        self.number = number
+        self.pool = pool
+        self.context = None
+        self.page = None
+        self.logger = logging.getLogger(__name__)
+
+    async def start(self, browser):
+        """Créer le contexte et ouvrir la session"""
+        started = time.monotonic()
+        self.context = await browser.new_context(viewport={'width': 1280, 'height': 800})
+        self.context.set_default_timeout(self.pool.timeout * 1000)
+        self.page = await self.context.new_page()
+        await self.login()
+        self.logger.info("Contexte %d prêt en %.1fs", self.number, time.monotonic() - started)
+
+    async def login(self):
+        page = self.page
+        await page.goto(self.pool.login_url, wait_until='domcontentloaded')
+        await page.fill(LOGIN_USER, self.pool.username)
+        await page.fill(LOGIN_PASSWORD, self.pool.password)
+        await page.locator(LOGIN_BUTTON).first.click()
+        await page.locator(LOGGED_IN).first.wait_for(state='attached')
+
+    async def open_inventaires(self):
+        await self.page.goto(self.pool.inventaires_url, wait_until='domcontentloaded')
+        await self.page.locator(INVENTAIRES_READY).first.wait_for(state='attached')
+
+    async def inventory_exists(self, job):
+        rows = self.page.locator("table tbody tr", has_text=job.date_str)
+        if job.depot:
+            rows = rows.filter(has_text=job.depot)
+        return await rows.count() > 0
+
+    async def create(self, job):
+        """Parcours de création: bouton, formulaire, date, sauvegarde"""
+        page = self.page
+        await page.locator(SPINNER).wait_for(state='hidden')
+        await page.locator(CREATE_BUTTON).first.click()
+        await page.locator(FORM_READY).first.wait_for(state='visible')
+
+        # Mêmes champs que le formulaire séquentiel (_fill_inventory_form_from_template)
+        await page.locator(INTITULE_FIELD).first.fill(job.intitule)
+        await self.select_option(DEPOT_SELECT, job.depot or self.pool.depot)
+        await self.select_option(VALORISATION_SELECT, VALORISATION)
+        for label in CHECKBOX_LABELS:
+            await self.check_box(label)
+
+        date_field = page.locator(DATE_FIELD).first
+        if await date_field.get_attribute('type') == 'date':
+            await date_field.fill(job.target_date.strftime('%Y-%m-%d'))
+        else:
+            await date_field.fill(job.date_str)
+
+        await page.locator(SAVE_BUTTON).first.click()
+        await page.locator(FORM_READY).first.wait_for(state='hidden')
+
+    async def select_option(self, selector, value):
+        """Choisir l'option dont le texte contient value, sinon l'option de cette valeur"""
+        select = self.page.locator(selector)
+        if not await select.count():
+            self.logger.warning("Contexte %d: liste %s absente du formulaire", self.number, selector)
+            return False
+        options = select.first.locator('option')
+        for index in range(await options.count()):
+            if value.upper() in (await options.nth(index).inner_text()).upper():
+                await select.first.select_option(index=index)
+                return True
+        try:
+            await select.first.select_option(value=value)
+            return True
+        except Exception:
+            self.logger.warning("Contexte %d: option %s introuvable dans %s", self.number, value, selector)
+            return False
+
+    async def check_box(self, label_text):
+        """Cocher la case d'un libellé; une case déjà cochée n'est pas modifiée"""
+        box = self.page.get_by_label(label_text)
+        if not await box.count():
+            label = self.page.locator(LABEL_XPATH.format(label_text))
+            if not await label.count():
+                self.logger.warning("Contexte %d: case '%s' absente du formulaire", self.number, label_text)
+                return False
+            box = label.first.locator(LABEL_CHECKBOX)
+            if not await box.count():
+                self.logger.warning("Contexte %d: état de la case '%s' illisible, non modifiée",
+                                    self.number, label_text)
+                return False
+        # check() ne clique que si la case n'est pas cochée
+        await box.first.check()
+        return True
+
+    async def run_job(self, job):
+        """Traiter un travail; retourne 'succes', 'deja_traite' ou lève une exception"""
+        await self.open_inventaires()
+        if await self.inventory_exists(job):
+            return 'deja_traite'
+        await self.create(job)
+        await self.open_inventaires()
+        if not await self.inventory_exists(job):
+            raise RuntimeError("inventaire non visible après création")
+        return 'succes'
+
+    async def screenshot(self, name):
+        try:
+            path = Path('logs') / f"{name}_ctx{self.number}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png"
+            await self.page.screenshot(path=str(path))
+        except Exception:
+            pass
+
+    async def close(self):
+        if self.context is not None:
+            await self.context.close()
+
+
+class ContextPool:
+    """Planifie des créations d'inventaires sur N contextes d'un même navigateur"""
+
+    def __init__(self, size=None):
+        """Initialisation à partir du fichier .env"""
+        load_dotenv()
+
+        self.logger = logging.getLogger(__name__)
+
+        self.login_url = os.getenv('SATELIX_URL_LOGIN')
+        self.inventaires_url = os.getenv('SATELIX_URL_INVENTAIRES')
+        self.username = os.getenv('SATELIX_USER')
+        self.password = os.getenv('SATELIX_PASSWORD')
+        self.headless = os.getenv('HEADLESS', 'true').lower() == 'true'
+        self.timeout = int(os.getenv('TIMEOUT', '30'))
+        self.low_memory = os.getenv('LOW_MEMORY', 'false').lower() == 'true'
+
+        self.intitule = os.getenv('INVENTAIRE_INTITULE', DEFAULT_INTITULE)
+        self.depot = os.getenv('INVENTAIRE_DEPOT', DEFAULT_DEPOT)
+
+        self.size = size or int(os.getenv('BROWSER_CONTEXTS', '3'))
+        self.job_seconds = int(os.getenv('WATCHDOG_STEP_SECONDS', '300'))
+        self.max_attempts = 1 + int(os.getenv('STEP_RETRIES', '2'))
+
+    def launch_args(self):
+        """Arguments Chrome (mêmes options serveur que setup_driver)"""
+        args = ['--no-sandbox', '--disable-dev-shm-usage', '--disable-gpu']
+        if self.low_memory:
+            args += ['--disk-cache-size=1', '--disable-extensions', '--disable-background-networking',
+                     '--disable-sync', '--no-first-run', '--mute-audio',
+                     '--js-flags=--max-old-space-size=' + os.getenv('LOW_MEMORY_JS_HEAP_MB', '256')]
+        resolver = HostResolver.from_env(self.login_url)
+        if resolver is not None and resolver.resolve():
+            args += resolver.chrome_arguments()
+        return args
+
+    async def _launch(self, playwright):
+        """Chrome installé en priorité, sinon le Chromium de Playwright"""
+        try:
+            return await playwright.chromium.launch(channel='chrome', headless=self.headless,
+                                                    args=self.launch_args())
+        except Exception as e:
+            self.logger.warning("Chrome introuvable pour Playwright (%s), utilisation de Chromium", str(e))
+            return await playwright.chromium.launch(headless=self.headless, args=self.launch_args())
+
+    async def _worker(self, worker, queue):
+        """Consommer la file de travaux dans un contexte"""
+        while True:
+            try:
+                job = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+
+            job.attempts += 1
+            started = time.monotonic()
+            try:
+                job.status = await asyncio.wait_for(worker.run_job(job), self.job_seconds)
+                job.duration = time.monotonic() - started
+                self.logger.info("Contexte %d: inventaire du %s %s en %.1fs", worker.number, job.label,
+                                 "déjà présent" if job.status == 'deja_traite' else "créé", job.duration)
+            except Exception as e:
+                self.logger.warning("Contexte %d: échec de l'inventaire du %s (tentative %d/%d): %s",
+                                    worker.number, job.label, job.attempts, self.max_attempts,
+                                    str(e) or type(e).__name__)
+                await worker.screenshot("context_job_error")
+                if job.attempts < self.max_attempts:
+                    queue.put_nowait(job)
+                    # Session expirée ou page bloquée: se reconnecter avant le travail suivant
+                    try:
+                        await worker.login()
+                    except Exception:
+                        pass
+                else:
+                    job.status = 'echec'
+            finally:
+                queue.task_done()
+
+    async def _run(self, jobs):
+        queue = asyncio.Queue()
+        for job in jobs:
+            queue.put_nowait(job)
+
+        async with async_playwright() as playwright:
+            browser = await self._launch(playwright)
+            try:
+                workers = [ContextWorker(number, self) for number in range(1, min(self.size, len(jobs)) + 1)]
+                started = await asyncio.gather(*(worker.start(browser) for worker in workers),
+                                               return_exceptions=True)
+                ready = []
+                for worker, result in zip(workers, started):
+                    if isinstance(result, Exception):
+                        self.logger.error("Contexte %d indisponible: %s", worker.number, str(result))
+                    else:
+                        ready.append(worker)
+                if not ready:
+                    raise RuntimeError("Aucun contexte n'a pu ouvrir de session Satelix")
+
+                await asyncio.gather(*(self._worker(worker, queue) for worker in ready))
+                for worker in ready:
+                    await worker.close()
+            finally:
+                await browser.close()
+
+    def run(self, dates, depots=None, intitule=None, resume=True):
+        """Créer les inventaires des dates (x dépôts); retourne un code de sortie"""
+        if async_playwright is None:
+            self.logger.error("Le mode multi-contextes nécessite playwright (pip install playwright)")
+            return 2
+
+        run_lock = FileLock(Path('logs') / 'satelix_run.lock')
+        if not run_lock.acquire():
+            owner = run_lock.owner() or {}
+            self.logger.warning("Exécution déjà en cours (PID %s), demande fusionnée", owner.get('pid'))
+            return 1
+
+        try:
+            self.logger.info("=== DÉBUT DE LA MISE À JOUR DES DATES D'INVENTAIRES (%d contexte(s)) ===", self.size)
+            jobs, checkpoints = [], {}
+            for target_date in dates:
+                for depot in depots or [None]:
+                    job = InventoryJob(target_date, intitule or self.intitule, depot)
+                    checkpoint = job.checkpoint(resume)
+                    if checkpoint.is_completed(RunState.DONE):
+                        self.logger.info("Inventaire du %s déjà créé lors d'une exécution précédente", job.label)
+                        continue
+                    checkpoints[id(job)] = checkpoint
+                    jobs.append(job)
+
+            if not jobs:
+                self.logger.info("=== DÉJÀ TRAITÉ: aucun inventaire à créer ===")
+                return 0
+
+            started = time.monotonic()
+            asyncio.run(self._run(jobs))
+            elapsed = time.monotonic() - started
+
+            for job in jobs:
+                if job.status in ('succes', 'deja_traite'):
+                    checkpoints[id(job)].complete(RunState.DONE)
+
+            failed = [job.label for job in jobs if job.status not in ('succes', 'deja_traite')]
+            self.logger.info("%d travail(aux) en %.1fs sur %d contexte(s) (%.1fs par inventaire)",
+                             len(jobs), elapsed, min(self.size, len(jobs)), elapsed / len(jobs))
+            if failed:
+                self.logger.error("=== ÉCHEC PARTIEL: %d inventaire(s) non créé(s): %s ===",
+                                  len(failed), ', '.join(failed))
+                return 2
+
+            self.logger.info("=== SUCCÈS: %d inventaire(s) créé(s) ===", len(jobs))
+            return 0
+
+        except Exception as e:
+            self.logger.error("Erreur inattendue: %s", str(e))
+            return 2
+
+        finally:
+            self.logger.info("Navigateur fermé proprement")
+            run_lock.release()
@@ -7,7 +7,6 @@ import os
 import sys
 import socket
 import subprocess
-import requests
 from pathlib import Path
 from dotenv import load_dotenv
 from urllib.parse import urlparse
@@ -94,6 +93,11 @@ class SatelixDiagnostic:
         except socket.gaierror:
             self.print_result("Résolution DNS", False, f"Impossible de résoudre {host}")
             self.solutions.append("Vérifiez que vous êtes connecté au réseau de l'entreprise")
+            from host_resolver import HostResolver
+            known = HostResolver(self.login_url).load_cache().get(host)
+            if known:
+                self.solutions.append(f"Dernière adresse valide de {host}: {known['ip']} (du {known.get('resolved_on', '?')}), "
+                                      "utilisée automatiquement par l'automatisation")
             self.solutions.append("Essayez de remplacer 'sql-industrie' par l'adresse IP directe")
             dns_ok = False
 
@@ -128,45 +132,34 @@ class SatelixDiagnostic:
         if not self.login_url:
             return False
 
-        try:
-            # Test GET simple
-            response = requests.get(self.login_url, timeout=15, verify=False)
-
-            status_ok = response.status_code == 200
-            self.print_result("Accès HTTP", status_ok,
-                             f"Code {response.status_code}" if not status_ok else "Page accessible")
-
-            if not status_ok:
-                if response.status_code == 404:
-                    self.solutions.append("L'URL semble incorrecte (erreur 404)")
-                elif response.status_code == 403:
-                    self.solutions.append("Accès refusé - vérifiez les permissions")
-                elif response.status_code >= 500:
-                    self.solutions.append("Erreur serveur - contactez l'administrateur")
-
-            # Test contenu de la page
-            if status_ok:
-                content = response.text.lower()
-                has_login = any(term in content for term in ['login', 'connexion', 'mot de passe', 'utilisateur'])
-                self.print_result("Page de connexion", has_login,
-                                 "Formulaire de connexion détecté" if has_login else "Pas de formulaire trouvé")
-
-                if not has_login:
-                    self.solutions.append("L'URL ne semble pas pointer vers une page de connexion")
-
-            return status_ok
-
-        except requests.exceptions.ConnectTimeout:
-            self.print_result("Accès HTTP", False, "Timeout de connexion")
-            self.solutions.append("Le serveur met trop de temps à répondre")
-            return False
-        except requests.exceptions.ConnectionError:
-            self.print_result("Accès HTTP", False, "Erreur de connexion")
-            self.solutions.append("Impossible de se connecter au serveur web")
-            return False
-        except Exception as e:
-            self.print_result("Accès HTTP", False, str(e))
-            return False
+        from preflight import probe_login_page
+
+        # Même contrôle que la pré-vérification des exécutions, avec un délai plus large
+        probe = probe_login_page(self.login_url, timeout=15)
+        if probe.ok:
+            self.print_result("Accès HTTP", True, "Page accessible")
+        else:
+            self.print_result("Accès HTTP", False, probe.detail)
+
+        solutions = {
+            'url': "L'URL semble incorrecte (erreur 404)",
+            'acces': "Accès refusé - vérifiez les permissions",
+            'serveur': "Erreur serveur - contactez l'administrateur",
+            'timeout': "Le serveur met trop de temps à répondre",
+            'connexion': "Impossible de se connecter au serveur web",
+        }
+        if probe.reason in solutions:
+            self.solutions.append(solutions[probe.reason])
+
+        # Test contenu de la page
+        if probe.ok:
+            self.print_result("Page de connexion", probe.has_login,
+                             "Formulaire de connexion détecté" if probe.has_login else "Pas de formulaire trouvé")
+
+            if not probe.has_login:
+                self.solutions.append("L'URL ne semble pas pointer vers une page de connexion")
+
+        return probe.ok
 
     def test_selenium_requirements(self):
         """Test des prérequis Selenium"""
@@ -199,6 +192,16 @@ class SatelixDiagnostic:
             self.print_result("Google Chrome", False, "Chrome non trouvé")
             self.solutions.append("Installez Google Chrome depuis https://www.google.com/chrome/")
 
+        # Paire Chrome/chromedriver en cache (mise à jour automatique de Chrome)
+        from driver_cache import DriverCache
+        cache = DriverCache()
+        metadata = cache.load()
+        if metadata is not None:
+            valid, message = cache.check(metadata)
+            self.print_result("ChromeDriver en cache", valid, f"{metadata['driver_version']} - {message}")
+            if not valid:
+                self.solutions.append("Résolvez à nouveau chromedriver: python3 driver_cache.py --refresh")
+
         # Test ChromeDriver
         try:
             from selenium import webdriver
@@ -208,8 +211,12 @@ class SatelixDiagnostic:
             options.add_argument('--headless=new')
             options.add_argument('--no-sandbox')
 
-            # Test rapide de création du driver
-            driver = webdriver.Chrome(options=options)
+            # Test rapide de création du driver (depuis le cache si disponible)
+            service = cache.apply(options)
+            if service is not None:
+                driver = webdriver.Chrome(options=options, service=service)
+            else:
+                driver = webdriver.Chrome(options=options)
             driver.get('about:blank')
             driver.quit()
 
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+Cache local de la paire Chrome / chromedriver
+La paire est résolue une seule fois par Selenium Manager (téléchargement éventuel),
+chromedriver est copié dans drivers/<version>/ et les versions sont mémorisées dans
+drivers/chromedriver.json. Les démarrages suivants lancent le service directement
+depuis le chemin en cache, sans Selenium Manager ni accès réseau: la validation se
+limite à comparer taille et date du binaire Chrome. Si Chrome a changé (mise à jour
+automatique), sa version est relue et une version majeure différente de celle de
+chromedriver est signalée avant l'échec du lancement
+"""
+
+import os
+import re
+import sys
+import json
+import shutil
+import logging
+import argparse
+import subprocess
+from datetime import datetime
+from pathlib import Path
+from dotenv import load_dotenv
+
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.common.selenium_manager import SeleniumManager
+
+
+VERSION = re.compile(r'(\d+)\.(\d+)\.(\d+)\.(\d+)')
+METADATA_FILE = 'chromedriver.json'
+
+
+def parse_version(text):
+    """Première version a.b.c.d trouvée dans un texte (None si absente)"""
+    match = VERSION.search(text or '')
+    return match.group(0) if match else None
+
+
+def major(version):
+    return int(version.split('.')[0]) if version else None
+
+
+def binary_fingerprint(path):
+    """Taille et date de modification d'un binaire (changent à chaque mise à jour)"""
+    stat = Path(path).stat()
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def read_version(path, timeout=15):
+    """Version d'un binaire Chrome ou chromedriver"""
+    path = Path(path)
+    # chrome.exe n'affiche pas sa version: dossier de version installé à côté du binaire
+    if os.name == 'nt' and path.name.lower() == 'chrome.exe':
+        versions = [entry.name for entry in path.parent.iterdir() if entry.is_dir() and VERSION.fullmatch(entry.name)]
+        return max(versions, key=lambda version: tuple(map(int, version.split('.'))), default=None)
+    try:
+        result = subprocess.run([str(path), '--version'], capture_output=True, text=True, timeout=timeout)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return parse_version(result.stdout)
+
+
+class DriverCache:
+    """Résolution, mise en cache et validation de la paire Chrome / chromedriver"""
+
+    def __init__(self, cache_dir=None):
+        """Initialisation à partir du fichier .env"""
+        load_dotenv()
+
+        self.logger = logging.getLogger(__name__)
+        self.enabled = os.getenv('DRIVER_CACHE', 'true').lower() == 'true'
+        self.cache_dir = Path(cache_dir or os.getenv('DRIVER_CACHE_DIR', 'drivers'))
+        self.metadata_file = self.cache_dir / METADATA_FILE
+
+    def load(self):
+        """Métadonnées de la paire en cache (None si absente ou illisible)"""
+        try:
+            with open(self.metadata_file, 'r', encoding='utf-8') as f:
+                metadata = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return metadata if isinstance(metadata, dict) and metadata.get('driver_path') else None
+
+    def save(self, metadata):
+        """Persister les métadonnées (écriture atomique)"""
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp_file = self.metadata_file.with_suffix('.tmp')
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(metadata, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_file, self.metadata_file)
+
+    def resolve(self):
+        """Résoudre la paire avec Selenium Manager et copier chromedriver dans le cache"""
+        manager = SeleniumManager()
+        if hasattr(manager, 'binary_paths'):
+            paths = manager.binary_paths(['--browser', 'chrome'])
+        else:
+            # Selenium < 4.20: le chemin du navigateur est reporté dans les options
+            options = Options()
+            paths = {'driver_path': manager.driver_location(options), 'browser_path': options.binary_location}
+        chrome_path = paths.get('browser_path')
+        source = Path(paths['driver_path'])
+        driver_version = read_version(source)
+        if not driver_version:
+            raise RuntimeError(f"Version de chromedriver illisible: {source}")
+
+        target_dir = self.cache_dir / driver_version
+        target_dir.mkdir(parents=True, exist_ok=True)
+        driver_path = target_dir / source.name
+        if not driver_path.exists():
+            tmp_path = driver_path.with_suffix(driver_path.suffix + '.tmp')
+            shutil.copy2(source, tmp_path)
+            os.replace(tmp_path, driver_path)
+
+        metadata = {
+            'driver_path': str(driver_path.resolve()),
+            'driver_version': driver_version,
+            'chrome_path': chrome_path,
+            'chrome_version': read_version(chrome_path) if chrome_path else None,
+            'chrome_fingerprint': binary_fingerprint(chrome_path) if chrome_path else None,
+            'resolved_at': datetime.now().isoformat(timespec='seconds'),
+        }
+        self.save(metadata)
+        self.logger.info("Paire mise en cache: Chrome %s, chromedriver %s (%s)",
+                         metadata['chrome_version'] or '?', driver_version, driver_path)
+        self._prune(driver_version)
+        return metadata
+
+    def _prune(self, keep_version):
+        """Supprimer les anciennes versions de chromedriver du cache"""
+        for entry in self.cache_dir.iterdir():
+            if entry.is_dir() and VERSION.fullmatch(entry.name) and entry.name != keep_version:
+                shutil.rmtree(entry, ignore_errors=True)
+
+    def check(self, metadata):
+        """Valider la paire en cache; retourne (valide, message). Mémorise une nouvelle version compatible"""
+        if not Path(metadata['driver_path']).is_file():
+            return False, f"chromedriver absent du cache: {metadata['driver_path']}"
+
+        chrome_path = metadata.get('chrome_path')
+        if not chrome_path or not Path(chrome_path).is_file():
+            return False, f"Chrome introuvable: {chrome_path}"
+
+        # Cas courant: binaire Chrome inchangé depuis la résolution, aucun processus lancé
+        fingerprint = binary_fingerprint(chrome_path)
+        if fingerprint == metadata.get('chrome_fingerprint'):
+            return True, "paire inchangée"
+
+        chrome_version = read_version(chrome_path)
+        if major(chrome_version) != major(metadata['driver_version']):
+            return False, (f"Chrome mis à jour en {chrome_version or '?'}, incompatible avec "
+                           f"chromedriver {metadata['driver_version']}")
+
+        metadata.update(chrome_version=chrome_version, chrome_fingerprint=fingerprint)
+        self.save(metadata)
+        return True, f"Chrome mis à jour en {chrome_version}, toujours compatible"
+
+    def ensure(self):
+        """Paire validée (résolue si nécessaire); None si le cache est désactivé ou inutilisable"""
+        if not self.enabled:
+            return None
+
+        metadata = self.load()
+        if metadata is not None:
+            try:
+                valid, message = self.check(metadata)
+            except OSError as e:
+                valid, message = False, str(e)
+            if valid:
+                self.logger.debug("Paire Chrome/chromedriver en cache: %s", message)
+                return metadata
+            self.logger.warning("Paire Chrome/chromedriver en cache invalide: %s, nouvelle résolution", message)
+
+        try:
+            return self.resolve()
+        except Exception as e:
+            self.logger.error("Résolution de chromedriver impossible (réseau indisponible ?): %s", str(e))
+            return None
+
+    def apply(self, options):
+        """Service lancé depuis le chromedriver en cache (None: résolution par Selenium Manager)"""
+        metadata = self.ensure()
+        if metadata is None:
+            return None
+        if metadata.get('chrome_path'):
+            options.binary_location = metadata['chrome_path']
+        return Service(executable_path=metadata['driver_path'])
+
+    def print_status(self):
+        """Afficher la paire en cache et son état"""
+        metadata = self.load()
+        if metadata is None:
+            print("Aucune paire Chrome/chromedriver en cache")
+            return 1
+        print(f"Chrome:       {metadata.get('chrome_version') or '?'} ({metadata.get('chrome_path')})")
+        print(f"chromedriver: {metadata['driver_version']} ({metadata['driver_path']})")
+        print(f"Résolue le:   {metadata.get('resolved_at')}")
+        valid, message = self.check(metadata)
+        print(f"État:         {'OK' if valid else 'INVALIDE'} - {message}")
+        return 0 if valid else 1
+
+
+def main():
+    """Point d'entrée en ligne de commande"""
+    parser = argparse.ArgumentParser(description="Cache local de la paire Chrome / chromedriver")
+    parser.add_argument('--refresh', action='store_true', help="Résoudre à nouveau la paire (accès réseau possible)")
+    parser.add_argument('--check', action='store_true',
+                        help="Vérifier la paire en cache (code 1 si Chrome a été mis à jour de façon incompatible)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    cache = DriverCache()
+    if args.refresh:
+        try:
+            cache.resolve()
+        except Exception as e:
+            logging.getLogger(__name__).error("Résolution de chromedriver impossible: %s", str(e))
+            return 1
+    if args.check or args.refresh:
+        return cache.print_status()
+    return 0 if cache.ensure() else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
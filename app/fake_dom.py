@@ -0,0 +1,839 @@
+#!/usr/bin/env python3
+"""
+DOM en mémoire pour le driver factice (voir fake_driver.py)
+Analyse HTML (html.parser de la bibliothèque standard), visibilité approchée
+à la Bootstrap, et évaluation des sous-ensembles CSS et XPath 1.0 utilisés
+par les scripts d'automatisation
+"""
+
+import re
+from html import escape
+from html.parser import HTMLParser
+
+
+VOID_TAGS = {'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta',
+             'param', 'source', 'track', 'wbr'}
+
+BLOCK_TAGS = {'address', 'article', 'aside', 'blockquote', 'body', 'dd', 'div', 'dl', 'dt',
+              'fieldset', 'footer', 'form', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'header', 'hr',
+              'html', 'li', 'main', 'nav', 'ol', 'option', 'p', 'pre', 'section', 'select',
+              'table', 'tbody', 'tfoot', 'thead', 'tr', 'ul'}
+
+NON_RENDERED_TAGS = {'head', 'script', 'style', 'template', 'title', 'meta', 'link', 'noscript'}
+
+# Composants Bootstrap masqués tant qu'ils n'ont pas la classe 'show'
+TOGGLED_CLASSES = {'modal', 'collapse', 'dropdown-menu', 'fade'}
+
+
+class XPathError(Exception):
+    """Expression XPath ou CSS hors du sous-ensemble pris en charge"""
+
+
+class TextNode:
+    """Nœud texte"""
+
+    __slots__ = ('data', 'parent', 'order')
+
+    def __init__(self, data, parent=None):
+        self.data = data
+        self.parent = parent
+        self.order = 0
+
+    def string_value(self):
+        return self.data
+
+
+class Attr:
+    """Nœud attribut (résultat XPath de @nom)"""
+
+    __slots__ = ('name', 'value', 'parent', 'order')
+
+    def __init__(self, name, value, parent):
+        self.name = name
+        self.value = value
+        self.parent = parent
+        self.order = parent.order
+
+    def string_value(self):
+        return self.value
+
+
+class Element:
+    """Élément HTML avec l'état de formulaire d'un navigateur (valeur, coche, sélection)"""
+
+    def __init__(self, tag, attrs=None, parent=None):
+        self.tag = tag
+        self.attrs = dict(attrs or {})
+        self.children = []
+        self.parent = parent
+        self.order = 0
+        self.value = self.attrs.get('value', '')
+        self.checked = 'checked' in self.attrs
+        self.selected = 'selected' in self.attrs
+
+    def __repr__(self):
+        key = self.attrs.get('id') or self.attrs.get('name') or self.attrs.get('class') or ''
+        return f"<{self.tag} {key}>".replace(' >', '>')
+
+    @property
+    def classes(self):
+        return self.attrs.get('class', '').split()
+
+    def element_children(self):
+        return [child for child in self.children if isinstance(child, Element)]
+
+    def iter_descendants(self):
+        """Descendants (éléments et textes) dans l'ordre du document"""
+        for child in self.children:
+            yield child
+            if isinstance(child, Element):
+                yield from child.iter_descendants()
+
+    def iter_elements(self):
+        for node in self.iter_descendants():
+            if isinstance(node, Element):
+                yield node
+
+    def ancestors(self):
+        node = self.parent
+        while node is not None:
+            yield node
+            node = node.parent
+
+    def root(self):
+        node = self
+        while node.parent is not None:
+            node = node.parent
+        return node
+
+    def string_value(self):
+        return ''.join(node.data for node in self.iter_descendants() if isinstance(node, TextNode))
+
+    def append_child(self, node):
+        node.parent = self
+        self.children.append(node)
+        return node
+
+    def remove(self):
+        if self.parent is not None:
+            self.parent.children.remove(self)
+            self.parent = None
+
+    def same_type_index(self):
+        """Position parmi les frères de même balise (1 = premier)"""
+        if self.parent is None:
+            return 1
+        siblings = [child for child in self.parent.element_children() if child.tag == self.tag]
+        return siblings.index(self) + 1
+
+
+class Document(Element):
+    """Racine d'une page"""
+
+    def __init__(self):
+        super().__init__('#document')
+
+    def reindex(self):
+        """Renuméroter l'ordre du document après une modification"""
+        for order, node in enumerate(self.iter_descendants(), start=1):
+            node.order = order
+
+
+class _TreeBuilder(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.document = Document()
+        self.stack = [self.document]
+
+    def handle_starttag(self, tag, attrs):
+        element = Element(tag, [(name, value if value is not None else '') for name, value in attrs])
+        self.stack[-1].append_child(element)
+        if tag not in VOID_TAGS:
+            self.stack.append(element)
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_TAGS:
+            self.stack.pop()
+
+    def handle_endtag(self, tag):
+        for index in range(len(self.stack) - 1, 0, -1):
+            if self.stack[index].tag == tag:
+                del self.stack[index:]
+                return
+
+    def handle_data(self, data):
+        self.stack[-1].append_child(TextNode(data))
+
+
+def parse_html(html):
+    """Construire le document d'une page HTML"""
+    builder = _TreeBuilder()
+    builder.feed(html)
+    builder.close()
+    document = builder.document
+    document.reindex()
+    for select in (element for element in document.iter_elements() if element.tag == 'select'):
+        normalize_select(select)
+    return document
+
+
+def parse_fragment(html):
+    """Nœuds de premier niveau d'un fragment HTML"""
+    document = parse_html(html)
+    nodes = list(document.children)
+    for node in nodes:
+        node.parent = None
+    return nodes
+
+
+def serialize(node):
+    """HTML d'un nœud (attributs d'origine, sans l'état de formulaire)"""
+    if isinstance(node, TextNode):
+        return escape(node.data, quote=False)
+    inner = ''.join(serialize(child) for child in node.children)
+    if isinstance(node, Document):
+        return inner
+    attrs = ''.join(f' {name}="{escape(value)}"' for name, value in node.attrs.items())
+    if node.tag in VOID_TAGS:
+        return f"<{node.tag}{attrs}>"
+    return f"<{node.tag}{attrs}>{inner}</{node.tag}>"
+
+
+def options_of(select):
+    return [element for element in select.iter_elements() if element.tag == 'option']
+
+
+def normalize_select(select):
+    """Comme un navigateur: une liste simple a toujours exactement une option sélectionnée"""
+    if 'multiple' in select.attrs:
+        return
+    options = options_of(select)
+    chosen = [option for option in options if option.selected]
+    for option in options:
+        option.selected = False
+    if chosen:
+        chosen[-1].selected = True
+    elif options:
+        options[0].selected = True
+
+
+def option_value(option):
+    return option.attrs['value'] if 'value' in option.attrs else normalize_space(option.string_value())
+
+
+def normalize_space(text):
+    return ' '.join(text.split())
+
+
+def _style(element):
+    return element.attrs.get('style', '').replace(' ', '').lower()
+
+
+def is_visible(element):
+    """Visibilité approchée: attribut hidden, style inline, classes Bootstrap"""
+    if element.tag == 'input' and element.attrs.get('type', '').lower() == 'hidden':
+        return False
+    for node in [element] + list(element.ancestors()):
+        if isinstance(node, Document):
+            break
+        if node.tag in NON_RENDERED_TAGS or 'hidden' in node.attrs:
+            return False
+        style = _style(node)
+        if 'display:none' in style or 'visibility:hidden' in style:
+            return False
+        classes = node.classes
+        if 'd-none' in classes or 'hidden' in classes:
+            return False
+        if TOGGLED_CLASSES.intersection(classes) and 'show' not in classes and 'in' not in classes:
+            return False
+    return True
+
+
+def is_enabled(element):
+    if 'disabled' in element.attrs:
+        return False
+    return not any(node.tag == 'fieldset' and 'disabled' in node.attrs
+                   for node in element.ancestors() if isinstance(node, Element))
+
+
+def rendered_text(element):
+    """Texte visible à la manière de WebElement.text (blocs séparés par des retours à la ligne)"""
+    if not is_visible(element):
+        return ''
+    parts = []
+
+    def walk(node):
+        for child in node.children:
+            if isinstance(child, TextNode):
+                parts.append(child.data)
+            elif child.tag == 'br':
+                parts.append('\n')
+            elif child.tag in NON_RENDERED_TAGS or not is_visible(child):
+                continue
+            elif child.tag in BLOCK_TAGS:
+                parts.append('\n')
+                walk(child)
+                parts.append('\n')
+            else:
+                if child.tag in ('td', 'th'):
+                    parts.append(' ')
+                walk(child)
+
+    walk(element)
+    lines = (' '.join(line.split()) for line in ''.join(parts).split('\n'))
+    return '\n'.join(line for line in lines if line)
+
+
+# ---------------------------------------------------------------- CSS
+
+_CSS_TOKEN = re.compile(r"""
+    \s*(?P<comb>[>+~,])\s*
+  | (?P<ws>\s+)
+  | \#(?P<id>[\w-]+)
+  | \.(?P<cls>[\w-]+)
+  | \[\s*(?P<attr>[\w:-]+)\s*(?:(?P<op>[*^$~|]?=)\s*(?:"(?P<dq>[^"]*)"|'(?P<sq>[^']*)'|(?P<bare>[\w-]+))\s*)?\]
+  | :(?P<pseudo>[\w-]+)(?:\((?P<arg>(?:[^()]|\([^()]*\))*)\))?
+  | (?P<tag>\*|[\w-]+)
+""", re.VERBOSE)
+
+
+class _Compound:
+    __slots__ = ('tag', 'ids', 'classes', 'attrs', 'pseudos')
+
+    def __init__(self):
+        self.tag = None
+        self.ids = []
+        self.classes = []
+        self.attrs = []
+        self.pseudos = []
+
+    def empty(self):
+        return not (self.tag or self.ids or self.classes or self.attrs or self.pseudos)
+
+
+def parse_css(selector):
+    """Liste de sélecteurs complexes: [(combinateur, _Compound), ...] par alternative"""
+    groups = []
+    current = []
+    compound = _Compound()
+    combinator = None
+    position = 0
+    selector = selector.strip()
+
+    def flush():
+        nonlocal compound
+        if not compound.empty():
+            current.append((combinator, compound))
+        compound = _Compound()
+
+    while position < len(selector):
+        match = _CSS_TOKEN.match(selector, position)
+        if not match or match.end() == position:
+            raise XPathError(f"Sélecteur CSS non pris en charge: {selector}")
+        position = match.end()
+        if match.group('comb') is not None:
+            flush()
+            if match.group('comb') == ',':
+                groups.append(current)
+                current = []
+                combinator = None
+            else:
+                combinator = match.group('comb')
+        elif match.group('ws') is not None:
+            flush()
+            combinator = ' '
+        elif match.group('id'):
+            compound.ids.append(match.group('id'))
+        elif match.group('cls'):
+            compound.classes.append(match.group('cls'))
+        elif match.group('attr'):
+            value = next((v for v in (match.group('dq'), match.group('sq'), match.group('bare')) if v is not None), None)
+            compound.attrs.append((match.group('attr'), match.group('op'), value))
+        elif match.group('pseudo'):
+            compound.pseudos.append((match.group('pseudo'), match.group('arg')))
+        elif match.group('tag'):
+            compound.tag = match.group('tag')
+    flush()
+    groups.append(current)
+    return [[(comb if index else None, part) for index, (comb, part) in enumerate(group)] for group in groups if group]
+
+
+def _match_attr(element, name, op, value):
+    if name not in element.attrs:
+        return False
+    actual = element.attrs[name]
+    if op is None:
+        return True
+    if op == '=':
+        return actual == value
+    if op == '*=':
+        return bool(value) and value in actual
+    if op == '^=':
+        return bool(value) and actual.startswith(value)
+    if op == '$=':
+        return bool(value) and actual.endswith(value)
+    if op == '~=':
+        return value in actual.split()
+    return actual == value or actual.startswith(value + '-')
+
+
+def _match_compound(element, compound):
+    if not isinstance(element, Element) or isinstance(element, Document):
+        return False
+    if compound.tag and compound.tag != '*' and element.tag != compound.tag.lower():
+        return False
+    if any(element.attrs.get('id') != element_id for element_id in compound.ids):
+        return False
+    classes = element.classes
+    if any(cls not in classes for cls in compound.classes):
+        return False
+    if not all(_match_attr(element, *attr) for attr in compound.attrs):
+        return False
+    for name, arg in compound.pseudos:
+        siblings = element.parent.element_children() if element.parent is not None else [element]
+        if name == 'not':
+            if any(_match_complex(element, group) for group in parse_css(arg)):
+                return False
+        elif name == 'nth-of-type':
+            if element.same_type_index() != int(arg):
+                return False
+        elif name == 'nth-child':
+            if siblings.index(element) + 1 != int(arg):
+                return False
+        elif name == 'first-child':
+            if siblings[0] is not element:
+                return False
+        elif name == 'last-child':
+            if siblings[-1] is not element:
+                return False
+        elif name == 'first-of-type':
+            if element.same_type_index() != 1:
+                return False
+        elif name == 'checked':
+            if not (element.checked or element.selected):
+                return False
+        elif name == 'disabled':
+            if 'disabled' not in element.attrs:
+                return False
+        else:
+            raise XPathError(f"Pseudo-classe CSS non prise en charge: :{name}")
+    return True
+
+
+def _match_complex(element, parts):
+    """Correspondance de droite à gauche"""
+    combinator, compound = parts[-1]
+    if not _match_compound(element, compound):
+        return False
+    if len(parts) == 1:
+        return True
+    rest = parts[:-1]
+    if combinator == '>':
+        return _match_complex(element.parent, rest) if element.parent is not None else False
+    if combinator == ' ':
+        return any(_match_complex(ancestor, rest) for ancestor in element.ancestors())
+    siblings = element.parent.element_children() if element.parent is not None else []
+    previous = siblings[:siblings.index(element)] if element in siblings else []
+    if combinator == '+':
+        return bool(previous) and _match_complex(previous[-1], rest)
+    return any(_match_complex(sibling, rest) for sibling in previous)
+
+
+def css_select(scope, selector):
+    """Descendants de scope correspondant au sélecteur, dans l'ordre du document"""
+    groups = parse_css(selector)
+    return [element for element in scope.iter_elements()
+            if any(_match_complex(element, group) for group in groups)]
+
+
+# ---------------------------------------------------------------- XPath
+
+_XPATH_TOKEN = re.compile(r"""
+    \s*(?:
+      (?P<str>"[^"]*"|'[^']*')
+    | (?P<num>\d+(?:\.\d+)?|\.\d+)
+    | (?P<op>//|::|\.\.|!=|<=|>=|[/()\[\]@,|=<>*.+-])
+    | (?P<name>[A-Za-z_][\w.-]*)
+    )""", re.VERBOSE)
+
+AXES = {'child', 'descendant', 'descendant-or-self', 'parent', 'ancestor', 'ancestor-or-self',
+        'following-sibling', 'preceding-sibling', 'self', 'attribute'}
+
+REVERSE_AXES = {'parent', 'ancestor', 'ancestor-or-self', 'preceding-sibling'}
+
+
+def _tokenize(expression):
+    tokens = []
+    position = 0
+    expression = expression.strip()
+    while position < len(expression):
+        match = _XPATH_TOKEN.match(expression, position)
+        if not match or match.end() == position:
+            raise XPathError(f"XPath non pris en charge: {expression}")
+        position = match.end()
+        kind = match.lastgroup
+        tokens.append((kind, match.group(kind)))
+    return tokens
+
+
+def string_of(value):
+    if isinstance(value, list):
+        return value[0].string_value() if value else ''
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, float):
+        return str(int(value)) if value == int(value) else str(value)
+    return value
+
+
+def number_of(value):
+    if isinstance(value, float):
+        return value
+    if isinstance(value, bool):
+        return 1.0 if value else 0.0
+    try:
+        return float(string_of(value).strip())
+    except ValueError:
+        return float('nan')
+
+
+def boolean_of(value):
+    if isinstance(value, list):
+        return bool(value)
+    if isinstance(value, float):
+        return value == value and value != 0
+    if isinstance(value, bool):
+        return value
+    return bool(value)
+
+
+def _compare(op, left, right):
+    def test(a, b):
+        if op in ('=', '!='):
+            if isinstance(a, bool) or isinstance(b, bool):
+                result = boolean_of(a) == boolean_of(b)
+            elif isinstance(a, float) or isinstance(b, float):
+                result = number_of(a) == number_of(b)
+            else:
+                result = string_of(a) == string_of(b)
+            return result if op == '=' else not result
+        a, b = number_of(a), number_of(b)
+        return {'<': a < b, '>': a > b, '<=': a <= b, '>=': a >= b}[op]
+
+    if isinstance(left, list) and isinstance(right, list):
+        return any(test(a.string_value(), b.string_value()) for a in left for b in right)
+    if isinstance(left, list):
+        if isinstance(right, bool):
+            return test(boolean_of(left), right)
+        return any(test(node.string_value() if not isinstance(right, float) else number_of(node.string_value()), right)
+                   for node in left)
+    if isinstance(right, list):
+        return _compare({'<': '>', '>': '<', '<=': '>=', '>=': '<='}.get(op, op), right, left)
+    return test(left, right)
+
+
+def _sorted(nodes):
+    unique = {id(node): node for node in nodes}
+    return sorted(unique.values(), key=lambda node: (node.order, getattr(node, 'name', '')))
+
+
+def _axis(node, axis):
+    if axis == 'attribute':
+        return [Attr(name, value, node) for name, value in node.attrs.items()] if isinstance(node, Element) else []
+    if axis == 'self':
+        return [node]
+    if axis == 'parent':
+        return [node.parent] if node.parent is not None else []
+    if axis in ('ancestor', 'ancestor-or-self'):
+        chain = [node] if axis == 'ancestor-or-self' else []
+        parent = node.parent
+        while parent is not None:
+            chain.append(parent)
+            parent = parent.parent
+        return chain
+    if axis in ('following-sibling', 'preceding-sibling'):
+        if node.parent is None:
+            return []
+        siblings = node.parent.children
+        index = siblings.index(node)
+        return siblings[index + 1:] if axis == 'following-sibling' else list(reversed(siblings[:index]))
+    if not isinstance(node, Element):
+        return []
+    if axis == 'child':
+        return list(node.children)
+    if axis == 'descendant':
+        return list(node.iter_descendants())
+    return [node] + list(node.iter_descendants())
+
+
+def _node_test(node, test, axis):
+    if test == 'node()':
+        return True
+    if test == 'text()':
+        return isinstance(node, TextNode)
+    if axis == 'attribute':
+        return test == '*' or node.name == test
+    if not isinstance(node, Element) or isinstance(node, Document):
+        return False
+    return test == '*' or node.tag == test.lower()
+
+
+class _Context:
+    __slots__ = ('node', 'position', 'size')
+
+    def __init__(self, node, position=1, size=1):
+        self.node = node
+        self.position = position
+        self.size = size
+
+
+class _XPathParser:
+    """Analyseur descendant produisant des fonctions d'évaluation f(contexte)"""
+
+    def __init__(self, expression):
+        self.expression = expression
+        self.tokens = _tokenize(expression)
+        self.index = 0
+
+    def peek(self, offset=0):
+        index = self.index + offset
+        return self.tokens[index] if index < len(self.tokens) else (None, None)
+
+    def take(self, value=None):
+        token = self.peek()
+        if value is not None and token[1] != value:
+            raise XPathError(f"'{value}' attendu dans: {self.expression}")
+        self.index += 1
+        return token
+
+    def parse(self):
+        expr = self.parse_or()
+        if self.index != len(self.tokens):
+            raise XPathError(f"XPath non pris en charge: {self.expression}")
+        return expr
+
+    def _binary(self, operand, operators, combine):
+        left = operand()
+        while self.peek()[1] in operators and self.peek()[0] in ('name', 'op'):
+            operator = self.take()[1]
+            right = operand()
+            left = combine(operator, left, right)
+        return left
+
+    def parse_or(self):
+        return self._binary(self.parse_and, ('or',),
+                            lambda op, l, r: lambda ctx: boolean_of(l(ctx)) or boolean_of(r(ctx)))
+
+    def parse_and(self):
+        return self._binary(self.parse_equality, ('and',),
+                            lambda op, l, r: lambda ctx: boolean_of(l(ctx)) and boolean_of(r(ctx)))
+
+    def parse_equality(self):
+        return self._binary(self.parse_relational, ('=', '!='),
+                            lambda op, l, r: lambda ctx: _compare(op, l(ctx), r(ctx)))
+
+    def parse_relational(self):
+        return self._binary(self.parse_union, ('<', '>', '<=', '>='),
+                            lambda op, l, r: lambda ctx: _compare(op, l(ctx), r(ctx)))
+
+    def parse_union(self):
+        return self._binary(self.parse_path, ('|',),
+                            lambda op, l, r: lambda ctx: _sorted(l(ctx) + r(ctx)))
+
+    def parse_path(self):
+        kind, value = self.peek()
+        if value in ('/', '//'):
+            return self.parse_location_path(absolute=True)
+        is_primary = (kind in ('str', 'num') or value == '(' or
+                      (kind == 'name' and self.peek(1)[1] == '(' and value not in ('text', 'node')))
+        if not is_primary:
+            return self.parse_location_path(absolute=False)
+
+        primary = self.parse_primary()
+        predicates = self.parse_predicates()
+        if predicates:
+            base = primary
+
+            def primary(ctx, base=base, predicates=predicates):
+                return self.apply_predicates(base(ctx), predicates, reverse=False)
+
+        if self.peek()[1] in ('/', '//'):
+            steps = self.parse_steps()
+            return lambda ctx: self.run_steps(primary(ctx), steps)
+        return primary
+
+    def parse_primary(self):
+        kind, value = self.take()
+        if kind == 'str':
+            literal = value[1:-1]
+            return lambda ctx: literal
+        if kind == 'num':
+            number = float(value)
+            return lambda ctx: number
+        if value == '(':
+            expr = self.parse_or()
+            self.take(')')
+            return expr
+        self.take('(')
+        args = []
+        while self.peek()[1] != ')':
+            args.append(self.parse_or())
+            if self.peek()[1] == ',':
+                self.take(',')
+        self.take(')')
+        return self.function(value, args)
+
+    def function(self, name, args):
+        def arg_string(ctx, index=0):
+            return string_of(args[index](ctx)) if len(args) > index else ctx.node.string_value()
+
+        functions = {
+            'contains': lambda ctx: arg_string(ctx, 1) in arg_string(ctx, 0),
+            'starts-with': lambda ctx: arg_string(ctx, 0).startswith(arg_string(ctx, 1)),
+            'normalize-space': lambda ctx: normalize_space(arg_string(ctx)),
+            'string': lambda ctx: arg_string(ctx),
+            'string-length': lambda ctx: float(len(arg_string(ctx))),
+            'concat': lambda ctx: ''.join(string_of(arg(ctx)) for arg in args),
+            'translate': lambda ctx: _translate(arg_string(ctx, 0), arg_string(ctx, 1), arg_string(ctx, 2)),
+            'not': lambda ctx: not boolean_of(args[0](ctx)),
+            'true': lambda ctx: True,
+            'false': lambda ctx: False,
+            'boolean': lambda ctx: boolean_of(args[0](ctx)),
+            'number': lambda ctx: number_of(args[0](ctx)) if args else number_of(ctx.node.string_value()),
+            'position': lambda ctx: float(ctx.position),
+            'last': lambda ctx: float(ctx.size),
+            'count': lambda ctx: float(len(args[0](ctx))),
+            'name': lambda ctx: _node_name(args[0](ctx) if args else [ctx.node]),
+            'local-name': lambda ctx: _node_name(args[0](ctx) if args else [ctx.node]),
+        }
+        if name not in functions:
+            raise XPathError(f"Fonction XPath non prise en charge: {name}()")
+        return functions[name]
+
+    def parse_location_path(self, absolute):
+        steps = []
+        if absolute:
+            if self.peek()[1] == '//':
+                self.take()
+                steps.append(('descendant-or-self', 'node()', []))
+            else:
+                self.take()
+                if self.peek()[0] is None or self.peek()[1] in (')', ']', '|', ','):
+                    return lambda ctx: [ctx.node.root()]
+        steps.append(self.parse_step())
+        steps.extend(self.parse_steps())
+        if absolute:
+            return lambda ctx: self.run_steps([ctx.node.root()], steps)
+        return lambda ctx: self.run_steps([ctx.node], steps)
+
+    def parse_steps(self):
+        steps = []
+        while self.peek()[1] in ('/', '//'):
+            if self.take()[1] == '//':
+                steps.append(('descendant-or-self', 'node()', []))
+            steps.append(self.parse_step())
+        return steps
+
+    def parse_step(self):
+        kind, value = self.peek()
+        if value == '.':
+            self.take()
+            return ('self', 'node()', [])
+        if value == '..':
+            self.take()
+            return ('parent', 'node()', [])
+
+        axis = 'child'
+        if value == '@':
+            self.take()
+            axis = 'attribute'
+        elif kind == 'name' and self.peek(1)[1] == '::':
+            axis = self.take()[1]
+            self.take('::')
+            if axis not in AXES:
+                raise XPathError(f"Axe XPath non pris en charge: {axis}")
+
+        kind, value = self.take()
+        if value == '*':
+            test = '*'
+        elif kind == 'name' and value in ('text', 'node') and self.peek()[1] == '(':
+            self.take('(')
+            self.take(')')
+            test = f"{value}()"
+        elif kind == 'name':
+            test = value
+        else:
+            raise XPathError(f"Étape XPath non prise en charge: {self.expression}")
+        return (axis, test, self.parse_predicates())
+
+    def parse_predicates(self):
+        predicates = []
+        while self.peek()[1] == '[':
+            self.take('[')
+            predicates.append(self.parse_or())
+            self.take(']')
+        return predicates
+
+    @staticmethod
+    def apply_predicates(nodes, predicates, reverse):
+        for predicate in predicates:
+            ordered = list(reversed(nodes)) if reverse else nodes
+            size = len(ordered)
+            kept = []
+            for position, node in enumerate(ordered, start=1):
+                result = predicate(_Context(node, position, size))
+                if isinstance(result, float):
+                    if result == position:
+                        kept.append(node)
+                elif boolean_of(result):
+                    kept.append(node)
+            nodes = list(reversed(kept)) if reverse else kept
+        return nodes
+
+    def run_steps(self, nodes, steps):
+        for axis, test, predicates in steps:
+            result = []
+            for node in nodes:
+                candidates = [candidate for candidate in _axis(node, axis) if _node_test(candidate, test, axis)]
+                if axis in REVERSE_AXES:
+                    # _axis renvoie déjà l'ordre de proximité pour les axes inverses
+                    candidates = self.apply_predicates(list(reversed(candidates)), predicates, reverse=True)
+                else:
+                    candidates = self.apply_predicates(candidates, predicates, reverse=False)
+                result.extend(candidates)
+            nodes = _sorted(result)
+        return nodes
+
+
+def _translate(text, source, target):
+    table = {}
+    for index, char in enumerate(source):
+        table.setdefault(char, target[index] if index < len(target) else '')
+    return ''.join(table.get(char, char) for char in text)
+
+
+def _node_name(nodes):
+    if not nodes:
+        return ''
+    node = nodes[0]
+    return getattr(node, 'tag', None) or getattr(node, 'name', '')
+
+
+_XPATH_CACHE = {}
+
+
+def compile_xpath(expression):
+    """Compiler une expression XPath (mise en cache)"""
+    compiled = _XPATH_CACHE.get(expression)
+    if compiled is None:
+        compiled = _XPATH_CACHE[expression] = _XPathParser(expression).parse()
+    return compiled
+
+
+def xpath_select(scope, expression):
+    """Éléments sélectionnés par l'expression évaluée depuis scope"""
+    result = compile_xpath(expression)(_Context(scope))
+    if not isinstance(result, list):
+        raise XPathError(f"L'expression ne désigne pas des éléments: {expression}")
+    return [node for node in result if isinstance(node, Element) and not isinstance(node, Document)]
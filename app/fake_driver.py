@@ -0,0 +1,990 @@
+#!/usr/bin/env python3
+"""
+Driver Selenium factice en mémoire pour profiler la logique d'automatisation
+Implémente le sous-ensemble de l'API WebDriver/WebElement utilisé par le projet
+(find_element(s), text, get_attribute, click, send_keys, Select, ActionChains,
+execute_script pour les scripts connus) sur des pages HTML de test.
+Le comportement des pages est décrit par des attributs data-fake-*:
+  data-fake-show / data-fake-hide="sélecteur": afficher / masquer (classe 'show')
+  data-fake-goto="url": naviguer; data-fake-action="nom": action Python enregistrée
+  data-fake-dblclick="nom": action sur double-clic; data-fake-filter="sélecteur":
+  filtrer les lignes à la saisie; data-fake-x / data-fake-y: position de l'élément
+Une exécution complète dure quelques millisecondes: les attentes (time.sleep,
+WebDriverWait) avancent une horloge virtuelle au lieu de bloquer. FakeSatelixServer
+conserve l'état du site entre exécutions (tests pytest du dossier tests/)
+"""
+
+import os
+import sys
+import time
+import logging
+import argparse
+import tempfile
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from urllib.parse import urljoin, urlparse
+
+from selenium.webdriver.common.by import By
+from selenium.webdriver.common.keys import Keys
+from selenium.webdriver.remote.webelement import WebElement
+from selenium.common.exceptions import (NoSuchElementException, StaleElementReferenceException,
+                                        ElementNotInteractableException, InvalidSelectorException,
+                                        WebDriverException)
+
+import fake_dom
+from page_text import fold_text
+from fake_dom import XPathError
+
+
+FIXTURES_DIR = Path(__file__).parent / 'fixtures' / 'satelix'
+
+BASE_URL = 'https://satelix.test/'
+
+# PNG 1x1 transparent renvoyé par les captures d'écran
+PNG_1X1 = bytes.fromhex(
+    '89504e470d0a1a0a0000000d4948445200000001000000010806000000'
+    '1f15c4890000000d49444154789c6360000002000001e221bc330000000049454e44ae426082'
+)
+
+BOOLEAN_ATTRIBUTES = {'checked', 'selected', 'disabled', 'readonly', 'required', 'multiple', 'hidden'}
+
+NOT_FOUND_PAGE = "<html><head><title>404</title></head><body><h1>Page introuvable</h1></body></html>"
+
+
+class VirtualClock:
+    """Horloge virtuelle: time.sleep avance time.monotonic sans bloquer"""
+
+    def __init__(self):
+        self.offset = 0.0
+        self.sleeps = 0
+        self._sleep = None
+        self._monotonic = None
+
+    def sleep(self, seconds):
+        self.offset += max(float(seconds), 0.0)
+        self.sleeps += 1
+
+    def monotonic(self):
+        return self._monotonic() + self.offset
+
+    def install(self):
+        self._sleep, self._monotonic = time.sleep, time.monotonic
+        time.sleep, time.monotonic = self.sleep, self.monotonic
+        return self
+
+    def uninstall(self):
+        if self._sleep is not None:
+            time.sleep, time.monotonic = self._sleep, self._monotonic
+            self._sleep = self._monotonic = None
+
+    def __enter__(self):
+        return self.install()
+
+    def __exit__(self, *exc):
+        self.uninstall()
+
+
+class FakeSwitchTo:
+    def __init__(self, driver):
+        self._driver = driver
+
+    @property
+    def active_element(self):
+        return self._driver._wrap(self._driver.active_node or self._driver._body())
+
+
+# Clé W3C d'une référence d'élément (actions de pointeur)
+ELEMENT_KEY = 'element-6066-11e4-a52e-4f735466cecf'
+
+
+class FakeElement(WebElement):
+    """Élément d'une page factice, obsolète dès que la page est rechargée
+
+    Hérite de WebElement pour les contrôles isinstance de Selenium
+    (expected_conditions, ActionChains); les méthodes non redéfinies passent par
+    FakeDriver.execute et échouent explicitement
+    """
+
+    def __init__(self, driver, node):
+        self._parent = driver
+        self._node = node
+        self._id = f"fake-{id(node):x}"
+        driver.elements[self._id] = node
+
+    def __eq__(self, other):
+        return isinstance(other, FakeElement) and other._node is self._node
+
+    def __hash__(self):
+        return id(self._node)
+
+    def __repr__(self):
+        return f"FakeElement({self._node!r})"
+
+    @property
+    def node(self):
+        """Nœud DOM (lève StaleElementReferenceException si la page a changé)"""
+        self.parent.calls['element'] += 1
+        if self._node.root() is not self.parent.document:
+            raise StaleElementReferenceException("stale element reference: element is not attached to the page document")
+        return self._node
+
+    @property
+    def tag_name(self):
+        return self.node.tag
+
+    @property
+    def text(self):
+        return fake_dom.rendered_text(self.node)
+
+    @property
+    def location(self):
+        node = self.node
+        return {'x': int(node.attrs.get('data-fake-x', 0)), 'y': int(node.attrs.get('data-fake-y', 0))}
+
+    @property
+    def size(self):
+        return {'width': 100, 'height': 30} if fake_dom.is_visible(self.node) else {'width': 0, 'height': 0}
+
+    @property
+    def rect(self):
+        return dict(self.location, **self.size)
+
+    def get_attribute(self, name):
+        node = self.node
+        if name == 'value':
+            if node.tag == 'select':
+                chosen = [option for option in fake_dom.options_of(node) if option.selected]
+                return fake_dom.option_value(chosen[0]) if chosen else ''
+            if node.tag == 'option':
+                return fake_dom.option_value(node)
+            if node.tag in ('input', 'textarea', 'button'):
+                return node.value
+        if name == 'checked':
+            return 'true' if node.checked else None
+        if name == 'selected':
+            return 'true' if node.selected else None
+        if name == 'index' and node.tag == 'option':
+            select = next((a for a in node.ancestors() if a.tag == 'select'), None)
+            return str(fake_dom.options_of(select).index(node)) if select is not None else '0'
+        if name == 'textContent':
+            return node.string_value()
+        if name == 'innerText':
+            return fake_dom.rendered_text(node)
+        if name in ('innerHTML', 'outerHTML'):
+            html = fake_dom.serialize(node)
+            return html if name == 'outerHTML' else ''.join(fake_dom.serialize(c) for c in node.children)
+        if name == 'type' and node.tag == 'input':
+            return node.attrs.get('type', 'text').lower()
+        if name in BOOLEAN_ATTRIBUTES:
+            return 'true' if name in node.attrs else None
+        return node.attrs.get(name)
+
+    def get_dom_attribute(self, name):
+        return self.node.attrs.get(name)
+
+    def get_property(self, name):
+        if name == 'tagName':
+            return self.node.tag.upper()
+        return self.get_attribute(name)
+
+    def value_of_css_property(self, name):
+        visible = fake_dom.is_visible(self.node)
+        return {'display': 'block' if visible else 'none',
+                'visibility': 'visible' if visible else 'hidden',
+                'opacity': '1' if visible else '0'}.get(name, '')
+
+    def is_displayed(self):
+        return fake_dom.is_visible(self.node)
+
+    def is_enabled(self):
+        return fake_dom.is_enabled(self.node)
+
+    def is_selected(self):
+        node = self.node
+        return node.selected if node.tag == 'option' else node.checked
+
+    def _require_interactable(self):
+        node = self.node
+        if not fake_dom.is_visible(node):
+            raise ElementNotInteractableException("element not interactable")
+        return node
+
+    def click(self):
+        self.parent.calls['click'] += 1
+        node = self._require_interactable()
+        if fake_dom.is_enabled(node):
+            self.parent.activate(node)
+
+    def clear(self):
+        node = self._require_interactable()
+        node.value = ''
+        self.parent.input_event(node)
+
+    def send_keys(self, *values):
+        self.parent.calls['send_keys'] += 1
+        node = self._require_interactable()
+        self.parent.active_node = node
+        text = ''.join(str(value) for value in values)
+        for char in text:
+            if char in (Keys.RETURN, Keys.ENTER):
+                form = next((a for a in node.ancestors() if a.tag == 'form'), None)
+                if form is not None:
+                    self.parent.submit(form)
+                    return
+            elif char == Keys.BACKSPACE:
+                node.value = node.value[:-1]
+            elif not '\ue000' <= char <= '\uf8ff':
+                node.value += char
+        if node.tag == 'select':
+            for option in fake_dom.options_of(node):
+                option.selected = option.string_value().strip().lower().startswith(text.lower())
+            fake_dom.normalize_select(node)
+        self.parent.input_event(node)
+
+    def submit(self):
+        form = self.node if self.node.tag == 'form' else next(
+            (a for a in self.node.ancestors() if a.tag == 'form'), None)
+        if form is not None:
+            self.parent.submit(form)
+
+    def find_element(self, by=By.ID, value=None):
+        return self.parent._find_one(self.node, by, value)
+
+    def find_elements(self, by=By.ID, value=None):
+        return self.parent._find_all(self.node, by, value)
+
+    def screenshot(self, filename):
+        return self.parent.save_screenshot(filename)
+
+
+class FakeDriver:
+    """WebDriver factice: pages HTML en mémoire, état serveur modifiable par des actions"""
+
+    def __init__(self, pages=None, fixtures_dir=None, base_url=BASE_URL, actions=None, screenshots=False):
+        """
+        Args:
+            pages: {chemin d'URL: HTML} (ex: {'/login': '<html>...'})
+            fixtures_dir: dossier de pages nom.html servies sous /nom
+            actions: {nom: fonction(driver, element)} appelées par data-fake-action
+            screenshots: écrire de vraies images (PNG 1x1) lors des captures
+        """
+        self.base_url = base_url
+        self.pages = {}
+        if fixtures_dir:
+            for path in sorted(Path(fixtures_dir).glob('*.html')):
+                self.pages['/' + path.stem] = path.read_text(encoding='utf-8')
+        self.pages.update(pages or {})
+        self.actions = dict(actions or {})
+        self.screenshots = screenshots
+        self.scripts = [
+            ("querySelectorAll('table tr')", _rows_script),
+            ('locator: locate()', _locator_script),
+            ('return [el.tagName.toLowerCase()', _fingerprint_script),
+            ('scrollIntoView', _noop_script),
+            ('scrollTo', _noop_script),
+            ('navigator', _noop_script),
+            ('new MutationObserver', _text_index_script),
+            ('window.__satelixTextIndex ?', _text_index_version_script),
+            ("querySelectorAll('input, select, textarea')", _fields_script),
+            ('requestSubmit', _login_submit_script),
+        ]
+        self.elements = {}
+        self.calls = Counter()
+        self.unhandled_scripts = Counter()
+        self.state = {}
+        self.cookies = {}
+        self.document = fake_dom.Document()
+        self.current_url = 'about:blank'
+        self.history = []
+        self.active_node = None
+        self.dom_version = 0
+        self.window = {}
+        self.closed = False
+        self.session_id = 'fake-session'
+        self.capabilities = {'browserName': 'fake', 'goog:chromeOptions': {}}
+        self.switch_to = FakeSwitchTo(self)
+        self.logger = logging.getLogger(__name__)
+
+    # Configuration
+
+    def register_action(self, name, function):
+        self.actions[name] = function
+
+    def register_script(self, marker, function):
+        """Émuler un script injecté: function(driver, *arguments) si le script contient marker"""
+        self.scripts.insert(0, (marker, function))
+
+    # Navigation
+
+    def _page_key(self, url):
+        return urlparse(url).path.rstrip('/') or '/'
+
+    def get(self, url):
+        self.calls['get'] += 1
+        url = urljoin(self.current_url if self.current_url != 'about:blank' else self.base_url, url)
+        self.history.append(url)
+        self.current_url = url
+        self.document = fake_dom.parse_html(self.pages.get(self._page_key(url), NOT_FOUND_PAGE))
+        self.active_node = None
+        self.elements.clear()
+        self.window = {}
+        self.mutated()
+
+    def refresh(self):
+        self.get(self.current_url)
+
+    def back(self):
+        if len(self.history) > 1:
+            self.history.pop()
+            self.get(self.history.pop())
+
+    def persist(self):
+        """Enregistrer l'état courant de la page comme nouvel état serveur"""
+        self.pages[self._page_key(self.current_url)] = fake_dom.serialize(self.document)
+
+    @property
+    def title(self):
+        titles = fake_dom.css_select(self.document, 'title')
+        return titles[0].string_value().strip() if titles else ''
+
+    @property
+    def page_source(self):
+        return fake_dom.serialize(self.document)
+
+    def _body(self):
+        bodies = fake_dom.css_select(self.document, 'body')
+        return bodies[0] if bodies else self.document
+
+    # Recherche d'éléments
+
+    def _wrap(self, node):
+        return FakeElement(self, node)
+
+    def _select(self, scope, by, value):
+        try:
+            if by == By.XPATH:
+                return fake_dom.xpath_select(scope, value)
+            if by == By.CSS_SELECTOR:
+                return fake_dom.css_select(scope, value)
+            if by == By.ID:
+                return [n for n in scope.iter_elements() if n.attrs.get('id') == value]
+            if by == By.NAME:
+                return [n for n in scope.iter_elements() if n.attrs.get('name') == value]
+            if by == By.TAG_NAME:
+                return [n for n in scope.iter_elements() if n.tag == value.lower()]
+            if by == By.CLASS_NAME:
+                return [n for n in scope.iter_elements() if value in n.classes]
+            if by in (By.LINK_TEXT, By.PARTIAL_LINK_TEXT):
+                links = [n for n in scope.iter_elements() if n.tag == 'a']
+                if by == By.LINK_TEXT:
+                    return [n for n in links if fake_dom.rendered_text(n) == value]
+                return [n for n in links if value in fake_dom.rendered_text(n)]
+        except XPathError as e:
+            raise InvalidSelectorException(str(e))
+        raise InvalidSelectorException(f"Stratégie de recherche inconnue: {by}")
+
+    def _find_all(self, scope, by, value):
+        self.calls['find_elements'] += 1
+        return [self._wrap(node) for node in self._select(scope, by, value)]
+
+    def _find_one(self, scope, by, value):
+        self.calls['find_element'] += 1
+        nodes = self._select(scope, by, value)
+        if not nodes:
+            raise NoSuchElementException(f"no such element: {by}={value}")
+        return self._wrap(nodes[0])
+
+    def find_element(self, by=By.ID, value=None):
+        return self._find_one(self.document, by, value)
+
+    def find_elements(self, by=By.ID, value=None):
+        return self._find_all(self.document, by, value)
+
+    # Comportement des pages
+
+    def mutated(self):
+        """Signaler une modification du DOM (compteur des MutationObserver émulés)"""
+        self.dom_version += 1
+
+    def _toggle(self, selector, show):
+        self.mutated()
+        for node in fake_dom.css_select(self.document, selector):
+            classes = [cls for cls in node.classes if cls != 'show']
+            if show:
+                classes.append('show')
+            node.attrs['class'] = ' '.join(classes)
+
+    def _run_action(self, name, node):
+        action = self.actions.get(name)
+        if action is None:
+            raise WebDriverException(f"Action de page factice inconnue: {name}")
+        action(self, self._wrap(node))
+
+    def activate(self, node):
+        """Effet d'un clic sur un élément"""
+        self.active_node = node
+        if node.tag == 'label':
+            target = None
+            if node.attrs.get('for'):
+                target = next((n for n in self.document.iter_elements() if n.attrs.get('id') == node.attrs['for']), None)
+            if target is None:
+                target = next((n for n in node.iter_elements() if n.tag in ('input', 'select', 'textarea')), None)
+            if target is not None:
+                self.activate(target)
+            return
+
+        input_type = node.attrs.get('type', '').lower()
+        if node.tag == 'input' and input_type == 'checkbox':
+            node.checked = not node.checked
+            return
+        if node.tag == 'input' and input_type == 'radio':
+            for other in self.document.iter_elements():
+                if other.tag == 'input' and other.attrs.get('name') == node.attrs.get('name'):
+                    other.checked = False
+            node.checked = True
+            return
+        if node.tag == 'option':
+            select = next((a for a in node.ancestors() if a.tag == 'select'), None)
+            if select is not None and 'multiple' not in select.attrs:
+                for option in fake_dom.options_of(select):
+                    option.selected = False
+            node.selected = not node.selected if select is not None and 'multiple' in select.attrs else True
+            return
+
+        behaviours = [name for name in ('data-fake-action', 'data-fake-show', 'data-fake-hide', 'data-fake-goto')
+                      if name in node.attrs]
+        if 'data-fake-action' in node.attrs:
+            self._run_action(node.attrs['data-fake-action'], node)
+        if 'data-fake-show' in node.attrs:
+            self._toggle(node.attrs['data-fake-show'], True)
+        if 'data-fake-hide' in node.attrs:
+            self._toggle(node.attrs['data-fake-hide'], False)
+        if 'data-fake-goto' in node.attrs:
+            self.get(node.attrs['data-fake-goto'])
+        if behaviours:
+            return
+
+        href = node.attrs.get('href')
+        if node.tag == 'a' and href and not href.startswith('#') and not href.startswith('javascript:'):
+            self.get(href)
+            return
+
+        is_submit = ((node.tag == 'button' and input_type in ('', 'submit')) or
+                     (node.tag == 'input' and input_type == 'submit'))
+        form = next((a for a in node.ancestors() if a.tag == 'form'), None)
+        if is_submit and form is not None:
+            self.submit(form)
+
+    def double_click(self, node):
+        """Effet d'un double-clic: action data-fake-dblclick de l'élément ou d'un ancêtre"""
+        for candidate in [node] + list(node.ancestors()):
+            if isinstance(candidate, fake_dom.Element) and 'data-fake-dblclick' in candidate.attrs:
+                self._run_action(candidate.attrs['data-fake-dblclick'], candidate)
+                return
+
+    def submit(self, form):
+        if 'data-fake-action' in form.attrs:
+            self._run_action(form.attrs['data-fake-action'], form)
+        elif form.attrs.get('data-fake-goto') or form.attrs.get('action'):
+            self.get(form.attrs.get('data-fake-goto') or form.attrs['action'])
+
+    def input_event(self, node):
+        """Filtrage des lignes à la saisie (zones de recherche data-fake-filter)"""
+        selector = node.attrs.get('data-fake-filter')
+        if not selector:
+            return
+        needle = node.value.strip().lower()
+        for row in fake_dom.css_select(self.document, selector):
+            style = row.attrs.get('style', '').replace('display:none;', '')
+            if needle and needle not in row.string_value().lower():
+                style = 'display:none;' + style
+            row.attrs['style'] = style
+        self.mutated()
+
+    # API WebDriver diverse
+
+    def execute_script(self, script, *args):
+        self.calls['execute_script'] += 1
+        nodes = [arg.node if isinstance(arg, FakeElement) else arg for arg in args]
+        for marker, function in self.scripts:
+            if marker in script:
+                return self._unwrap_result(function(self, *nodes))
+        self.unhandled_scripts[script.strip().splitlines()[0][:80]] += 1
+        self.logger.debug("Script non émulé ignoré: %s", script.strip()[:80])
+        return None
+
+    execute_async_script = execute_script
+
+    def _unwrap_result(self, value):
+        if isinstance(value, fake_dom.Element):
+            return self._wrap(value)
+        if isinstance(value, list):
+            return [self._unwrap_result(item) for item in value]
+        if isinstance(value, dict):
+            return {key: self._unwrap_result(item) for key, item in value.items()}
+        return value
+
+    def execute(self, command, params=None):
+        """Commandes W3C brutes: seules les actions de pointeur (ActionChains) sont émulées"""
+        self.calls['execute'] += 1
+        if command == 'actions':
+            self._perform_actions(params or {})
+            return {'value': None}
+        if command == 'releaseActions':
+            return {'value': None}
+        raise WebDriverException(f"Commande non émulée par le driver factice: {command}")
+
+    def _perform_actions(self, params):
+        for device in params.get('actions', []):
+            target = None
+            clicks = 0
+            for action in device.get('actions', []):
+                origin = action.get('origin')
+                if action.get('type') == 'pointerMove' and isinstance(origin, dict) and ELEMENT_KEY in origin:
+                    target = self.elements.get(origin[ELEMENT_KEY])
+                elif action.get('type') == 'pointerUp' and target is not None:
+                    clicks += 1
+            if target is None:
+                continue
+            if clicks >= 2:
+                self.double_click(target)
+            elif clicks == 1:
+                self.activate(target)
+
+    def save_screenshot(self, filename):
+        self.calls['screenshot'] += 1
+        if self.screenshots:
+            Path(filename).write_bytes(PNG_1X1)
+        return True
+
+    get_screenshot_as_file = save_screenshot
+
+    def get_screenshot_as_png(self):
+        return PNG_1X1
+
+    def get_cookies(self):
+        return list(self.cookies.values())
+
+    def get_cookie(self, name):
+        return self.cookies.get(name)
+
+    def add_cookie(self, cookie):
+        self.cookies[cookie['name']] = dict(cookie)
+
+    def delete_all_cookies(self):
+        self.cookies.clear()
+
+    def implicitly_wait(self, seconds):
+        pass
+
+    def set_page_load_timeout(self, seconds):
+        pass
+
+    def set_window_size(self, width, height, windowHandle='current'):
+        pass
+
+    def maximize_window(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def quit(self):
+        self.closed = True
+
+
+# Émulation des scripts injectés par le projet
+
+def _noop_script(driver, *args):
+    return None
+
+
+def _rows_script(driver, *args):
+    """ROWS_SCRIPT (inventory_table): cellules de chaque ligne en un aller-retour"""
+    rows = fake_dom.css_select(driver.document, 'table tr')
+    return [{
+        'index': index,
+        'cells': [fake_dom.rendered_text(cell) or fake_dom.normalize_space(cell.string_value())
+                  for cell in fake_dom.css_select(row, 'td')],
+        'dataId': row.attrs.get('data-id') or row.attrs.get('id') or None
+    } for index, row in enumerate(rows)]
+
+
+def _unique(driver, selector, node):
+    try:
+        found = fake_dom.css_select(driver.document, selector)
+    except XPathError:
+        return False
+    return len(found) == 1 and found[0] is node
+
+
+def _locator_script(driver, node):
+    """LOCATOR_SCRIPT (replay): localisateur CSS unique et empreinte d'un élément"""
+    locator = None
+    if node.attrs.get('id') and _unique(driver, '#' + node.attrs['id'], node):
+        locator = '#' + node.attrs['id']
+    elif node.attrs.get('name') and _unique(driver, f"{node.tag}[name=\"{node.attrs['name']}\"]", node):
+        locator = f"{node.tag}[name=\"{node.attrs['name']}\"]"
+    else:
+        parts = []
+        current = node
+        while isinstance(current, fake_dom.Element) and not isinstance(current, fake_dom.Document):
+            parts.insert(0, f"{current.tag}:nth-of-type({current.same_type_index()})")
+            if _unique(driver, ' > '.join(parts), node):
+                locator = ' > '.join(parts)
+                break
+            current = current.parent
+    return {'locator': locator, 'tag': node.tag,
+            'text': (fake_dom.rendered_text(node) or node.value).strip()[:60]}
+
+
+TEXT_INDEX_SELECTOR = ("button, a, label, span, [role='button'], .btn, input[type='submit'], "
+                       "input[type='button'], input[type='checkbox'], input[type='radio']")
+
+
+def _text_index_version_script(driver, *args):
+    """VERSION_SCRIPT (page_text)"""
+    return driver.dom_version if driver.window.get('text_index') else None
+
+
+def _text_index_script(driver, *args):
+    """INDEX_SCRIPT (page_text): éléments cliquables et libellés, texte normalisé"""
+    driver.window['text_index'] = True
+    entries = []
+    for node in fake_dom.css_select(driver.document, TEXT_INDEX_SELECTOR):
+        input_type = node.attrs.get('type', '').lower()
+        checkable = node.tag == 'input' and input_type in ('checkbox', 'radio')
+        visible = fake_dom.is_visible(node)
+        raw = node.value if node.tag == 'input' else (
+            fake_dom.rendered_text(node) if visible else node.string_value())
+        text = fold_text(raw)
+        if len(text) > 120 or (not text and not checkable and not node.attrs.get('title')):
+            continue
+        control = None
+        label = node if node.tag == 'label' else next((a for a in node.ancestors() if a.tag == 'label'), None)
+        if label is not None and node.tag in ('label', 'span'):
+            if label.attrs.get('for'):
+                control = next((n for n in driver.document.iter_elements()
+                                if n.attrs.get('id') == label.attrs['for']), None)
+            if control is None:
+                control = next((n for n in label.iter_elements() if n.tag == 'input'), None)
+        elif node.tag == 'span' and node.parent is not None:
+            control = next((n for n in node.parent.iter_elements()
+                            if n.tag == 'input' and n.attrs.get('type') == 'checkbox'), None)
+        if control is not None and control.attrs.get('type', '').lower() != 'checkbox':
+            control = None
+        entries.append({
+            'element': node, 'text': text, 'tag': node.tag, 'type': input_type,
+            'name': node.attrs.get('name', ''), 'id': node.attrs.get('id', ''),
+            'title': fold_text(node.attrs.get('title')), 'cls': node.attrs.get('class', ''),
+            'visible': visible, 'enabled': fake_dom.is_enabled(node),
+            'checked': node.checked if checkable else None, 'control': control,
+            'context': fold_text(fake_dom.rendered_text(node.parent)) if checkable and node.parent is not None else ''
+        })
+    return {'version': driver.dom_version, 'url': driver.current_url, 'entries': entries}
+
+
+def _label_text(labels):
+    return ' '.join(fake_dom.normalize_space(label.string_value()) for label in labels)
+
+
+def _fields_script(driver, *args):
+    """FIELDS_SCRIPT (field_finder): champs du formulaire avec libellés et indices"""
+    fields = []
+    for node in fake_dom.css_select(driver.document, 'input, select, textarea'):
+        input_type = node.attrs.get('type', '').lower()
+        if input_type in ('hidden', 'submit', 'button'):
+            continue
+        labels = [n for n in driver.document.iter_elements()
+                  if n.tag == 'label' and node.attrs.get('id') and n.attrs.get('for') == node.attrs['id']]
+        labels += [a for a in node.ancestors() if a.tag == 'label']
+        if not labels and node.parent is not None:
+            siblings = node.parent.element_children()
+            position = siblings.index(node)
+            if position and siblings[position - 1].tag == 'label' and not siblings[position - 1].attrs.get('for'):
+                labels = [siblings[position - 1]]
+        if not labels:
+            group = next((a for a in node.ancestors() if 'form-group' in a.classes), None)
+            group_label = next((n for n in group.iter_elements()
+                                if n.tag == 'label' and not n.attrs.get('for')), None) if group else None
+            if group_label is not None and node not in group_label.iter_elements():
+                labels = [group_label]
+        aria = node.attrs.get('aria-label', '')
+        for ref in node.attrs.get('aria-labelledby', '').split():
+            aria += ' ' + ''.join(n.string_value() for n in driver.document.iter_elements() if n.attrs.get('id') == ref)
+        fields.append({
+            'element': node, 'tag': node.tag, 'type': input_type,
+            'name': node.attrs.get('name', ''), 'id': node.attrs.get('id', ''),
+            'label': fold_text(_label_text(labels)), 'aria': fold_text(aria),
+            'placeholder': fold_text(node.attrs.get('placeholder')), 'title': fold_text(node.attrs.get('title')),
+            'cls': node.attrs.get('class', ''), 'visible': fake_dom.is_visible(node),
+            'enabled': fake_dom.is_enabled(node) and 'readonly' not in node.attrs
+        })
+    return fields
+
+
+def _login_submit_script(driver, user_selector, password_selector, username, password):
+    """SUBMIT_SCRIPT (login_flow): saisie des identifiants et soumission native du formulaire"""
+    user = next(iter(fake_dom.css_select(driver.document, user_selector)), None)
+    secret = next(iter(fake_dom.css_select(driver.document, password_selector)), None)
+    if user is None or secret is None:
+        return {'submitted': False, 'reason': 'champs de connexion absents'}
+    form = next((a for a in secret.ancestors() if a.tag == 'form'), None)
+    if form is None:
+        return {'submitted': False, 'reason': 'formulaire absent'}
+    url = driver.current_url
+    user.value, secret.value = username, password
+    driver.submit(form)
+    return {'submitted': True, 'url': url}
+
+
+def _fingerprint_script(driver, node):
+    """FINGERPRINT_SCRIPT (replay)"""
+    return [node.tag, (fake_dom.rendered_text(node) or node.value).strip()[:60]]
+
+
+# Site Satelix factice (pages de fixtures/satelix)
+
+def _form_of(element):
+    node = element.node
+    return node if node.tag == 'form' else next(a for a in node.ancestors() if a.tag == 'form')
+
+
+def _field(form, name):
+    return next((n for n in form.iter_elements() if n.attrs.get('name') == name), None)
+
+
+def _selected_text(select):
+    chosen = [option for option in fake_dom.options_of(select) if option.selected]
+    return fake_dom.normalize_space(chosen[0].string_value()) if chosen else ''
+
+
+def _display_date(value):
+    """Date saisie dans un champ HTML5 (AAAA-MM-JJ) au format affiché dans la liste"""
+    try:
+        return datetime.strptime(value.strip(), '%Y-%m-%d').strftime('%d/%m/%Y')
+    except ValueError:
+        return value.strip()
+
+
+def _satelix_login(driver, element):
+    form = _form_of(element)
+    if _field(form, 'login').value and _field(form, 'password').value:
+        driver.add_cookie({'name': 'SESSION', 'value': 'fake'})
+        driver.get('/accueil')
+
+
+def _satelix_create(driver, element):
+    """Ajouter l'inventaire saisi en tête de la liste (état serveur)"""
+    form = _form_of(element)
+    raw_date = _field(form, 'date_inventaire').value
+    date_str = _display_date(raw_date)
+    if not date_str:
+        return
+    driver.state['created'] = driver.state.get('created', 0) + 1
+    row_id = f"inv-new-{driver.state['created']}"
+    row_html = (f'<tr data-id="{row_id}" data-fake-dblclick="editer_inventaire">'
+                f'<td>{_field(form, "intitule").value or "Inventaire"}</td><td>{date_str}</td>'
+                f'<td>{_selected_text(_field(form, "depot"))}</td>'
+                '<td><a class="btn btn-sm btn-primary" data-fake-action="editer_inventaire">Modifier</a></td></tr>')
+    tbody = fake_dom.css_select(driver.document, '#inventaires tbody')[0]
+    for row in reversed(fake_dom.parse_fragment(row_html)):
+        row.parent = tbody
+        tbody.children.insert(0, row)
+    driver._toggle('#modal-creation', False)
+    driver.document.reindex()
+    driver.mutated()
+    driver.persist()
+
+
+def _satelix_edit(driver, element):
+    """Ouvrir la modale d'édition de la ligne (double-clic ou bouton Modifier)"""
+    node = element.node
+    row = node if node.tag == 'tr' else next(a for a in node.ancestors() if a.tag == 'tr')
+    driver.state['editing'] = row.attrs.get('data-id')
+    cells = fake_dom.css_select(row, 'td')
+    field = fake_dom.css_select(driver.document, "#modal-edition input[name='date_edition']")[0]
+    shown = fake_dom.normalize_space(cells[1].string_value()) if len(cells) > 1 else ''
+    try:
+        field.value = datetime.strptime(shown, '%d/%m/%Y').strftime('%Y-%m-%d')
+    except ValueError:
+        field.value = ''
+    driver._toggle('#modal-edition', True)
+
+
+def _satelix_save_edit(driver, element):
+    form = _form_of(element)
+    new_date = _display_date(_field(form, 'date_edition').value)
+    for row in fake_dom.css_select(driver.document, '#inventaires tbody tr'):
+        if row.attrs.get('data-id') == driver.state.get('editing'):
+            cell = fake_dom.css_select(row, 'td')[1]
+            cell.children = [fake_dom.TextNode(new_date, cell)]
+    driver._toggle('#modal-edition', False)
+    driver.document.reindex()
+    driver.mutated()
+    driver.persist()
+
+
+SATELIX_ACTIONS = {
+    'connexion': _satelix_login,
+    'creer_inventaire': _satelix_create,
+    'editer_inventaire': _satelix_edit,
+    'enregistrer_inventaire': _satelix_save_edit,
+}
+
+
+def satelix_driver(fixtures_dir=FIXTURES_DIR, screenshots=False):
+    """Driver factice servant le site Satelix de test"""
+    return FakeDriver(fixtures_dir=fixtures_dir, actions=SATELIX_ACTIONS, screenshots=screenshots)
+
+
+# Environnement d'une exécution sur le site factice: pas de requête HTTP ni de résolution DNS réelles
+FAKE_ENV = {
+    'SATELIX_URL_LOGIN': urljoin(BASE_URL, '/login'),
+    'SATELIX_URL_INVENTAIRES': urljoin(BASE_URL, '/inventaires'),
+    'SATELIX_USER': 'test',
+    'SATELIX_PASSWORD': 'test',
+    'RETENTION_AFTER_RUN': 'false',
+    'BROWSER_BACKEND': 'selenium',
+    'PREFLIGHT': 'false',
+    'DNS_PINNING': 'false',
+}
+
+
+class FakeSatelixServer:
+    """Site Satelix factice dont l'état (pages persistées, créations) survit d'une exécution à l'autre"""
+
+    INVENTORY_ROW = ('<tr data-id="{id}" data-fake-dblclick="editer_inventaire"><td>{intitule}</td>'
+                     '<td>{date}</td><td>DEPOT</td><td><a class="btn btn-sm btn-primary" '
+                     'data-fake-action="editer_inventaire">Modifier</a></td></tr>')
+
+    def __init__(self, fixtures_dir=FIXTURES_DIR):
+        self.fixtures_dir = fixtures_dir
+        self.pages = satelix_driver(fixtures_dir).pages
+        self.state = {}
+        self.drivers = []
+
+    @property
+    def created(self):
+        """Nombre d'inventaires créés sur le serveur"""
+        return self.state.get('created', 0)
+
+    def driver(self):
+        """Nouveau navigateur connecté au serveur"""
+        driver = satelix_driver(self.fixtures_dir)
+        driver.pages = self.pages
+        driver.state = self.state
+        self.drivers.append(driver)
+        return driver
+
+    def set_inventories(self, dates, sort_attrs=None, intitule='Inventaire filtres'):
+        """Remplacer les lignes de la liste (dates DD/MM/YYYY, dans l'ordre affiché)
+
+        sort_attrs: attributs de l'en-tête de la colonne Date (défaut: aria-sort="descending")
+        """
+        document = fake_dom.parse_html(self.pages['/inventaires'])
+        header = fake_dom.xpath_select(document, "//table[@id='inventaires']//th[normalize-space(.)='Date']")[0]
+        header.attrs = dict(sort_attrs if sort_attrs is not None else {'aria-sort': 'descending'})
+        tbody = fake_dom.css_select(document, '#inventaires tbody')[0]
+        rows = ''.join(self.INVENTORY_ROW.format(id=f'inv-{index}', intitule=intitule, date=date)
+                       for index, date in enumerate(dates, start=1))
+        tbody.children = []
+        for row in fake_dom.parse_fragment(rows):
+            row.parent = tbody
+            tbody.children.append(row)
+        self.pages['/inventaires'] = fake_dom.serialize(document)
+
+    def inventory_dates(self):
+        """Dates affichées dans la liste, dans l'ordre"""
+        document = fake_dom.parse_html(self.pages['/inventaires'])
+        return [fake_dom.normalize_space(fake_dom.css_select(row, 'td')[1].string_value())
+                for row in fake_dom.css_select(document, '#inventaires tbody tr')]
+
+    def updater_class(self):
+        """Parcours séquentiel dont le navigateur est un driver factice connecté à ce serveur"""
+        from selenium.webdriver.support.ui import WebDriverWait
+        from satelix_simple import SatelixInventoryDateUpdater
+
+        server = self
+
+        class FakeSatelixUpdater(SatelixInventoryDateUpdater):
+            def setup_driver(self):
+                self.driver = server.driver()
+                self.browser = None
+                self.wait = WebDriverWait(self.driver, self.timeout)
+                self.logger.info("Driver factice initialisé")
+                return True
+
+        return FakeSatelixUpdater
+
+
+def profile_flow(args):
+    """Exécuter le flux complet sur le site factice, éventuellement sous cProfile"""
+    import cProfile
+    import pstats
+
+    # Dossier de travail isolé: points de reprise, disjoncteur et parcours enregistrés
+    workdir = Path(tempfile.mkdtemp(prefix='satelix_fake_'))
+    os.chdir(workdir)
+    (workdir / 'logs').mkdir()
+    os.environ.update(FAKE_ENV)
+
+    handlers = [logging.FileHandler(workdir / 'logs' / 'satelix_update_inventory_dates.log', encoding='utf-8')]
+    if args.verbose:
+        handlers.append(logging.StreamHandler(sys.stdout))
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s',
+                        handlers=handlers)
+
+    # Site neuf à chaque exécution (tout le parcours de création est rejoué), préparé hors mesure
+    servers = [FakeSatelixServer(args.fixtures) for _ in range(args.runs)]
+    updaters = [server.updater_class() for server in servers]
+    profiler = cProfile.Profile() if args.profile else None
+    results = []
+    with VirtualClock() as clock:
+        started = time.perf_counter()
+        for index in range(args.runs):
+            # Une date différente par exécution pour rejouer tout le parcours de création
+            target = datetime.strptime(args.date, '%d/%m/%Y') if args.date else datetime.now()
+            target = target.replace(day=1 + index % 28) if args.runs > 1 else target
+            updater = updaters[index](target)
+            if profiler:
+                profiler.enable()
+            code = updater.run(update_all=args.all, days_range=args.days)
+            if profiler:
+                profiler.disable()
+            results.append(code)
+        elapsed = time.perf_counter() - started
+
+    drivers = [driver for server in servers for driver in server.drivers]
+    calls = sum((driver.calls for driver in drivers), Counter())
+    unhandled = sum((driver.unhandled_scripts for driver in drivers), Counter())
+    print(f"{args.runs} exécution(s) en {elapsed * 1000:.0f} ms - codes de sortie: {results}")
+    print(f"Attente simulée: {clock.offset:.1f} s ({clock.sleeps} appels à time.sleep)")
+    print("Commandes WebDriver: " + ', '.join(f"{name}={count}" for name, count in calls.most_common()))
+    if unhandled:
+        print("Scripts non émulés: " + ', '.join(f"{script!r} x{count}" for script, count in unhandled.items()))
+    print(f"Logs: {workdir / 'logs'}")
+    if profiler:
+        pstats.Stats(profiler, stream=sys.stdout).sort_stats(args.sort).print_stats(args.top)
+    return 0 if all(code == 0 for code in results) else 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Profilage du flux d'automatisation sur un Satelix factice")
+    parser.add_argument('--date', help="Date cible DD/MM/YYYY (défaut: aujourd'hui)")
+    parser.add_argument('--runs', type=int, default=1, help="Nombre d'exécutions (défaut: 1)")
+    parser.add_argument('--all', action='store_true', help="Mise à jour groupée de tous les inventaires")
+    parser.add_argument('--days', type=int, help="Mise à jour groupée des N derniers jours")
+    parser.add_argument('--fixtures', default=str(FIXTURES_DIR), help="Dossier des pages HTML de test")
+    parser.add_argument('--profile', action='store_true', help="Profiler avec cProfile")
+    parser.add_argument('--sort', default='cumulative', help="Tri du profil (défaut: cumulative)")
+    parser.add_argument('--top', type=int, default=30, help="Nombre de fonctions affichées (défaut: 30)")
+    parser.add_argument('-v', '--verbose', action='store_true', help="Afficher les logs de l'exécution")
+    args = parser.parse_args()
+    args.fixtures = str(Path(args.fixtures).resolve())
+    return profile_flow(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Découverte des champs de formulaire Satelix
+Un seul script relève tous les champs (input, select, textarea) avec leur libellé,
+placeholder, nom ARIA, name/id et classes. Les candidats sont notés en Python contre
+le profil du champ recherché (intitulé, date, dépôt...) et classés; chaque note est
+accompagnée des indices qui l'expliquent, repris dans les logs
+"""
+
+import re
+import logging
+
+from selenium.common.exceptions import WebDriverException
+
+from page_text import fold_text
+
+
+FIELDS_SCRIPT = """
+function fold(text) {
+    return (text || '').normalize('NFD').replace(/[\\u0300-\\u036f]/g, '')
+        .toLowerCase().replace(/\\s+/g, ' ').trim();
+}
+function textOf(nodes) {
+    return Array.prototype.map.call(nodes, function (node) { return node.innerText || node.textContent; }).join(' ');
+}
+var fields = [];
+document.querySelectorAll('input, select, textarea').forEach(function (el) {
+    var type = (el.getAttribute('type') || '').toLowerCase();
+    if (type === 'hidden' || type === 'submit' || type === 'button') {
+        return;
+    }
+    // Libellé: label[for] ou englobant, sinon label frère précédent, sinon label du groupe
+    var label = el.labels && el.labels.length ? textOf(el.labels) : '';
+    if (!label) {
+        var previous = el.previousElementSibling;
+        if (previous && previous.tagName === 'LABEL' && !previous.htmlFor) {
+            label = textOf([previous]);
+        }
+    }
+    if (!label) {
+        var group = el.closest('.form-group');
+        var groupLabel = group && group.querySelector('label:not([for])');
+        label = groupLabel && !groupLabel.contains(el) ? textOf([groupLabel]) : '';
+    }
+    var aria = el.getAttribute('aria-label') || '';
+    var labelledBy = el.getAttribute('aria-labelledby');
+    if (labelledBy) {
+        aria += ' ' + labelledBy.split(/\\s+/).map(function (id) {
+            var ref = document.getElementById(id);
+            return ref ? ref.textContent : '';
+        }).join(' ');
+    }
+    var style = window.getComputedStyle(el);
+    fields.push({
+        element: el,
+        tag: el.tagName.toLowerCase(),
+        type: type,
+        name: el.getAttribute('name') || '',
+        id: el.id || '',
+        label: fold(label),
+        aria: fold(aria),
+        placeholder: fold(el.getAttribute('placeholder')),
+        title: fold(el.getAttribute('title')),
+        cls: el.getAttribute('class') || '',
+        visible: !!(el.offsetWidth || el.offsetHeight || el.getClientRects().length) &&
+                 style.visibility !== 'hidden',
+        enabled: !el.disabled && !el.readOnly && !el.closest('fieldset[disabled]')
+    });
+});
+return fields;
+"""
+
+TEXT_TYPES = ('', 'text', 'search')
+
+# Poids des indices: un libellé visible vaut plus qu'une classe CSS
+SOURCE_WEIGHTS = (
+    ('label', 3), ('aria', 3), ('placeholder', 2), ('name', 2), ('id', 2), ('title', 1), ('cls', 1),
+)
+
+# Profil de chaque champ: balises et types acceptés, mots-clés (sans accents) et leur poids
+FIELD_PROFILES = {
+    'intitule': {
+        'tags': ('input', 'textarea'), 'types': TEXT_TYPES,
+        'keywords': {'intitule': 4, 'titre': 3, 'libelle': 3, 'designation': 2, 'title': 2, 'nom': 2},
+    },
+    'date': {
+        'tags': ('input',), 'types': ('date',) + TEXT_TYPES,
+        'keywords': {'date': 4, 'inventaire': 1},
+        'type_bonus': {'date': 6},
+    },
+    'depot': {
+        'tags': ('select',),
+        'keywords': {'depot': 4, 'magasin': 3, 'location': 2},
+    },
+    'valorisation': {
+        'tags': ('select',),
+        'keywords': {'valorisation': 4, 'valuation': 3, 'type': 1},
+    },
+}
+
+MIN_SCORE = 4
+
+# Indices trop faibles pour écarter les sélecteurs de repli s'ils sont les seuls
+WEAK_SOURCES = ('cls',)
+
+CAMEL_CASE = re.compile(r'([a-z0-9])([A-Z])')
+WORD_SEPARATORS = re.compile(r'[^a-z0-9]+')
+
+
+def words(text):
+    """Mots d'un libellé ou d'un identifiant (séparateurs, camelCase), sans accents ni majuscules"""
+    return set(WORD_SEPARATORS.split(fold_text(CAMEL_CASE.sub(r'\1 \2', text or '')))) - {''}
+
+
+def has_word(text_words, keyword):
+    """Mot entier, au singulier ou au pluriel: 'nom' ne correspond pas à 'nombre'"""
+    return keyword in text_words or keyword + 's' in text_words or keyword + 'x' in text_words
+
+
+def field_profile(field_type):
+    """Profil du champ; un type inconnu est cherché par son propre nom dans les champs texte"""
+    return FIELD_PROFILES.get(field_type) or {
+        'tags': ('input', 'textarea'), 'types': TEXT_TYPES, 'keywords': {fold_text(field_type): 4},
+    }
+
+
+class FieldCandidate:
+    """Champ relevé par le script, avec sa note et les indices qui la justifient"""
+
+    __slots__ = ('element', 'tag', 'type', 'name', 'id', 'label', 'aria', 'placeholder',
+                 'title', 'cls', 'visible', 'enabled', 'score', 'reasons', 'sources')
+
+    def __init__(self, data):
+        for slot in self.__slots__:
+            setattr(self, slot, data.get(slot))
+        self.score = 0
+        self.reasons = []
+        self.sources = set()
+
+    def __repr__(self):
+        return f"FieldCandidate({self.tag}, name={self.name!r}, score={self.score})"
+
+    @property
+    def usable(self):
+        return bool(self.visible and self.enabled)
+
+    @property
+    def weak(self):
+        """Note fondée uniquement sur des classes CSS"""
+        return self.sources <= set(WEAK_SOURCES)
+
+    def describe(self):
+        """Résumé lisible pour les logs: identité du champ, note et indices"""
+        identity = f"<{self.tag}{' type=' + self.type if self.type else ''}> name='{self.name}' id='{self.id}'"
+        if self.label:
+            identity += f" label='{self.label}'"
+        if self.placeholder:
+            identity += f" placeholder='{self.placeholder}'"
+        return f"{identity} note={self.score} ({', '.join(self.reasons)})"
+
+
+class FieldFinder:
+    """Classement des champs du formulaire courant pour un type de champ recherché"""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.logger = logging.getLogger(__name__)
+
+    def snapshot(self):
+        """Champs de la page en un aller-retour; None si le script ne peut pas être exécuté"""
+        try:
+            result = self.driver.execute_script(FIELDS_SCRIPT)
+        except WebDriverException as e:
+            self.logger.debug("Relevé des champs indisponible: %s", str(e))
+            return None
+        if not isinstance(result, list):
+            return None
+        return [FieldCandidate(data) for data in result if isinstance(data, dict)]
+
+    def rank(self, field_type, fields=None):
+        """Champs utilisables classés par note décroissante (au moins MIN_SCORE); None si indisponible"""
+        if fields is None:
+            fields = self.snapshot()
+            if fields is None:
+                return None
+
+        profile = field_profile(field_type)
+        ranked = []
+        for candidate in fields:
+            if not candidate.usable or candidate.tag not in profile['tags']:
+                continue
+            if 'types' in profile and candidate.tag == 'input' and candidate.type not in profile['types']:
+                continue
+            score, reasons, sources = self._score(candidate, profile)
+            if score >= MIN_SCORE:
+                candidate.score, candidate.reasons, candidate.sources = score, reasons, sources
+                ranked.append(candidate)
+
+        # Tri stable: à note égale, l'ordre du document est conservé
+        ranked.sort(key=lambda candidate: candidate.score, reverse=True)
+        return ranked
+
+    @staticmethod
+    def _score(candidate, profile):
+        score = 0
+        reasons = []
+        sources = set()
+        source_words = {source: words(getattr(candidate, source)) for source, _ in SOURCE_WEIGHTS}
+        for keyword, weight in profile['keywords'].items():
+            for source, source_weight in SOURCE_WEIGHTS:
+                if has_word(source_words[source], keyword):
+                    score += weight * source_weight
+                    reasons.append(f"{source}={keyword} +{weight * source_weight}")
+                    sources.add(source)
+        bonus = profile.get('type_bonus', {}).get(candidate.type)
+        if bonus:
+            score += bonus
+            reasons.append(f"type={candidate.type} +{bonus}")
+            sources.add('type')
+        return score, reasons, sources
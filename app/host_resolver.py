@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Résolution du serveur Satelix épinglée avant le lancement du navigateur
+Le nom du serveur (sql-industrie) est résolu une fois, avec un délai borné, puis
+mémorisé dans logs/dns_cache.json avec une durée de validité. En cas d'échec DNS,
+la dernière adresse valide est réutilisée. Chrome reçoit l'adresse par
+--host-resolver-rules et ne résout plus le nom lui-même; une connexion TCP d'essai
+vérifie l'adresse épinglée (et amorce la route réseau) avant la première page
+"""
+
+import os
+import json
+import time
+import socket
+import logging
+import ipaddress
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from datetime import datetime
+from pathlib import Path
+from urllib.parse import urlparse
+
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+
+class HostResolver:
+    """Résolution avec cache TTL et dernière adresse valide, règles Chrome et préconnexion"""
+
+    def __init__(self, url, cache_file=None, ttl=300, timeout=3.0):
+        parsed = urlparse(url or '')
+        self.host = parsed.hostname
+        self.port = parsed.port or DEFAULT_PORTS.get(parsed.scheme, 80)
+        self.cache_file = Path(cache_file or Path('logs') / 'dns_cache.json')
+        self.ttl = ttl
+        self.timeout = timeout
+        self.ip = None
+        self.source = None
+        self.logger = logging.getLogger(__name__)
+
+    @classmethod
+    def from_env(cls, url):
+        """Résolveur configuré par le fichier .env; None si l'épinglage est désactivé"""
+        if os.getenv('DNS_PINNING', 'true').lower() != 'true' or not url:
+            return None
+        return cls(url, ttl=int(os.getenv('DNS_CACHE_TTL', '300')), timeout=float(os.getenv('DNS_TIMEOUT', '3')))
+
+    @property
+    def is_literal(self):
+        """L'URL contient déjà une adresse IP (rien à résoudre)"""
+        try:
+            ipaddress.ip_address(self.host or '')
+            return True
+        except ValueError:
+            return False
+
+    def load_cache(self):
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return cache if isinstance(cache, dict) else {}
+
+    def save_cache(self, cache):
+        self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = self.cache_file.with_suffix('.tmp')
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(cache, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_file, self.cache_file)
+
+    def _lookup(self):
+        """Résolution IPv4 bornée par self.timeout (getaddrinfo n'a pas de délai propre)"""
+        executor = ThreadPoolExecutor(max_workers=1)
+        try:
+            future = executor.submit(socket.getaddrinfo, self.host, self.port, socket.AF_INET, socket.SOCK_STREAM)
+            return future.result(timeout=self.timeout)[0][4][0]
+        finally:
+            # Ne pas attendre un appel DNS bloqué: le thread se termine seul
+            executor.shutdown(wait=False)
+
+    def resolve(self, force=False):
+        """Adresse IP du serveur (cache valide, résolution, puis dernière adresse connue); None si inconnue"""
+        if not self.host:
+            return None
+        if self.is_literal:
+            self.ip, self.source = self.host, 'adresse'
+            return self.ip
+
+        cache = self.load_cache()
+        entry = cache.get(self.host) or {}
+        if not force and entry.get('ip') and time.time() - entry.get('resolved_at', 0) < self.ttl:
+            self.ip, self.source = entry['ip'], 'cache'
+            return self.ip
+
+        started = time.monotonic()
+        try:
+            ip = self._lookup()
+        except (OSError, FutureTimeout) as e:
+            if entry.get('ip'):
+                self.logger.warning("Résolution DNS de %s impossible (%s), dernière adresse valide utilisée: %s "
+                                    "(du %s)", self.host, str(e) or 'délai dépassé', entry['ip'],
+                                    entry.get('resolved_on', '?'))
+                self.ip, self.source = entry['ip'], 'derniere_valide'
+                return self.ip
+            self.logger.error("Résolution DNS de %s impossible: %s", self.host, str(e) or 'délai dépassé')
+            return None
+
+        self.logger.info("Résolution DNS: %s → %s (%.0f ms)", self.host, ip, (time.monotonic() - started) * 1000)
+        cache[self.host] = {'ip': ip, 'resolved_at': time.time(),
+                            'resolved_on': datetime.now().isoformat(timespec='seconds')}
+        try:
+            self.save_cache(cache)
+        except OSError as e:
+            self.logger.warning("Cache DNS non enregistré: %s", str(e))
+        self.ip, self.source = ip, 'dns'
+        return ip
+
+    def chrome_arguments(self):
+        """Arguments Chrome épinglant le serveur sur l'adresse résolue"""
+        if not self.ip or self.is_literal:
+            return []
+        return [f'--host-resolver-rules=MAP {self.host} {self.ip}']
+
+    def connect(self, ip=None, timeout=None):
+        """Connexion TCP d'essai vers l'adresse; durée en secondes, None si injoignable"""
+        started = time.monotonic()
+        try:
+            with socket.create_connection((ip or self.ip, self.port), timeout=timeout or self.timeout):
+                return time.monotonic() - started
+        except OSError:
+            return None
+
+    def prewarm(self):
+        """Vérifier l'adresse épinglée; une adresse en cache injoignable est résolue à nouveau"""
+        if not self.ip:
+            return None
+        elapsed = self.connect()
+        if elapsed is None and self.source in ('cache', 'derniere_valide'):
+            previous = self.ip
+            if self.resolve(force=True) and self.ip != previous:
+                self.logger.warning("Adresse %s injoignable, nouvelle adresse de %s: %s", previous, self.host, self.ip)
+                elapsed = self.connect()
+        if elapsed is None:
+            self.logger.warning("Connexion TCP d'essai vers %s:%d (%s) impossible", self.host, self.port, self.ip)
+        else:
+            self.logger.info("Connexion TCP d'essai vers %s:%d en %.0f ms", self.ip, self.port, elapsed * 1000)
+        return elapsed
@@ -0,0 +1,401 @@
+#!/usr/bin/env python3
+"""
+Lecture de la liste des inventaires Satelix
+Les inventaires sont décrits par des localisateurs stables plutôt que par
+des WebElement, qui deviennent obsolètes à chaque actualisation de la page
+"""
+
+import time
+import logging
+from datetime import datetime
+from selenium.webdriver.common.by import By
+from selenium.common.exceptions import NoSuchElementException, StaleElementReferenceException, WebDriverException
+
+
+ACTION_BUTTON_SELECTOR = "button, a.btn, .btn, [class*='btn']"
+
+# Contrôles "page suivante" des tables paginées (Bootstrap, DataTables, libellés français)
+NEXT_PAGE_SELECTORS = [
+    (By.CSS_SELECTOR, "a[rel='next']"),
+    (By.CSS_SELECTOR, ".pagination li.next:not(.disabled) a, .pagination .page-item.next:not(.disabled) a"),
+    (By.CSS_SELECTOR, ".dataTables_paginate .next:not(.disabled)"),
+    (By.CSS_SELECTOR, "[aria-label='Next']:not([disabled]), [aria-label='Suivant']:not([disabled])"),
+    (By.XPATH, "//*[contains(@class, 'pagination')]//a[normalize-space(.)='›' or normalize-space(.)='»'"
+               " or normalize-space(.)='Suivant']")
+]
+
+# Lecture des lignes d'une page en un seul aller-retour
+ROWS_SCRIPT = """
+return Array.from(document.querySelectorAll('table tr')).map(function (row, index) {
+    return {
+        index: index,
+        cells: Array.from(row.querySelectorAll('td')).map(function (cell) { return cell.innerText.trim(); }),
+        dataId: row.getAttribute('data-id') || row.id || null
+    };
+});
+"""
+
+
+class InventoryRecord:
+    """Inventaire repéré dans la page, résolu à la demande"""
+
+    __slots__ = ('date', 'date_str', 'source', 'by', 'locator', 'index',
+                 'data_id', 'cell_index', 'action_locator', 'page')
+
+    def __init__(self, date, date_str, source, by, locator, index=0,
+                 data_id=None, cell_index=None, action_locator=None, page=1):
+        """
+        Args:
+            date: date de l'inventaire (datetime)
+            date_str: date au format DD/MM/YYYY telle qu'affichée
+            source: stratégie de découverte ('table', 'table_secondaire', 'carte', 'edition')
+            by, locator, index: localisateur de la ligne (index dans find_elements)
+            data_id: identifiant data-id / id de la ligne s'il existe (prioritaire)
+            cell_index: position de la cellule contenant la date dans la ligne
+            action_locator: (by, locator, index) d'un élément d'action hors de la ligne
+            page: page de la table où la ligne a été lue (1 = première page)
+        """
+        self.date = date
+        self.date_str = date_str
+        self.source = source
+        self.by = by
+        self.locator = locator
+        self.index = index
+        self.data_id = data_id
+        self.cell_index = cell_index
+        self.action_locator = action_locator
+        self.page = page
+
+    def __repr__(self):
+        return f"InventoryRecord({self.date_str!r}, source={self.source!r}, locator={self.locator!r}[{self.index}])"
+
+    def _find_nth(self, driver, by, locator, index):
+        elements = driver.find_elements(by, locator)
+        return elements[index] if index < len(elements) else None
+
+    def row(self, driver):
+        """Résoudre l'élément ligne (ou carte) de l'inventaire, None s'il a disparu"""
+        try:
+            if self.data_id:
+                try:
+                    return driver.find_element(By.XPATH, f"//*[@data-id='{self.data_id}' or @id='{self.data_id}']")
+                except NoSuchElementException:
+                    pass
+
+            element = self._find_nth(driver, self.by, self.locator, self.index)
+            if element is not None and self.date_str in element.text:
+                return element
+
+            # La liste a été réordonnée: retrouver la ligne par sa date
+            if self.source.startswith('table'):
+                rows = driver.find_elements(
+                    By.XPATH, f"//table//tr[td[normalize-space(.)='{self.date_str}']]")
+                if rows:
+                    return rows[0]
+            return element
+        except StaleElementReferenceException:
+            return None
+
+    def date_element(self, driver):
+        """Résoudre la cellule contenant la date"""
+        row = self.row(driver)
+        if row is None or self.cell_index is None:
+            return row
+        cells = row.find_elements(By.CSS_SELECTOR, "td")
+        return cells[self.cell_index] if self.cell_index < len(cells) else row
+
+    def action_button(self, driver):
+        """Résoudre le bouton d'action de l'inventaire, None s'il n'y en a pas"""
+        if self.action_locator:
+            return self._find_nth(driver, *self.action_locator)
+
+        row = self.row(driver)
+        if row is None:
+            return None
+        try:
+            return row.find_element(By.CSS_SELECTOR, ACTION_BUTTON_SELECTOR)
+        except NoSuchElementException:
+            return None
+
+
+class InventoryTableReader:
+    """Lecture paresseuse de la table des inventaires, page par page"""
+
+    def __init__(self, driver, reset_page=None, scroll_wait=2.0):
+        """
+        Args:
+            driver: driver Selenium positionné sur la page Inventaires
+            reset_page: fonction ramenant la table à sa première page
+            scroll_wait: attente maximale (s) de nouvelles lignes en défilement infini
+        """
+        self.driver = driver
+        self.reset_page = reset_page
+        self.scroll_wait = scroll_wait
+        self.current_page = 1
+        self.logger = logging.getLogger(__name__)
+
+    def _read_rows(self):
+        """Lire (index, cellules, data-id) de toutes les lignes de la page"""
+        try:
+            rows = self.driver.execute_script(ROWS_SCRIPT)
+        except WebDriverException:
+            rows = None
+
+        if isinstance(rows, list):
+            return [(row['index'], row['cells'], row.get('dataId')) for row in rows]
+
+        # Repli sans JavaScript: une requête par ligne
+        result = []
+        for index, row in enumerate(self.driver.find_elements(By.CSS_SELECTOR, "table tr")):
+            cells = [cell.text.strip() for cell in row.find_elements(By.CSS_SELECTOR, "td")]
+            result.append((index, cells, row.get_attribute('data-id') or row.get_attribute('id') or None))
+        return result
+
+    def iter_page(self, start_index=1):
+        """Produire les inventaires de la page affichée, à partir de la ligne start_index"""
+        for index, cells, data_id in self._read_rows():
+            if index < start_index or len(cells) < 2:
+                continue
+
+            for cell_index, cell_text in enumerate(cells):
+                if '/' in cell_text and len(cell_text) == 10:  # Format DD/MM/YYYY
+                    try:
+                        inventory_date = datetime.strptime(cell_text, '%d/%m/%Y')
+                    except ValueError:
+                        continue
+                    yield InventoryRecord(
+                        inventory_date, cell_text, 'table',
+                        By.XPATH, f"(//table//tr)[{index + 1}]",
+                        data_id=data_id, cell_index=cell_index, page=self.current_page
+                    )
+                    break
+
+    def row_count(self):
+        """Nombre de lignes actuellement présentes dans le DOM"""
+        return len(self.driver.find_elements(By.CSS_SELECTOR, "table tr"))
+
+    def first_cell_text(self):
+        """Texte de la première cellule de la table (repère de changement de page)"""
+        try:
+            cells = self.driver.find_elements(By.CSS_SELECTOR, "table tr td")
+            return cells[0].text if cells else None
+        except StaleElementReferenceException:
+            return None
+
+    def next_page(self):
+        """Passer à la page suivante; retourne 'pagination', 'scroll' ou False en fin de liste"""
+        for by_type, selector in NEXT_PAGE_SELECTORS:
+            try:
+                controls = [c for c in self.driver.find_elements(by_type, selector) if c.is_displayed()]
+            except WebDriverException:
+                continue
+            if not controls:
+                continue
+
+            marker = self.first_cell_text()
+            controls[0].click()
+            self.current_page += 1
+            # Attendre le remplacement des lignes de la page précédente
+            deadline = time.monotonic() + self.scroll_wait
+            while time.monotonic() < deadline and self.first_cell_text() == marker:
+                time.sleep(0.1)
+            self.logger.info("Page %d de la liste des inventaires", self.current_page)
+            return 'pagination'
+
+        # Défilement infini: de nouvelles lignes apparaissent en bas de la table
+        before = self.row_count()
+        self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+        deadline = time.monotonic() + self.scroll_wait
+        while time.monotonic() < deadline:
+            if self.row_count() > before:
+                self.current_page += 1
+                self.logger.info("Lignes supplémentaires chargées par défilement (lot %d)", self.current_page)
+                return 'scroll'
+            time.sleep(0.2)
+        return False
+
+    def iter_inventories(self, max_pages=None):
+        """Parcourir paresseusement toutes les pages; l'appelant peut s'arrêter à tout moment"""
+        start_index = 1  # La première ligne est l'en-tête
+        while True:
+            yield from self.iter_page(start_index)
+
+            if max_pages and self.current_page >= max_pages:
+                return
+
+            rows_before = self.row_count()
+            mode = self.next_page()
+            if not mode:
+                return
+            # En défilement infini, les lignes déjà lues restent dans le DOM
+            start_index = rows_before if mode == 'scroll' else 1
+
+    def show_page(self, page):
+        """Afficher la page d'une ligne lue précédemment (pour la relocaliser)"""
+        if page < self.current_page:
+            if self.reset_page is None or not self.reset_page():
+                return False
+            self.current_page = 1
+        while self.current_page < page:
+            if not self.next_page():
+                return False
+        return True
+
+
+# Zone de recherche de la liste (DataTables, champs "Rechercher" / "Filtrer")
+SEARCH_BOX_SELECTORS = [
+    "input[type='search']",
+    ".dataTables_filter input",
+    "input[placeholder*='Rechercher']",
+    "input[placeholder*='echercher']",
+    "input[placeholder*='Filtrer']",
+    "input[aria-label*='Rechercher']"
+]
+
+# Filtre de date au-dessus de la liste (hors formulaires de création/édition)
+DATE_FILTER_SELECTORS = [
+    "[class*='filter'] input[type='date']",
+    "[class*='filtre'] input[type='date']",
+    "thead input[type='date']",
+    "[class*='filter'] input[name*='date']",
+    "[class*='filtre'] input[name*='date']"
+]
+
+# Classes de tri de l'en-tête (DataTables, Bootstrap Table, grilles maison), comparées mot à mot
+SORT_DESC_CLASSES = {'desc', 'sorting_desc', 'sorted-desc', 'sort-desc'}
+SORT_ASC_CLASSES = {'asc', 'sorting_asc', 'sorted-asc', 'sort-asc'}
+
+
+class InventoryQuery:
+    """Restreint la liste côté serveur (recherche, filtre de date, tri) avant lecture"""
+
+    def __init__(self, driver, reader, settle_wait=2.0):
+        """
+        Args:
+            driver: driver Selenium positionné sur la page Inventaires
+            reader: InventoryTableReader utilisé pour détecter le rafraîchissement de la table
+            settle_wait: attente maximale (s) de la mise à jour de la table après une saisie
+        """
+        self.driver = driver
+        self.reader = reader
+        self.settle_wait = settle_wait
+        self.logger = logging.getLogger(__name__)
+        self.reset_state()
+
+    def reset_state(self):
+        """Oublier les critères appliqués (après rechargement de la page)"""
+        self.applied_search = None
+        self.applied_date = None
+        self.sorted_desc = None
+
+    def _visible_input(self, selectors):
+        """Premier champ visible, en privilégiant une modale ouverte (liste des archivés)"""
+        for scope in (".modal.show ", ""):
+            for selector in selectors:
+                try:
+                    fields = self.driver.find_elements(By.CSS_SELECTOR, scope + selector)
+                except WebDriverException:
+                    continue
+                for field in fields:
+                    if field.is_displayed() and field.is_enabled():
+                        return field
+        return None
+
+    def _wait_table_update(self, marker):
+        """Attendre que la première ligne de la table change"""
+        deadline = time.monotonic() + self.settle_wait
+        while time.monotonic() < deadline:
+            if self.reader.first_cell_text() != marker:
+                return True
+            time.sleep(0.1)
+        return False
+
+    def _type_into(self, field, value):
+        marker = self.reader.first_cell_text()
+        field.clear()
+        field.send_keys(value)
+        self._wait_table_update(marker)
+        self.reader.current_page = 1
+
+    def search(self, text):
+        """Saisir un texte dans la zone de recherche de la liste; False si absente"""
+        if self.applied_search == text:
+            return True
+        field = self._visible_input(SEARCH_BOX_SELECTORS)
+        if field is None:
+            return False
+        self._type_into(field, text)
+        self.applied_search = text
+        self.logger.info("Recherche appliquée à la liste: '%s'", text)
+        return True
+
+    def filter_date(self, date):
+        """Renseigner le filtre de date de la liste; False s'il est absent"""
+        date_str = date.strftime('%d/%m/%Y')
+        if self.applied_date == date_str:
+            return True
+        field = self._visible_input(DATE_FILTER_SELECTORS)
+        if field is None:
+            return False
+        value = date.strftime('%Y-%m-%d') if field.get_attribute('type') == 'date' else date_str
+        self._type_into(field, value)
+        self.applied_date = date_str
+        self.logger.info("Filtre de date appliqué à la liste: %s", date_str)
+        return True
+
+    def _date_header(self):
+        headers = self.driver.find_elements(
+            By.XPATH, "//table//th[contains(translate(normalize-space(.), 'DATE', 'date'), 'date')]")
+        return headers[0] if headers else None
+
+    def _page_is_descending(self, header):
+        """Sens du tri annoncé par l'en-tête (aria-sort, classe entière); None s'il n'est pas indiqué"""
+        aria = (header.get_attribute('aria-sort') or '').lower()
+        if aria in ('descending', 'ascending'):
+            return aria == 'descending'
+        classes = set((header.get_attribute('class') or '').lower().split())
+        if classes & SORT_DESC_CLASSES:
+            return True
+        if classes & SORT_ASC_CLASSES:
+            return False
+        return None
+
+    def sort_newest_first(self):
+        """Trier la colonne de date du plus récent au plus ancien; True si l'en-tête confirme le tri"""
+        if self.sorted_desc is not None:
+            return self.sorted_desc
+
+        header = self._date_header()
+        self.sorted_desc = False
+        if header is None:
+            return False
+
+        for attempt in range(3):
+            descending = self._page_is_descending(header)
+            if descending:
+                self.sorted_desc = True
+                self.logger.info("Liste triée par date décroissante")
+                break
+            if descending is None and attempt > 0:
+                # En-tête sans indicateur de tri même après un clic: ordre inconnu, lecture complète
+                self.logger.debug("Sens du tri de la liste non confirmé")
+                break
+            marker = self.reader.first_cell_text()
+            header.click()
+            self._wait_table_update(marker)
+            self.reader.current_page = 1
+            header = self._date_header()
+            if header is None:
+                break
+
+        return self.sorted_desc
+
+    def narrow(self, date=None, text=None):
+        """Appliquer les critères disponibles; True si la liste a été restreinte côté serveur"""
+        narrowed = date is not None and self.filter_date(date)
+        if text:
+            narrowed = self.search(text) or narrowed
+        elif date is not None and not narrowed:
+            # Sans filtre de date, la recherche plein texte sur la date restreint la liste
+            narrowed = self.search(date.strftime('%d/%m/%Y'))
+        return narrowed
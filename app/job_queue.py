@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+File d'attente locale des créations d'inventaire empêchées par une panne
+Une exécution qui trouve Satelix injoignable (serveur, VPN, DNS) enregistre sa date
+et son dépôt dans logs/job_queue.db au lieu d'être perdue. Une surveillance par
+sondes légères (DNS, TCP puis requête HTTP sur la page de connexion, espacées de
+plus en plus tant que la panne dure) détecte le retour du serveur; les travaux en
+attente sont alors exécutés par date croissante, dans la même session de rattrapage
+"""
+
+import os
+import sys
+import time
+import sqlite3
+import logging
+import argparse
+from datetime import datetime
+from pathlib import Path
+from dotenv import load_dotenv
+
+from host_resolver import HostResolver
+from preflight import probe_login_page
+
+
+PENDING = 'en_attente'
+DONE = 'termine'
+ABANDONED = 'abandonne'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    target_date TEXT NOT NULL,
+    depot TEXT NOT NULL DEFAULT '',
+    intitule TEXT,
+    status TEXT NOT NULL,
+    attempts INTEGER DEFAULT 0,
+    reason TEXT,
+    enqueued_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    PRIMARY KEY (target_date, depot)
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status, target_date);
+"""
+
+
+class QueuedJob:
+    """Création d'inventaire en attente: date, dépôt explicite et intitulé éventuels"""
+
+    __slots__ = ('target_date', 'depot', 'intitule', 'attempts', 'reason', 'enqueued_at')
+
+    def __init__(self, target_date, depot=None, intitule=None, attempts=0, reason=None, enqueued_at=None):
+        self.target_date = target_date
+        self.depot = depot
+        self.intitule = intitule
+        self.attempts = attempts
+        self.reason = reason
+        self.enqueued_at = enqueued_at
+
+    @property
+    def label(self):
+        date_str = self.target_date.strftime('%d/%m/%Y')
+        return f"{date_str} ({self.depot})" if self.depot else date_str
+
+
+class JobQueue:
+    """Travaux persistés dans SQLite (une ligne par date et dépôt)"""
+
+    def __init__(self, db_path=None, max_attempts=None):
+        """Initialisation à partir du fichier .env"""
+        load_dotenv()
+
+        self.logger = logging.getLogger(__name__)
+        self.db_path = Path(db_path or os.getenv('OFFLINE_QUEUE_DB', Path('logs') / 'job_queue.db'))
+        self.max_attempts = max_attempts or int(os.getenv('OFFLINE_QUEUE_MAX_ATTEMPTS', '3'))
+
+    def _connect(self):
+        # Connexion courte par opération: le planificateur et les exécutions partagent la base
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(self.db_path), timeout=10)
+        conn.executescript(SCHEMA)
+        return conn
+
+    def _execute(self, sql, params=()):
+        conn = self._connect()
+        try:
+            with conn:
+                cursor = conn.execute(sql, params)
+                return cursor.fetchall() if cursor.description else cursor.rowcount
+        finally:
+            conn.close()
+
+    def enqueue(self, target_date, depot=None, intitule=None, reason=None):
+        """Mettre une création en attente; False si elle l'était déjà"""
+        now = datetime.now().isoformat(timespec='seconds')
+        key = (target_date.strftime('%Y-%m-%d'), depot or '')
+        existing = self._execute("SELECT status FROM jobs WHERE target_date = ? AND depot = ?", key)
+        if existing and existing[0][0] == PENDING:
+            self._execute("UPDATE jobs SET reason = ?, updated_at = ? WHERE target_date = ? AND depot = ?",
+                          (reason, now) + key)
+            return False
+        # Travail terminé ou abandonné demandé à nouveau: compteur remis à zéro
+        self._execute(
+            "INSERT OR REPLACE INTO jobs (target_date, depot, intitule, status, attempts, reason, enqueued_at, "
+            "updated_at) VALUES (?, ?, ?, ?, 0, ?, ?, ?)",
+            key + (intitule, PENDING, reason, now, now))
+        return True
+
+    def pending(self):
+        """Travaux en attente, du plus ancien au plus récent"""
+        rows = self._execute(
+            "SELECT target_date, depot, intitule, attempts, reason, enqueued_at FROM jobs "
+            "WHERE status = ? ORDER BY target_date, depot", (PENDING,))
+        return [QueuedJob(datetime.strptime(target_date, '%Y-%m-%d'), depot or None, intitule, attempts,
+                          reason, enqueued_at)
+                for target_date, depot, intitule, attempts, reason, enqueued_at in rows]
+
+    def complete(self, target_date, depot=None):
+        """Retirer un travail abouti (par la file ou par une exécution normale); True s'il était en attente"""
+        return self._execute(
+            "UPDATE jobs SET status = ?, updated_at = ? WHERE target_date = ? AND depot = ? AND status = ?",
+            (DONE, datetime.now().isoformat(timespec='seconds'), target_date.strftime('%Y-%m-%d'),
+             depot or '', PENDING)) > 0
+
+    def record_failure(self, job, reason):
+        """Compter un échec non lié à la connectivité; True si le travail est abandonné"""
+        attempts = job.attempts + 1
+        status = ABANDONED if attempts >= self.max_attempts else PENDING
+        self._execute(
+            "UPDATE jobs SET attempts = ?, status = ?, reason = ?, updated_at = ? WHERE target_date = ? AND depot = ?",
+            (attempts, status, reason, datetime.now().isoformat(timespec='seconds'),
+             job.target_date.strftime('%Y-%m-%d'), job.depot or ''))
+        job.attempts = attempts
+        return status == ABANDONED
+
+    def flush(self, runner=None):
+        """Exécuter les travaux en attente par date croissante; retourne le nombre de travaux aboutis
+
+        runner(job) retourne (code de sortie, serveur injoignable, verrou occupé). La vidange
+        s'arrête dès que le serveur redevient injoignable ou qu'une autre exécution est en cours;
+        tout autre code non nul compte comme un échec du travail.
+        """
+        runner = runner or run_queued_job
+        jobs = self.pending()
+        if not jobs:
+            return 0
+
+        self.logger.info("Vidange de la file d'attente: %d création(s) en attente (%s)", len(jobs),
+                         ', '.join(job.label for job in jobs))
+        done = 0
+        for index, job in enumerate(jobs):
+            exit_code, offline, lock_busy = runner(job)
+            if exit_code == 0:
+                # Création aboutie ou inventaire déjà présent
+                self.complete(job.target_date, job.depot)
+                done += 1
+                continue
+            if offline:
+                self.logger.warning("Serveur de nouveau injoignable, vidange interrompue (%d restant(s))",
+                                    len(jobs) - index)
+                break
+            if lock_busy:
+                self.logger.info("Exécution déjà en cours, vidange reportée")
+                break
+            if self.record_failure(job, f"code de sortie {exit_code}"):
+                self.logger.error("Création du %s abandonnée après %d échec(s)", job.label, job.attempts)
+            else:
+                self.logger.warning("Création du %s en échec (%d/%d), maintenue dans la file",
+                                    job.label, job.attempts, self.max_attempts)
+        return done
+
+    def print_status(self):
+        """Afficher le contenu de la file"""
+        rows = self._execute("SELECT target_date, depot, status, attempts, reason, updated_at FROM jobs "
+                             "ORDER BY target_date, depot")
+        if not rows:
+            print("File d'attente vide")
+            return
+        for target_date, depot, status, attempts, reason, updated_at in rows:
+            date_str = datetime.strptime(target_date, '%Y-%m-%d').strftime('%d/%m/%Y')
+            print(f"{date_str} {depot or '-':<12} {status:<11} {attempts} essai(s)  {updated_at}  {reason or ''}")
+
+
+class ConnectivityWatcher:
+    """Sondes espacées de la page de connexion; l'intervalle double tant que le serveur est injoignable"""
+
+    def __init__(self, url, poll_seconds=None, max_poll_seconds=None, timeout=None):
+        load_dotenv()
+
+        self.logger = logging.getLogger(__name__)
+        self.url = url
+        self.poll_seconds = poll_seconds or int(os.getenv('OFFLINE_QUEUE_POLL', '60'))
+        self.max_poll_seconds = max_poll_seconds or int(os.getenv('OFFLINE_QUEUE_MAX_POLL', '900'))
+        self.timeout = timeout or float(os.getenv('PREFLIGHT_TIMEOUT', '3'))
+        self.resolver = HostResolver.from_env(url)
+        self.interval = self.poll_seconds
+        self.next_check = 0.0
+        self.reachable = None
+
+    def due(self):
+        return time.monotonic() >= self.next_check
+
+    def check(self):
+        """Sonder le serveur et planifier la sonde suivante; retourne le ProbeResult"""
+        probe = probe_login_page(self.url, self.timeout, self.resolver)
+        if probe.ok:
+            if self.reachable is False:
+                self.logger.info("Serveur Satelix de nouveau accessible (%s)", probe.detail)
+            self.interval = self.poll_seconds
+        else:
+            if self.reachable is not False:
+                self.logger.warning("Serveur Satelix injoignable: %s", probe.detail)
+            self.interval = min(self.interval * 2, self.max_poll_seconds) if self.reachable is False \
+                else self.poll_seconds
+        self.reachable = probe.ok
+        self.next_check = time.monotonic() + self.interval
+        return probe
+
+    def wait(self):
+        """Attendre que le serveur soit accessible"""
+        while not self.check().ok:
+            self.logger.debug("Serveur injoignable, prochaine sonde dans %d s", self.interval)
+            time.sleep(self.interval)
+
+
+def run_queued_job(job):
+    """Exécuter un travail de la file (parcours séquentiel); retourne (code, injoignable, verrou occupé)"""
+    from satelix_simple import SatelixInventoryDateUpdater
+
+    updater = SatelixInventoryDateUpdater(job.target_date, depot=job.depot, intitule=job.intitule)
+    exit_code = updater.run()
+    return exit_code, updater.offline, updater.lock_busy
+
+
+def main():
+    """Point d'entrée en ligne de commande"""
+    parser = argparse.ArgumentParser(description="File d'attente des créations d'inventaire hors ligne")
+    parser.add_argument('--add', help="Mettre en attente une ou plusieurs dates (DD/MM/YYYY[,DD/MM/YYYY...])")
+    parser.add_argument('--depot', help="Dépôt des dates ajoutées (défaut: INVENTAIRE_DEPOT)")
+    parser.add_argument('--flush', action='store_true',
+                        help="Exécuter les travaux en attente si le serveur est accessible")
+    parser.add_argument('--watch', action='store_true',
+                        help="Attendre le retour du serveur puis exécuter les travaux, jusqu'à vider la file")
+    args = parser.parse_args()
+
+    from satelix_simple import configure_logging
+    load_dotenv()
+    configure_logging()
+
+    queue = JobQueue()
+    if args.add:
+        try:
+            dates = [datetime.strptime(item.strip(), '%d/%m/%Y') for item in args.add.split(',') if item.strip()]
+        except ValueError:
+            print("Erreur: Format de date invalide. Utilisez DD/MM/YYYY[,DD/MM/YYYY...]")
+            return 1
+        for target_date in dates:
+            queue.enqueue(target_date, args.depot, reason="ajout manuel")
+
+    if not (args.flush or args.watch):
+        queue.print_status()
+        return 0
+
+    watcher = ConnectivityWatcher(os.getenv('SATELIX_URL_LOGIN'))
+    while queue.pending():
+        if args.watch:
+            watcher.wait()
+        elif not watcher.check().ok:
+            return 2
+        queue.flush()
+        if not args.watch:
+            break
+        if queue.pending():
+            time.sleep(watcher.interval)
+    return 0 if not queue.pending() else 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Verrous fichiers inter-processus pour Satelix
+Empêche deux exécutions concurrentes d'utiliser les mêmes ressources
+"""
+
+import os
+import json
+from datetime import datetime
+from pathlib import Path
+
+
+def pid_alive(pid):
+    """Vérifier si un processus existe encore"""
+    if not pid or pid <= 0:
+        return False
+
+    if os.name == 'nt':
+        # os.kill terminerait le processus sous Windows: passer par OpenProcess
+        import ctypes
+        handle = ctypes.windll.kernel32.OpenProcess(0x1000, False, pid)
+        if not handle:
+            return False
+        ctypes.windll.kernel32.CloseHandle(handle)
+        return True
+
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class FileLock:
+    """Verrou exclusif basé sur un fichier contenant le PID du détenteur"""
+
+    def __init__(self, path):
+        """Initialisation avec le chemin du fichier verrou"""
+        self.path = Path(path)
+        self.acquired = False
+
+    def owner(self):
+        """Retourner les informations du détenteur actuel (ou None)"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def acquire(self):
+        """Prendre le verrou; retourne False s'il est détenu par un processus vivant"""
+        if self.acquired:
+            return True
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        for _ in range(2):
+            try:
+                fd = os.open(str(self.path), os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileExistsError:
+                owner = self.owner()
+                if owner and pid_alive(owner.get('pid')):
+                    return False
+                # Verrou orphelin (processus mort ou fichier illisible)
+                try:
+                    self.path.unlink()
+                except OSError:
+                    return False
+                continue
+
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump({'pid': os.getpid(), 'since': datetime.now().isoformat(timespec='seconds')}, f)
+            self.acquired = True
+            return True
+
+        return False
+
+    def release(self):
+        """Libérer le verrou s'il est détenu par ce processus"""
+        if not self.acquired:
+            return
+        try:
+            owner = self.owner()
+            if owner is None or owner.get('pid') == os.getpid():
+                self.path.unlink()
+        except OSError:
+            pass
+        self.acquired = False
+
+    def __enter__(self):
+        return self.acquire()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
+        return False
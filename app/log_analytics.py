@@ -0,0 +1,443 @@
+#!/usr/bin/env python3
+"""
+Historique analytique des exécutions Satelix
+Ingestion incrémentale de satelix_update_inventory_dates.log dans une base
+SQLite (exécutions, étapes, incidents) et rapports de tendance
+"""
+
+import os
+import re
+import sys
+import sqlite3
+import argparse
+from datetime import datetime
+from pathlib import Path
+
+
+LOG_LINE = re.compile(r'^(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}),(\d{3}) - ([A-Z]+) - (.*)$')
+
+# Début d'exécution: ligne d'initialisation, ou bannière seule pour les anciens logs
+RUN_START = "Initialisation terminée"
+RUN_BANNER = "=== DÉBUT DE LA MISE À JOUR"
+RUN_END = ("Driver fermé proprement", "Erreur lors de la fermeture du driver", "Navigateur fermé proprement")
+TARGET_DATE = re.compile(r'Date cible: (\d{2}/\d{2}/\d{4})')
+PEAK_RSS = re.compile(r'^Pic mémoire du navigateur: (\d+) Mo')
+LOGIN_DURATION = re.compile(r'^Durée de connexion: ([\d.]+) s')
+
+# Issue de l'exécution, d'après les bannières de fin
+RUN_STATUSES = [
+    ("=== SUCCÈS", 'succes'),
+    ("=== DÉJÀ TRAITÉ", 'deja_traite'),
+    ("=== ÉCHEC PARTIEL", 'echec_partiel'),
+    ("=== ÉCHEC", 'echec'),
+    ("Exécution déjà en cours", 'fusionne'),
+    ("Erreur inattendue", 'erreur'),
+    ("Échec à l'étape", 'echec'),
+]
+
+# Messages marquant le début d'une étape (préfixe du message -> nom de l'étape)
+STEP_MARKERS = [
+    (RUN_BANNER, 'demarrage'),
+    ("Étape: Connexion", 'connexion'),
+    ("Début de la connexion à Satelix", 'connexion'),
+    ("Étape: Navigation vers Inventaires", 'navigation'),
+    ("Navigation vers la page Inventaires", 'navigation'),
+    ("Recherche des inventaires existants", 'recherche_inventaires'),
+    ("Création d'un nouvel inventaire", 'creation'),
+    ("Formulaire de création ouvert", 'formulaire'),
+    ("Champ de date trouvé", 'saisie_date'),
+    ("Recherche du bouton 'Ajouter'", 'sauvegarde'),
+    ("✅ Sauvegarde confirmée", 'attente_liste'),
+    ("Actualisation de la page des inventaires", 'actualisation'),
+    ("Inventaire non visible dans la liste principale", 'activation_brouillon'),
+    ("Mise à jour groupée:", 'mise_a_jour_groupee'),
+    ("Reprise de la mise à jour groupée", 'mise_a_jour_groupee'),
+]
+
+# Incidents de sélecteur: élément introuvable sur la page
+SELECTOR_FAILURE = re.compile(r'non trouv|introuvable|aucun .* trouvé', re.IGNORECASE)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS ingest_state (
+    path TEXT PRIMARY KEY,
+    inode INTEGER,
+    offset INTEGER NOT NULL,
+    updated_at TEXT
+);
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    started_at TEXT NOT NULL UNIQUE,
+    ended_at TEXT,
+    duration REAL,
+    target_date TEXT,
+    status TEXT,
+    warnings INTEGER DEFAULT 0,
+    errors INTEGER DEFAULT 0,
+    complete INTEGER DEFAULT 0,
+    peak_rss_mb INTEGER,
+    login_seconds REAL
+);
+CREATE TABLE IF NOT EXISTS steps (
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    seq INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    started_at TEXT NOT NULL,
+    duration REAL,
+    PRIMARY KEY (run_id, seq)
+);
+CREATE TABLE IF NOT EXISTS incidents (
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    ts TEXT NOT NULL,
+    level TEXT NOT NULL,
+    step TEXT,
+    selector_failure INTEGER DEFAULT 0,
+    message TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_steps_name ON steps(name);
+CREATE INDEX IF NOT EXISTS idx_incidents_run ON incidents(run_id);
+"""
+
+
+def parse_timestamp(date_part, millis):
+    """Horodatage d'une ligne de log"""
+    return datetime.strptime(date_part, '%Y-%m-%d %H:%M:%S').replace(microsecond=int(millis) * 1000)
+
+
+def percentile(values, pct):
+    """Percentile par rang le plus proche (None si aucune valeur)"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * pct // 100))
+    return ordered[int(rank) - 1]
+
+
+class ParsedRun:
+    """Exécution en cours de reconstruction à partir des lignes de log"""
+
+    def __init__(self, started_at, offset):
+        self.started_at = started_at
+        self.offset = offset
+        self.last_ts = started_at
+        self.ended_at = None
+        self.target_date = None
+        self.status = None
+        self.banner_seen = False
+        self.warnings = 0
+        self.errors = 0
+        self.peak_rss_mb = None
+        self.login_seconds = None
+        self.steps = []
+        self.incidents = []
+
+    @property
+    def current_step(self):
+        return self.steps[-1][0] if self.steps else None
+
+    def add_line(self, ts, level, message):
+        """Intégrer une ligne de log à l'exécution"""
+        self.last_ts = ts
+
+        if self.target_date is None:
+            match = TARGET_DATE.search(message)
+            if match:
+                self.target_date = match.group(1)
+
+        match = PEAK_RSS.match(message)
+        if match:
+            self.peak_rss_mb = int(match.group(1))
+
+        match = LOGIN_DURATION.match(message)
+        if match:
+            self.login_seconds = float(match.group(1))
+
+        for prefix, step in STEP_MARKERS:
+            if message.startswith(prefix):
+                if step != self.current_step:
+                    self.steps.append((step, ts))
+                break
+
+        for prefix, status in RUN_STATUSES:
+            if message.startswith(prefix):
+                # Une bannière de fin prime sur les erreurs intermédiaires
+                if self.status is None or prefix.startswith("==="):
+                    self.status = status
+                break
+
+        if level == 'WARNING':
+            self.warnings += 1
+        elif level in ('ERROR', 'CRITICAL'):
+            self.errors += 1
+        if level in ('WARNING', 'ERROR', 'CRITICAL'):
+            self.incidents.append((ts, level, self.current_step,
+                                   1 if SELECTOR_FAILURE.search(message) else 0, message[:500]))
+
+        if message.startswith(RUN_END):
+            self.ended_at = ts
+
+    def step_rows(self):
+        """Étapes avec leur durée (jusqu'à l'étape suivante ou la fin de l'exécution)"""
+        end = self.ended_at or self.last_ts
+        rows = []
+        for seq, (name, started) in enumerate(self.steps):
+            following = self.steps[seq + 1][1] if seq + 1 < len(self.steps) else end
+            rows.append((seq, name, started, (following - started).total_seconds()))
+        return rows
+
+
+class SatelixLogAnalytics:
+    """Base SQLite d'historique des exécutions, alimentée depuis le log principal"""
+
+    def __init__(self, db_path=None, log_path=None):
+        """Initialisation avec les chemins de la base et du log"""
+        self.db_path = Path(db_path or os.getenv('ANALYTICS_DB', Path('logs') / 'satelix_analytics.db'))
+        self.log_path = Path(log_path or Path('logs') / 'satelix_update_inventory_dates.log')
+        self.db_path.parent.mkdir(exist_ok=True)
+        self.conn = sqlite3.connect(str(self.db_path))
+        self.conn.executescript(SCHEMA)
+        self._migrate()
+
+    def _migrate(self):
+        """Ajouter les colonnes apparues après la création de la base"""
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(runs)")}
+        if 'peak_rss_mb' not in columns:
+            self.conn.execute("ALTER TABLE runs ADD COLUMN peak_rss_mb INTEGER")
+        if 'login_seconds' not in columns:
+            self.conn.execute("ALTER TABLE runs ADD COLUMN login_seconds REAL")
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+    def _load_offset(self, inode):
+        row = self.conn.execute("SELECT inode, offset FROM ingest_state WHERE path = ?",
+                                (str(self.log_path.resolve()),)).fetchone()
+        if row is None:
+            return 0
+        saved_inode, offset = row
+        # Fichier remplacé ou tronqué (rotation, nettoyage): reprise au début
+        if saved_inode != inode or offset > self.log_path.stat().st_size:
+            return 0
+        return offset
+
+    def _save_offset(self, inode, offset):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO ingest_state (path, inode, offset, updated_at) VALUES (?, ?, ?, ?)",
+            (str(self.log_path.resolve()), inode, offset, datetime.now().isoformat(timespec='seconds')))
+
+    def _store_run(self, run, complete):
+        """Insérer ou remplacer une exécution et ses étapes"""
+        started = run.started_at.isoformat(sep=' ')
+        ended = run.ended_at or run.last_ts
+        duration = (ended - run.started_at).total_seconds()
+        status = run.status or ('interrompu' if complete else 'en_cours')
+
+        row = self.conn.execute("SELECT id FROM runs WHERE started_at = ?", (started,)).fetchone()
+        if row:
+            run_id = row[0]
+            self.conn.execute("DELETE FROM steps WHERE run_id = ?", (run_id,))
+            self.conn.execute("DELETE FROM incidents WHERE run_id = ?", (run_id,))
+            self.conn.execute(
+                "UPDATE runs SET ended_at = ?, duration = ?, target_date = ?, status = ?, "
+                "warnings = ?, errors = ?, complete = ?, peak_rss_mb = ?, login_seconds = ? WHERE id = ?",
+                (ended.isoformat(sep=' '), duration, run.target_date, status,
+                 run.warnings, run.errors, int(complete), run.peak_rss_mb, run.login_seconds, run_id))
+        else:
+            cursor = self.conn.execute(
+                "INSERT INTO runs (started_at, ended_at, duration, target_date, status, warnings, errors, "
+                "complete, peak_rss_mb, login_seconds) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (started, ended.isoformat(sep=' '), duration, run.target_date, status,
+                 run.warnings, run.errors, int(complete), run.peak_rss_mb, run.login_seconds))
+            run_id = cursor.lastrowid
+
+        self.conn.executemany(
+            "INSERT INTO steps (run_id, seq, name, started_at, duration) VALUES (?, ?, ?, ?, ?)",
+            [(run_id, seq, name, ts.isoformat(sep=' '), duration) for seq, name, ts, duration in run.step_rows()])
+        self.conn.executemany(
+            "INSERT INTO incidents (run_id, ts, level, step, selector_failure, message) VALUES (?, ?, ?, ?, ?, ?)",
+            [(run_id, ts.isoformat(sep=' '), level, step, selector, message)
+             for ts, level, step, selector, message in run.incidents])
+
+    def ingest(self):
+        """Ingérer les nouvelles lignes du log; retourne le nombre d'exécutions enregistrées"""
+        if not self.log_path.exists():
+            return 0
+
+        inode = self.log_path.stat().st_ino
+        offset = self._load_offset(inode)
+        run = None
+        stored = 0
+
+        with open(self.log_path, 'rb') as f:
+            f.seek(offset)
+            position = offset
+            for raw in f:
+                line_offset = position
+                position += len(raw)
+                if not raw.endswith(b'\n'):
+                    # Ligne en cours d'écriture: elle sera relue à la prochaine ingestion
+                    position = line_offset
+                    break
+
+                match = LOG_LINE.match(raw.decode('utf-8', errors='replace').rstrip('\r\n'))
+                if not match:
+                    continue
+                ts = parse_timestamp(match.group(1), match.group(2))
+                level, message = match.group(3), match.group(4)
+
+                starts_run = message.startswith(RUN_START) or (
+                    message.startswith(RUN_BANNER) and (run is None or run.banner_seen or run.ended_at))
+                if starts_run:
+                    if run is not None:
+                        self._store_run(run, complete=True)
+                        stored += 1
+                    run = ParsedRun(ts, line_offset)
+
+                if run is None or run.ended_at:
+                    # Lignes hors exécution (service de planification, outils)
+                    continue
+
+                if message.startswith(RUN_BANNER):
+                    run.banner_seen = True
+                run.add_line(ts, level, message)
+
+        if run is not None and not run.ended_at:
+            # Exécution non terminée: enregistrée provisoirement, relue à la prochaine ingestion
+            self._store_run(run, complete=False)
+            position = run.offset
+        elif run is not None:
+            self._store_run(run, complete=True)
+        if run is not None:
+            stored += 1
+
+        self._save_offset(inode, position)
+        self.conn.commit()
+        return stored
+
+    def weekly_durations(self, weeks=12):
+        """Nombre d'exécutions, taux de succès, médiane et p95 de durée, pic mémoire, connexion par semaine ISO"""
+        rows = self.conn.execute(
+            "SELECT started_at, duration, status, peak_rss_mb, login_seconds FROM runs "
+            "WHERE complete = 1 AND status != 'fusionne' ORDER BY started_at").fetchall()
+
+        by_week = {}
+        for started_at, duration, status, peak, login in rows:
+            # Semaine ISO (année ISO incluse): les semaines à cheval sur deux années ne sont pas coupées
+            iso_year, iso_week, _ = datetime.fromisoformat(started_at).isocalendar()
+            week = f"{iso_year}-S{iso_week:02d}"
+            by_week.setdefault(week, []).append((duration, status, peak, login))
+
+        report = []
+        for week in sorted(by_week)[-weeks:]:
+            items = by_week[week]
+            durations = [duration for duration, _, _, _ in items]
+            peaks = [peak for _, _, peak, _ in items if peak]
+            logins = [login for _, _, _, login in items if login is not None]
+            successes = sum(1 for _, status, _, _ in items if status in ('succes', 'deja_traite'))
+            report.append({
+                'week': week,
+                'runs': len(items),
+                'success_rate': 100.0 * successes / len(items),
+                'p50': percentile(durations, 50),
+                'p95': percentile(durations, 95),
+                'peak_rss_mb': max(peaks) if peaks else None,
+                'login_p50': percentile(logins, 50),
+            })
+        return report
+
+    def slowest_steps(self, days=30, top=10):
+        """Étapes les plus lentes (moyenne, p95, maximum) sur la période"""
+        rows = self.conn.execute(
+            "SELECT s.name, s.duration FROM steps s JOIN runs r ON r.id = s.run_id "
+            "WHERE r.complete = 1 AND r.started_at >= datetime('now', 'localtime', ?)",
+            (f'-{int(days)} days',)).fetchall()
+
+        by_step = {}
+        for name, duration in rows:
+            by_step.setdefault(name, []).append(duration)
+
+        report = [{
+            'step': name,
+            'count': len(durations),
+            'avg': sum(durations) / len(durations),
+            'p95': percentile(durations, 95),
+            'max': max(durations),
+        } for name, durations in by_step.items()]
+        report.sort(key=lambda item: item['p95'], reverse=True)
+        return report[:top]
+
+    def selector_failures(self, days=30, top=10):
+        """Fréquence des échecs de sélecteur: occurrences et part des exécutions touchées"""
+        since = f'-{int(days)} days'
+        total_runs = self.conn.execute(
+            "SELECT COUNT(*) FROM runs WHERE complete = 1 AND started_at >= datetime('now', 'localtime', ?)",
+            (since,)).fetchone()[0]
+        rows = self.conn.execute(
+            "SELECT i.message, COALESCE(i.step, '-'), COUNT(*), COUNT(DISTINCT i.run_id), MAX(i.ts) "
+            "FROM incidents i JOIN runs r ON r.id = i.run_id "
+            "WHERE i.selector_failure = 1 AND r.complete = 1 AND r.started_at >= datetime('now', 'localtime', ?) "
+            "GROUP BY i.message, i.step ORDER BY COUNT(DISTINCT i.run_id) DESC, COUNT(*) DESC LIMIT ?",
+            (since, top)).fetchall()
+
+        return [{
+            'message': message,
+            'step': step,
+            'occurrences': occurrences,
+            'runs': runs,
+            'run_share': 100.0 * runs / total_runs if total_runs else 0.0,
+            'last_seen': last_seen[:16],
+        } for message, step, occurrences, runs, last_seen in rows]
+
+    def print_report(self, weeks=12, days=30, top=10):
+        """Afficher le rapport de tendances"""
+        print("=== DURÉE DES EXÉCUTIONS PAR SEMAINE ===")
+        print(f"{'Semaine':<10} {'Exéc.':>6} {'Succès':>8} {'Médiane':>9} {'p95':>9} {'Pic RAM':>9} {'Connexion':>10}")
+        for item in self.weekly_durations(weeks):
+            peak = f"{item['peak_rss_mb']}Mo" if item['peak_rss_mb'] else '-'
+            login = f"{item['login_p50']:.1f}s" if item['login_p50'] is not None else '-'
+            print(f"{item['week']:<10} {item['runs']:>6} {item['success_rate']:>7.0f}% "
+                  f"{item['p50']:>8.1f}s {item['p95']:>8.1f}s {peak:>9} {login:>10}")
+
+        print()
+        print(f"=== ÉTAPES LES PLUS LENTES ({days} derniers jours) ===")
+        print(f"{'Étape':<24} {'Nb':>5} {'Moyenne':>9} {'p95':>9} {'Max':>9}")
+        for item in self.slowest_steps(days, top):
+            print(f"{item['step']:<24} {item['count']:>5} {item['avg']:>8.1f}s "
+                  f"{item['p95']:>8.1f}s {item['max']:>8.1f}s")
+
+        print()
+        print(f"=== ÉCHECS DE SÉLECTEUR ({days} derniers jours) ===")
+        failures = self.selector_failures(days, top)
+        if not failures:
+            print("Aucun échec de sélecteur enregistré")
+        for item in failures:
+            print(f"{item['runs']:>4} exéc. ({item['run_share']:.0f}%) - {item['occurrences']} fois - "
+                  f"[{item['step']}] {item['message']} (dernier: {item['last_seen']})")
+
+
+def main():
+    """Point d'entrée en ligne de commande"""
+    parser = argparse.ArgumentParser(description="Historique analytique des exécutions Satelix")
+    parser.add_argument('command', nargs='?', choices=['ingest', 'report'], default='report',
+                        help="ingest: importer les nouvelles lignes du log; report: importer puis afficher les tendances")
+    parser.add_argument('--log', help="Fichier de log à analyser")
+    parser.add_argument('--db', help="Base SQLite de l'historique")
+    parser.add_argument('--weeks', type=int, default=12, help="Nombre de semaines affichées")
+    parser.add_argument('--days', type=int, default=30, help="Période d'analyse des étapes et sélecteurs")
+    parser.add_argument('--top', type=int, default=10, help="Nombre de lignes par classement")
+    args = parser.parse_args()
+
+    analytics = SatelixLogAnalytics(args.db, args.log)
+    try:
+        stored = analytics.ingest()
+        if args.command == 'ingest':
+            print(f"{stored} exécution(s) importée(s) dans {analytics.db_path}")
+        else:
+            analytics.print_report(args.weeks, args.days, args.top)
+    finally:
+        analytics.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+Visionneuse de logs Satelix indexée
+Index des débuts d'exécution par position dans le fichier (lecture mmap),
+filtres par exécution, date, niveau et étape, suivi en continu et lien
+entre les erreurs et la capture d'écran la plus proche
+"""
+
+import os
+import re
+import sys
+import json
+import mmap
+import time
+import bisect
+import argparse
+from datetime import datetime
+from pathlib import Path
+
+from log_analytics import LOG_LINE, RUN_START, STEP_MARKERS, TARGET_DATE, parse_timestamp
+
+
+LEVELS = {'DEBUG': 10, 'INFO': 20, 'WARNING': 30, 'ERROR': 40, 'CRITICAL': 50}
+SCREENSHOT_NAME = re.compile(r'_(\d{8}_\d{6})\.png$')
+RUN_MARKER = f" - INFO - {RUN_START}".encode('utf-8')
+
+
+class LogIndex:
+    """Index persistant des débuts d'exécution (position en octets dans le log)"""
+
+    def __init__(self, log_path, index_path=None):
+        """Initialisation avec le log et le fichier d'index associé"""
+        self.log_path = Path(log_path)
+        self.index_path = Path(index_path or self.log_path.with_suffix('.idx.json'))
+        self.runs = []
+
+    def _load(self):
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _save(self, inode, indexed_size):
+        tmp_file = self.index_path.with_suffix('.tmp')
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump({'inode': inode, 'size': indexed_size, 'runs': self.runs}, f)
+        os.replace(tmp_file, self.index_path)
+
+    def refresh(self):
+        """Compléter l'index avec la partie du log ajoutée depuis le dernier passage"""
+        if not self.log_path.exists():
+            self.runs = []
+            return self.runs
+
+        stat = self.log_path.stat()
+        saved = self._load()
+        start = 0
+        self.runs = []
+        if saved and saved.get('inode') == stat.st_ino and saved.get('size', 0) <= stat.st_size:
+            start = saved['size']
+            self.runs = saved.get('runs', [])
+
+        if start < stat.st_size:
+            with open(self.log_path, 'rb') as f, \
+                    mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                # Ne pas indexer une dernière ligne incomplète
+                end = mm.rfind(b'\n', start) + 1
+                position = mm.find(RUN_MARKER, start, end)
+                while position != -1:
+                    line_start = mm.rfind(b'\n', 0, position) + 1
+                    line_end = mm.find(b'\n', position, end)
+                    line = mm[line_start:line_end].decode('utf-8', errors='replace')
+                    target = TARGET_DATE.search(line)
+                    self.runs.append([line_start, line[:19], target.group(1) if target else None])
+                    position = mm.find(RUN_MARKER, line_end, end)
+                if end > start:
+                    self._save(stat.st_ino, end)
+
+        return self.runs
+
+    def run_range(self, number):
+        """Positions (début, fin) de l'exécution numéro number (négatif: depuis la fin)"""
+        if not self.runs:
+            return None
+        index = number - 1 if number > 0 else len(self.runs) + number
+        if not 0 <= index < len(self.runs):
+            return None
+        end = self.runs[index + 1][0] if index + 1 < len(self.runs) else None
+        return self.runs[index][0], end
+
+    def runs_on(self, day):
+        """Numéros des exécutions démarrées (ou ciblant) le jour donné (datetime.date)"""
+        started = day.strftime('%Y-%m-%d')
+        target = day.strftime('%d/%m/%Y')
+        return [number for number, (_, ts, target_date) in enumerate(self.runs, start=1)
+                if ts.startswith(started) or target_date == target]
+
+
+class ScreenshotLocator:
+    """Associe un horodatage à la capture d'écran la plus proche dans logs/"""
+
+    def __init__(self, logs_dir, max_gap_seconds=120):
+        self.max_gap_seconds = max_gap_seconds
+        self.shots = []
+        for path in Path(logs_dir).glob('*.png'):
+            match = SCREENSHOT_NAME.search(path.name)
+            if match:
+                try:
+                    self.shots.append((datetime.strptime(match.group(1), '%Y%m%d_%H%M%S'), path))
+                except ValueError:
+                    continue
+        self.shots.sort()
+        self.times = [ts for ts, _ in self.shots]
+
+    def nearest(self, ts):
+        """Capture la plus proche de ts, dans la limite de max_gap_seconds"""
+        if not self.shots:
+            return None
+        position = bisect.bisect_left(self.times, ts)
+        candidates = self.shots[max(0, position - 1):position + 1]
+        shot_ts, path = min(candidates, key=lambda item: abs((item[0] - ts).total_seconds()))
+        if abs((shot_ts - ts).total_seconds()) > self.max_gap_seconds:
+            return None
+        return path
+
+
+class SatelixLogViewer:
+    """Affichage filtré du log principal"""
+
+    def __init__(self, log_path=None, min_level='INFO', step=None, text=None, link_screenshots=True):
+        """Initialisation avec les filtres d'affichage"""
+        self.log_path = Path(log_path or Path('logs') / 'satelix_update_inventory_dates.log')
+        self.index = LogIndex(self.log_path)
+        self.min_level = LEVELS.get(min_level.upper(), 20)
+        self.step = step
+        self.text = text.lower() if text else None
+        self.screenshots = ScreenshotLocator(self.log_path.parent) if link_screenshots else None
+        self.current_step = None
+        self.last_level = 20
+
+    def format_line(self, line):
+        """Ligne à afficher (None si elle est filtrée)"""
+        match = LOG_LINE.match(line)
+        if match:
+            level, message = match.group(3), match.group(4)
+            self.last_level = LEVELS.get(level, 20)
+            if message.startswith(RUN_START):
+                self.current_step = None
+            for prefix, step in STEP_MARKERS:
+                if message.startswith(prefix):
+                    self.current_step = step
+                    break
+        # Les lignes de continuation (traces) suivent le niveau de la ligne précédente
+        if self.last_level < self.min_level:
+            return None
+        if self.step and self.current_step != self.step:
+            return None
+        if self.text and self.text not in line.lower():
+            return None
+
+        if match and self.screenshots and self.last_level >= LEVELS['ERROR']:
+            shot = self.screenshots.nearest(parse_timestamp(match.group(1), match.group(2)))
+            if shot:
+                line += f"\n    📷 {shot}"
+        return line
+
+    def print_range(self, start, end=None):
+        """Afficher les lignes entre deux positions en octets"""
+        with open(self.log_path, 'rb') as f:
+            f.seek(start)
+            position = start
+            for raw in f:
+                if end is not None and position >= end:
+                    break
+                position += len(raw)
+                line = self.format_line(raw.decode('utf-8', errors='replace').rstrip('\r\n'))
+                if line is not None:
+                    print(line)
+            return position
+
+    def list_runs(self, last=20):
+        """Lister les dernières exécutions indexées"""
+        runs = self.index.refresh()
+        total = len(runs)
+        print(f"{'N°':>5}  {'Début':<19}  {'Date cible':<10}")
+        for number in range(max(1, total - last + 1), total + 1):
+            _, ts, target = runs[number - 1]
+            print(f"{number:>5}  {ts:<19}  {target or '-':<10}")
+        print(f"{total} exécution(s) indexée(s)")
+
+    def show_run(self, number):
+        """Afficher une exécution (numéro depuis le début, ou négatif depuis la fin)"""
+        self.index.refresh()
+        bounds = self.index.run_range(number)
+        if bounds is None:
+            print(f"❌ Exécution {number} introuvable")
+            return False
+        self.print_range(*bounds)
+        return True
+
+    def show_date(self, day):
+        """Afficher les exécutions d'une journée"""
+        self.index.refresh()
+        numbers = self.index.runs_on(day)
+        if not numbers:
+            print(f"❌ Aucune exécution le {day.strftime('%d/%m/%Y')}")
+            return False
+        for number in numbers:
+            print(f"--- Exécution {number} ---")
+            self.show_run(number)
+        return True
+
+    def follow(self, poll_seconds=0.5):
+        """Suivre la fin du log (équivalent de tail -f), y compris après rotation"""
+        position = self.log_path.stat().st_size if self.log_path.exists() else 0
+        inode = self.log_path.stat().st_ino if self.log_path.exists() else None
+        try:
+            while True:
+                if self.log_path.exists():
+                    stat = self.log_path.stat()
+                    if stat.st_ino != inode or stat.st_size < position:
+                        inode, position = stat.st_ino, 0
+                    if stat.st_size > position:
+                        position = self._print_complete_lines(position)
+                time.sleep(poll_seconds)
+        except KeyboardInterrupt:
+            return True
+
+    def _print_complete_lines(self, position):
+        """Afficher les lignes complètes à partir de position; retourne la nouvelle position"""
+        with open(self.log_path, 'rb') as f:
+            f.seek(position)
+            for raw in f:
+                if not raw.endswith(b'\n'):
+                    break
+                position += len(raw)
+                line = self.format_line(raw.decode('utf-8', errors='replace').rstrip('\r\n'))
+                if line is not None:
+                    print(line, flush=True)
+        return position
+
+
+def main():
+    """Point d'entrée en ligne de commande"""
+    parser = argparse.ArgumentParser(description="Visionneuse de logs Satelix")
+    parser.add_argument('--log', help="Fichier de log à consulter")
+    parser.add_argument('--list', action='store_true', help="Lister les dernières exécutions")
+    parser.add_argument('--run', type=int, help="Numéro d'exécution (négatif: depuis la fin, -1 = dernière)")
+    parser.add_argument('--date', help="Exécutions d'une journée (JJ/MM/AAAA)")
+    parser.add_argument('--level', default='INFO', choices=list(LEVELS), help="Niveau minimal affiché")
+    parser.add_argument('--step', choices=sorted({step for _, step in STEP_MARKERS}), help="Étape à afficher")
+    parser.add_argument('--grep', help="Texte recherché (insensible à la casse)")
+    parser.add_argument('--follow', '-f', action='store_true', help="Suivre la fin du log")
+    parser.add_argument('--no-screenshots', action='store_true', help="Ne pas associer les captures aux erreurs")
+    args = parser.parse_args()
+
+    viewer = SatelixLogViewer(args.log, args.level, args.step, args.grep, not args.no_screenshots)
+    if not viewer.log_path.exists():
+        print(f"❌ Aucun fichier de log trouvé: {viewer.log_path}")
+        print("Lancez d'abord une mise à jour pour créer des logs.")
+        return 1
+
+    if args.list:
+        viewer.list_runs()
+        return 0
+    if args.follow:
+        viewer.follow()
+        return 0
+    if args.date:
+        try:
+            day = datetime.strptime(args.date, '%d/%m/%Y').date()
+        except ValueError:
+            print("❌ Format de date invalide. Utilisez JJ/MM/AAAA")
+            return 1
+        return 0 if viewer.show_date(day) else 1
+
+    return 0 if viewer.show_run(args.run if args.run is not None else -1) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
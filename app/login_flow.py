@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Connexion rapide à Satelix
+Les identifiants sont saisis et le formulaire soumis en un seul script (soumission
+native du formulaire, qui déclenche les gestionnaires de la page). La connexion est
+jugée réussie dès que l'URL quitte la page de connexion, ou que le cookie de session
+change alors que le formulaire a disparu: aucune attente sur le contenu de l'accueil
+"""
+
+import time
+import logging
+from urllib.parse import urlparse
+
+
+LOGIN_USER = "input[placeholder='Utilisateur / adresse mail']"
+LOGIN_PASSWORD = "input[placeholder='Mot de passe']"
+
+# Éléments propres à l'interface connectée (menu principal, tableau de bord)
+LOGGED_IN = [
+    "xpath=//a[contains(text(), 'Inventaire')]",
+    "xpath=//a[contains(text(), 'Dossier')]",
+    "xpath=//*[contains(text(), 'Écarts de stock')]",
+    "xpath=//*[contains(text(), 'Tableau de bord')]"
+]
+
+SUBMIT_SCRIPT = """
+var user = document.querySelector(arguments[0]);
+var password = document.querySelector(arguments[1]);
+if (!user || !password) {
+    return {submitted: false, reason: 'champs de connexion absents'};
+}
+function setValue(el, value) {
+    var setter = Object.getOwnPropertyDescriptor(HTMLInputElement.prototype, 'value').set;
+    setter.call(el, value);
+    el.dispatchEvent(new Event('input', {bubbles: true}));
+    el.dispatchEvent(new Event('change', {bubbles: true}));
+}
+setValue(user, arguments[2]);
+setValue(password, arguments[3]);
+var form = password.form || user.form;
+if (!form) {
+    return {submitted: false, reason: 'formulaire absent'};
+}
+// Soumission différée: le script rend la main avant le déchargement de la page
+setTimeout(function () {
+    if (form.requestSubmit) { form.requestSubmit(); } else { form.submit(); }
+}, 0);
+return {submitted: true, url: location.href};
+"""
+
+
+class FastLogin:
+    """Soumission scriptée des identifiants et détection de la session ouverte"""
+
+    def __init__(self, browser, timeout=10, poll_interval=0.2):
+        self.browser = browser
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+        self.logger = logging.getLogger(__name__)
+
+    def login(self, username, password):
+        """Soumettre les identifiants; retourne le signe de réussite ('url', 'cookie') ou None"""
+        login_path = urlparse(self.browser.current_url).path
+        cookies_before = self.browser.cookies()
+
+        result = self.browser.evaluate(SUBMIT_SCRIPT, LOGIN_USER, LOGIN_PASSWORD, username, password)
+        if not isinstance(result, dict) or not result.get('submitted'):
+            reason = result.get('reason') if isinstance(result, dict) else 'script sans résultat'
+            self.logger.info("Connexion rapide impossible: %s", reason)
+            return None
+
+        deadline = time.monotonic() + self.timeout
+        while True:
+            signal = self._session_signal(login_path, cookies_before)
+            if signal:
+                return signal
+            if time.monotonic() >= deadline:
+                self.logger.warning("Connexion rapide: session non détectée après %.0f s", self.timeout)
+                return None
+            time.sleep(self.poll_interval)
+
+    def session_open(self):
+        """Session déjà ouverte: formulaire de connexion absent et interface connectée affichée"""
+        try:
+            return not self.browser.query(LOGIN_PASSWORD) and \
+                any(self.browser.query(selector) for selector in LOGGED_IN)
+        except Exception as e:
+            self.logger.debug("Connexion rapide: état de la page indisponible (%s)", str(e))
+            return False
+
+    def _session_signal(self, login_path, cookies_before):
+        """'url' si la page de connexion a été quittée, 'cookie' si la session a changé, sans formulaire
+
+        Le champ mot de passe doit avoir disparu dans les deux cas: une redirection vers une
+        page d'erreur ou de mot de passe expiré n'est pas une connexion réussie.
+        """
+        try:
+            if self.browser.query(LOGIN_PASSWORD):
+                return None
+            if urlparse(self.browser.current_url).path != login_path:
+                return 'url'
+            if self.browser.cookies() != cookies_before:
+                return 'cookie'
+        except Exception as e:
+            # Page en cours de déchargement: nouvel essai au tour suivant
+            self.logger.debug("Connexion rapide: état de la page indisponible (%s)", str(e))
+        return None
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Index du texte visible de la page Satelix
+Un seul script injecté relève les éléments cliquables ou porteurs de libellé
+(boutons, liens, labels, cases à cocher) avec leur texte normalisé (minuscules,
+sans accents), leur visibilité et leur état. Les recherches par mot-clé
+('ajouter', 'valider', 'reprendre', 'capture'...) deviennent des recherches en
+mémoire tant que le DOM n'a pas changé (compteur tenu par un MutationObserver)
+"""
+
+import logging
+import unicodedata
+
+from selenium.common.exceptions import WebDriverException
+
+
+INDEX_SCRIPT = """
+function fold(text) {
+    return (text || '').normalize('NFD').replace(/[\\u0300-\\u036f]/g, '')
+        .toLowerCase().replace(/\\s+/g, ' ').trim();
+}
+var state = window.__satelixTextIndex;
+if (!state) {
+    state = window.__satelixTextIndex = {version: 1};
+    new MutationObserver(function () { state.version++; }).observe(document.documentElement, {
+        childList: true, subtree: true, characterData: true,
+        attributes: true, attributeFilter: ['class', 'style', 'hidden', 'disabled']
+    });
+}
+var selector = "button, a, label, span, [role='button'], .btn, input[type='submit'], " +
+               "input[type='button'], input[type='checkbox'], input[type='radio']";
+var entries = [];
+document.querySelectorAll(selector).forEach(function (el) {
+    var tag = el.tagName.toLowerCase();
+    var type = (el.getAttribute('type') || '').toLowerCase();
+    var checkable = tag === 'input' && (type === 'checkbox' || type === 'radio');
+    var text = fold(tag === 'input' ? el.value : el.innerText);
+    if (text.length > 120 || (!text && !checkable && !el.title)) {
+        return;
+    }
+    // Case à cocher associée à un libellé (label, ou span dans ou à côté de la case)
+    var control = null;
+    var label = el.closest('label');
+    if (label && (tag === 'label' || tag === 'span')) {
+        control = label.control || label.querySelector('input');
+    } else if (tag === 'span' && el.parentElement) {
+        control = el.parentElement.querySelector("input[type='checkbox']");
+    }
+    if (control && control.type !== 'checkbox') {
+        control = null;
+    }
+    var style = window.getComputedStyle(el);
+    entries.push({
+        element: el,
+        text: text,
+        tag: tag,
+        type: type,
+        name: el.getAttribute('name') || '',
+        id: el.id || '',
+        title: fold(el.getAttribute('title')),
+        cls: el.getAttribute('class') || '',
+        visible: !!(el.offsetWidth || el.offsetHeight || el.getClientRects().length) &&
+                 style.visibility !== 'hidden',
+        enabled: !el.disabled && !el.closest('fieldset[disabled]'),
+        checked: checkable ? el.checked : null,
+        control: control,
+        context: checkable && el.parentElement ? fold(el.parentElement.innerText) : ''
+    });
+});
+return {version: state.version, url: location.href, entries: entries};
+"""
+
+VERSION_SCRIPT = "return window.__satelixTextIndex ? window.__satelixTextIndex.version : null;"
+
+
+def fold_text(text):
+    """Normaliser un texte: minuscules, sans accents, espaces réduits"""
+    decomposed = unicodedata.normalize('NFD', text or '')
+    stripped = ''.join(char for char in decomposed if not unicodedata.combining(char))
+    return ' '.join(stripped.lower().split())
+
+
+class IndexedElement:
+    """Élément relevé par l'index (l'élément Selenium reste utilisable pour cliquer)"""
+
+    __slots__ = ('element', 'text', 'tag', 'type', 'name', 'id', 'title', 'cls',
+                 'visible', 'enabled', 'checked', 'control', 'context')
+
+    def __init__(self, data):
+        for slot in self.__slots__:
+            setattr(self, slot, data.get(slot))
+
+    def __repr__(self):
+        return f"IndexedElement({self.tag}, {self.text!r})"
+
+    @property
+    def usable(self):
+        return bool(self.visible and self.enabled)
+
+
+class PageTextIndex:
+    """Index texte normalisé → éléments, reconstruit seulement quand le DOM change"""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.version = None
+        self.url = None
+        self.entries = []
+        self._hits = {}
+        self.builds = 0
+        self.logger = logging.getLogger(__name__)
+
+    def refresh(self):
+        """Mettre l'index à jour; False si le script ne peut pas être exécuté (recherche XPath)"""
+        try:
+            if self.version is not None and self.driver.execute_script(VERSION_SCRIPT) == self.version:
+                return True
+            result = self.driver.execute_script(INDEX_SCRIPT)
+        except WebDriverException as e:
+            self.logger.debug("Index du texte de la page indisponible: %s", str(e))
+            return False
+
+        if not isinstance(result, dict) or not isinstance(result.get('entries'), list):
+            self.version = None
+            return False
+
+        self.version = result.get('version')
+        self.url = result.get('url')
+        self.entries = [IndexedElement(entry) for entry in result['entries']]
+        self._hits = {}
+        self.builds += 1
+        self.logger.debug("Index du texte de la page: %d éléments (version %s)", len(self.entries), self.version)
+        return True
+
+    def invalidate(self):
+        self.version = None
+
+    def _lookup(self, keyword, tags, usable):
+        key = (fold_text(keyword), tuple(tags or ()), usable)
+        hits = self._hits.get(key)
+        if hits is None:
+            hits = self._hits[key] = [
+                entry for entry in self.entries
+                if (key[0] in entry.text or key[0] in (entry.title or ''))
+                and (not tags or entry.tag in tags) and (not usable or entry.usable)
+            ]
+        return hits
+
+    def find(self, keyword, tags=None, usable=True):
+        """Éléments dont le texte (ou le titre) contient le mot-clé; None si l'index est indisponible"""
+        if not self.refresh():
+            return None
+        return self._lookup(keyword, tags, usable)
+
+    def find_any(self, keywords, tags=None, usable=True):
+        """Union ordonnée des résultats de plusieurs mots-clés (ordre des mots-clés, puis du document)"""
+        if not self.refresh():
+            return None
+        results = []
+        for keyword in keywords:
+            results.extend(hit for hit in self._lookup(keyword, tags, usable) if hit not in results)
+        return results
+
+    def checkboxes(self, usable=True):
+        """Cases à cocher de la page; None si l'index est indisponible"""
+        if not self.refresh():
+            return None
+        return [entry for entry in self.entries
+                if entry.tag == 'input' and entry.type == 'checkbox' and (not usable or entry.usable)]
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Pré-vérification de l'accès à Satelix avant le lancement du navigateur
+Requête HTTP légère sur la page de connexion avec un délai serré (logique de
+SatelixDiagnostic.test_http_access): une panne du serveur est constatée en
+quelques millisecondes, avec sa cause (DNS, port fermé, délai, code HTTP),
+sans démarrer Chrome ni attendre TIMEOUT secondes sur la page de connexion
+"""
+
+import time
+import logging
+from urllib.parse import urlparse, urlunparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+LOGIN_TERMS = ('login', 'connexion', 'mot de passe', 'utilisateur')
+
+
+class PinnedHostAdapter(HTTPAdapter):
+    """HTTPS vers l'adresse épinglée: SNI et vérification du certificat sur le nom du serveur"""
+
+    def __init__(self, hostname, **kwargs):
+        self.hostname = hostname
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        kwargs['server_hostname'] = self.hostname
+        kwargs['assert_hostname'] = self.hostname
+        super().init_poolmanager(*args, **kwargs)
+
+
+class ProbeResult:
+    """Issue de la pré-vérification: accessible ou non, cause et durée"""
+
+    __slots__ = ('ok', 'reason', 'detail', 'status', 'elapsed', 'has_login')
+
+    def __init__(self, ok, reason, detail, status=None, elapsed=0.0, has_login=None):
+        self.ok = ok
+        self.reason = reason
+        self.detail = detail
+        self.status = status
+        self.elapsed = elapsed
+        self.has_login = has_login
+
+    def __repr__(self):
+        return f"ProbeResult({self.reason}, {self.detail!r}, {self.elapsed * 1000:.0f} ms)"
+
+    @property
+    def transient(self):
+        """Panne passagère du serveur (à compter dans le disjoncteur), par opposition à une erreur de configuration"""
+        return self.reason in ('dns', 'tcp', 'timeout', 'connexion', 'serveur')
+
+
+def probe_login_page(url, timeout=3.0, resolver=None):
+    """Interroger la page de connexion; resolver (HostResolver) évite une nouvelle résolution DNS"""
+    started = time.monotonic()
+
+    def result(ok, reason, detail, **details):
+        return ProbeResult(ok, reason, detail, elapsed=time.monotonic() - started, **details)
+
+    if not url:
+        return result(False, 'configuration', "URL de connexion non configurée")
+
+    request_url = url
+    headers = {}
+    pinned = False
+    session = requests.Session()
+    if resolver is not None:
+        ip = resolver.resolve()
+        if ip is None:
+            return result(False, 'dns', f"impossible de résoudre {resolver.host}")
+        if resolver.connect(timeout=timeout) is None:
+            return result(False, 'tcp', f"port {resolver.port} fermé ou injoignable sur {resolver.host} ({ip})")
+        # Requête directe sur l'adresse épinglée, sans nouvelle résolution DNS (comme Chrome)
+        parsed = urlparse(url)
+        if parsed.scheme in ('http', 'https') and not resolver.is_literal:
+            pinned = True
+            request_url = urlunparse(parsed._replace(netloc=f"{ip}:{resolver.port}"))
+            headers['Host'] = parsed.netloc
+            if parsed.scheme == 'https':
+                session.mount('https://', PinnedHostAdapter(resolver.host))
+
+    try:
+        # Adresse épinglée: une redirection viserait à nouveau le nom du serveur (résolution DNS)
+        response = session.get(request_url, headers=headers, timeout=(timeout, timeout), verify=False,
+                               allow_redirects=not pinned)
+    except requests.exceptions.ConnectTimeout:
+        return result(False, 'timeout', f"délai de connexion dépassé ({timeout:.0f} s)")
+    except requests.exceptions.ReadTimeout:
+        return result(False, 'timeout', f"le serveur n'a pas répondu en {timeout:.0f} s")
+    except requests.exceptions.ConnectionError as e:
+        return result(False, 'connexion', f"connexion impossible ({type(e).__name__})")
+    except requests.exceptions.RequestException as e:
+        return result(False, 'connexion', str(e))
+    finally:
+        session.close()
+
+    status = response.status_code
+    if status >= 500:
+        return result(False, 'serveur', f"erreur serveur (code {status})", status=status)
+    if status == 404:
+        return result(False, 'url', "URL incorrecte (code 404)", status=status)
+    if status == 403:
+        return result(False, 'acces', "accès refusé (code 403)", status=status)
+    if pinned and response.is_redirect:
+        return result(True, 'ok', f"serveur accessible (redirection {status})", status=status)
+    if status != 200:
+        return result(False, 'http', f"réponse inattendue (code {status})", status=status)
+
+    content = response.text.lower()
+    has_login = any(term in content for term in LOGIN_TERMS)
+    detail = "page de connexion accessible" if has_login else "page accessible, formulaire de connexion non détecté"
+    return result(True, 'ok', detail, status=status, has_login=has_login)
+
+
+def log_probe(probe, logger=None):
+    """Journaliser le résultat de la pré-vérification"""
+    logger = logger or logging.getLogger(__name__)
+    if probe.ok:
+        logger.info("Pré-vérification: %s en %.0f ms", probe.detail, probe.elapsed * 1000)
+    else:
+        logger.error("Pré-vérification: Satelix inaccessible - %s (%.0f ms), navigateur non lancé",
+                     probe.detail, probe.elapsed * 1000)
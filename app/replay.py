@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+Enregistrement et rejeu du parcours de création d'inventaire Satelix
+Une exécution réussie en mode découverte enregistre la séquence exacte des
+actions résolues (localisateur CSS unique, valeur, attente) dans un script
+JSON; les exécutions suivantes rejouent ce script directement en vérifiant
+chaque action, et ne reviennent à la découverte qu'en cas d'écart
+"""
+
+import os
+import json
+import logging
+from datetime import datetime
+
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait, Select
+from selenium.webdriver.support import expected_conditions as EC
+
+SCRIPT_VERSION = 1
+
+ACTIONS = ('click', 'fill', 'select', 'check')
+
+# Localisateur CSS unique et empreinte (balise, texte) d'un élément, en un seul aller-retour.
+# Les id contenant de longues suites de chiffres sont considérés comme générés et ignorés.
+LOCATOR_SCRIPT = """
+var el = arguments[0];
+function esc(value) {
+    return (window.CSS && CSS.escape) ? CSS.escape(value) : value.replace(/([^\\w-])/g, '\\\\$1');
+}
+function stableId(node) {
+    return node.id && !/\\d{3,}/.test(node.id);
+}
+function unique(selector) {
+    try {
+        var found = document.querySelectorAll(selector);
+        return found.length === 1 && found[0] === el;
+    } catch (e) {
+        return false;
+    }
+}
+function locate() {
+    var tag = el.tagName.toLowerCase();
+    if (stableId(el) && unique('#' + esc(el.id))) {
+        return '#' + esc(el.id);
+    }
+    var name = el.getAttribute('name');
+    if (name) {
+        var byName = tag + '[name="' + name.replace(/"/g, '\\\\"') + '"]';
+        if (unique(byName)) {
+            return byName;
+        }
+    }
+    var parts = [];
+    for (var node = el; node && node.nodeType === 1 && node !== document.documentElement; node = node.parentElement) {
+        if (node !== el && stableId(node)) {
+            parts.unshift('#' + esc(node.id));
+            break;
+        }
+        var index = 1;
+        for (var sibling = node.previousElementSibling; sibling; sibling = sibling.previousElementSibling) {
+            if (sibling.tagName === node.tagName) {
+                index++;
+            }
+        }
+        parts.unshift(node.tagName.toLowerCase() + ':nth-of-type(' + index + ')');
+        if (unique(parts.join(' > '))) {
+            return parts.join(' > ');
+        }
+    }
+    return unique(parts.join(' > ')) ? parts.join(' > ') : null;
+}
+return {
+    locator: locate(),
+    tag: el.tagName.toLowerCase(),
+    text: (el.innerText || el.value || '').trim().substring(0, 60)
+};
+"""
+
+FINGERPRINT_SCRIPT = """
+var el = arguments[0];
+return [el.tagName.toLowerCase(), (el.innerText || el.value || '').trim().substring(0, 60)];
+"""
+
+
+class ReplayError(Exception):
+    """Écart entre le script enregistré et la page: retour au mode découverte"""
+
+    def __init__(self, index, step, reason):
+        super().__init__(f"action {index + 1} ({step.get('action')} {step.get('locator')}): {reason}")
+        self.index = index
+        self.step = step
+        self.reason = reason
+
+
+def load_script(path):
+    """Charger un script enregistré (None s'il est absent, illisible ou d'une autre version)"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            script = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if script.get('version') != SCRIPT_VERSION or not script.get('steps'):
+        return None
+    return script
+
+
+def save_script(path, steps, **meta):
+    """Enregistrer un script de façon atomique"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    script = dict(meta, version=SCRIPT_VERSION,
+                  recorded_at=datetime.now().isoformat(timespec='seconds'), steps=steps)
+    tmp_file = path.with_suffix('.tmp')
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump(script, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_file, path)
+    return script
+
+
+def present(selector):
+    """Condition d'attente: élément présent"""
+    return {'present': selector}
+
+
+def hidden(selector):
+    """Condition d'attente: élément absent ou invisible"""
+    return {'hidden': selector}
+
+
+def locator(selector):
+    """Convertir un sélecteur (CSS, ou XPath préfixé par 'xpath=') en localisateur Selenium"""
+    if selector.startswith('xpath='):
+        return By.XPATH, selector[len('xpath='):]
+    return By.CSS_SELECTOR, selector
+
+
+def wait_condition(conditions):
+    """Condition Selenium satisfaite dès qu'une des conditions enregistrées l'est"""
+    expected = []
+    for condition in conditions:
+        if 'present' in condition:
+            expected.append(EC.presence_of_element_located(locator(condition['present'])))
+        else:
+            expected.append(EC.invisibility_of_element_located(locator(condition['hidden'])))
+    return EC.any_of(*expected)
+
+
+class ActionRecorder:
+    """Enregistreur des actions résolues pendant une exécution en mode découverte"""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.steps = []
+        self.complete = True
+        self.logger = logging.getLogger(__name__)
+
+    def record(self, action, element, value=None, param=None, requested=None,
+               wait_for=None, wait_optional=False):
+        """Ajouter une action sur un élément résolu
+
+        value: valeur effectivement saisie ou sélectionnée
+        param/requested: paramètre d'exécution à l'origine de la valeur et valeur
+        demandée; au rejeu, un paramètre différent est substitué (saisie) ou
+        invalide le script (sélection)
+        wait_for: conditions (present/hidden) attendues après l'action
+        """
+        try:
+            info = self.driver.execute_script(LOCATOR_SCRIPT, element)
+        except Exception as e:
+            info = None
+            self.logger.debug("Localisateur non calculable pour %s: %s", action, str(e))
+
+        if not info or not info.get('locator'):
+            # Une action non localisable rend le script incomplet: il ne sera pas enregistré
+            self.complete = False
+            return
+
+        step = {'action': action, 'locator': info['locator'], 'tag': info['tag']}
+        if action in ('click', 'check') and info.get('text'):
+            step['text'] = info['text']
+        if value is not None:
+            step['value'] = value
+        if param:
+            step['param'] = param
+            step['requested'] = requested if requested is not None else value
+        if wait_for:
+            step['wait_for'] = wait_for
+            step['wait_optional'] = wait_optional
+        self.steps.append(step)
+
+
+class ReplayEngine:
+    """Rejeu d'un script enregistré avec une vérification légère après chaque action"""
+
+    def __init__(self, driver, step_timeout=5, wait_timeout=30):
+        self.driver = driver
+        self.step_timeout = step_timeout
+        self.wait_timeout = wait_timeout
+        self.logger = logging.getLogger(__name__)
+
+    def play(self, steps, params=None):
+        """Exécuter les actions dans l'ordre; lève ReplayError au premier écart"""
+        params = params or {}
+        for index, step in enumerate(steps):
+            try:
+                self._play_step(index, step, params)
+            except ReplayError:
+                raise
+            except Exception as e:
+                raise ReplayError(index, step, str(e).splitlines()[0] if str(e) else type(e).__name__)
+
+    def _value(self, index, step, params):
+        """Valeur à saisir: paramètre d'exécution s'il diffère de l'enregistrement"""
+        param = step.get('param')
+        if not param or param not in params or params[param] == step.get('requested'):
+            return step.get('value')
+        if step['action'] == 'select':
+            # L'option résolue dépend de la valeur demandée: il faut redécouvrir
+            raise ReplayError(index, step, f"paramètre {param} modifié")
+        return params[param]
+
+    def _play_step(self, index, step, params):
+        action = step.get('action')
+        if action not in ACTIONS:
+            raise ReplayError(index, step, "action inconnue")
+
+        value = self._value(index, step, params)
+        try:
+            element = WebDriverWait(self.driver, self.step_timeout).until(
+                EC.visibility_of_element_located(locator(step['locator'])))
+        except Exception:
+            raise ReplayError(index, step, "élément introuvable")
+
+        tag, text = self.driver.execute_script(FINGERPRINT_SCRIPT, element)
+        if tag != step.get('tag') or ('text' in step and text != step['text']):
+            raise ReplayError(index, step, f"élément différent ({tag} '{text}')")
+
+        if action == 'click':
+            self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", element)
+            element.click()
+        elif action == 'check':
+            if not element.is_selected():
+                element.click()
+            if not element.is_selected():
+                raise ReplayError(index, step, "case non cochée")
+        elif action == 'select':
+            select = Select(element)
+            select.select_by_visible_text(value)
+            if select.first_selected_option.text != value:
+                raise ReplayError(index, step, "option non sélectionnée")
+        else:
+            element.clear()
+            element.send_keys(value)
+            actual = element.get_attribute('value')
+            # Les champs date HTML5 normalisent la saisie: seule la présence d'une valeur est vérifiée
+            if actual != value and not (actual and element.get_attribute('type') == 'date'):
+                raise ReplayError(index, step, f"valeur saisie '{actual}'")
+
+        if step.get('wait_for'):
+            try:
+                WebDriverWait(self.driver, self.wait_timeout).until(wait_condition(step['wait_for']))
+            except Exception:
+                if not step.get('wait_optional'):
+                    raise ReplayError(index, step, "attente non satisfaite")
+                self.logger.info("Confirmation non détectée après l'action %d, poursuite du rejeu", index + 1)
@@ -0,0 +1,412 @@
+#!/usr/bin/env python3
+"""
+Archivage compressé et rétention des artefacts Satelix (logs/)
+Regroupe les captures d'écran, points de reprise et anciennes lignes de log
+dans des archives quotidiennes (tar zstd si disponible, sinon tar gzip)
+indexées par un manifeste, avec une durée de conservation plus longue pour
+les artefacts d'exécutions en échec et un budget de taille global
+"""
+
+import io
+import os
+import re
+import sys
+import json
+import tarfile
+import logging
+import argparse
+from datetime import datetime, timedelta
+from pathlib import Path
+from dotenv import load_dotenv
+
+from run_state import RunState
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+SCREENSHOT_NAME = re.compile(r'_(\d{8}_\d{6})\.png$')
+LOG_DAY = re.compile(rb'^(\d{4}-\d{2}-\d{2}) \d{2}:\d{2}:\d{2},\d{3} - ')
+FAILURE_NAMES = ('error', 'erreur', 'echec', 'failed', 'exception')
+MAIN_LOG = 'satelix_update_inventory_dates.log'
+# Parties renommées du log principal (rotation), découpées par journée à l'archivage
+ROTATED_LOG = re.compile(re.escape(MAIN_LOG) + r'\.\d{8}_\d{6}$')
+
+# Marge autour d'une exécution en échec pour y rattacher ses captures
+RUN_WINDOW = timedelta(seconds=60)
+
+
+class SatelixRetention:
+    """Moteur d'archivage et de rétention du dossier logs/"""
+
+    def __init__(self, logs_dir='logs'):
+        """Initialisation à partir du fichier .env"""
+        load_dotenv()
+
+        self.logger = logging.getLogger(__name__)
+
+        self.logs_dir = Path(logs_dir)
+        self.archive_dir = self.logs_dir / 'archives'
+        self.manifest_file = self.archive_dir / 'manifest.json'
+        self.main_log = self.logs_dir / MAIN_LOG
+
+        self.archive_after_days = int(os.getenv('ARCHIVE_AFTER_DAYS', '1'))
+        # Points de reprise relus par le rattrapage du planificateur et la file hors ligne
+        self.checkpoint_archive_days = int(os.getenv('CHECKPOINT_ARCHIVE_DAYS', '14'))
+        self.retention_days = int(os.getenv('RETENTION_DAYS', '30'))
+        self.failure_retention_days = int(os.getenv('RETENTION_FAILURE_DAYS', '90'))
+        self.max_bytes = int(float(os.getenv('RETENTION_MAX_MB', '500')) * 1024 * 1024)
+        self.log_max_bytes = int(float(os.getenv('LOG_MAX_MB', '20')) * 1024 * 1024)
+
+        self.extension = '.tar.zst' if zstandard else '.tar.gz'
+
+    def load_manifest(self):
+        """Charger le manifeste des archives"""
+        try:
+            with open(self.manifest_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {'archives': []}
+
+    def save_manifest(self, manifest):
+        """Persister le manifeste des archives"""
+        self.archive_dir.mkdir(parents=True, exist_ok=True)
+        tmp_file = self.manifest_file.with_suffix('.tmp')
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_file, self.manifest_file)
+
+    def failure_windows(self):
+        """Intervalles des exécutions en échec, d'après l'historique analytique"""
+        try:
+            from log_analytics import SatelixLogAnalytics
+        except ImportError:
+            return None
+
+        analytics = SatelixLogAnalytics(log_path=self.main_log)
+        try:
+            analytics.ingest()
+            rows = analytics.conn.execute(
+                "SELECT started_at, ended_at FROM runs WHERE complete = 1 "
+                "AND status NOT IN ('succes', 'deja_traite', 'fusionne')").fetchall()
+        except Exception as e:
+            self.logger.warning("Historique des exécutions indisponible: %s", str(e))
+            return None
+        finally:
+            analytics.close()
+
+        return [(datetime.fromisoformat(start) - RUN_WINDOW, datetime.fromisoformat(end) + RUN_WINDOW)
+                for start, end in rows]
+
+    @staticmethod
+    def file_time(path):
+        """Horodatage d'un artefact: nom de la capture, sinon date de modification"""
+        match = SCREENSHOT_NAME.search(path.name)
+        if match:
+            try:
+                return datetime.strptime(match.group(1), '%Y%m%d_%H%M%S')
+            except ValueError:
+                pass
+        return datetime.fromtimestamp(path.stat().st_mtime)
+
+    @staticmethod
+    def is_failure(path, ts, windows):
+        """True si l'artefact appartient à une exécution en échec"""
+        if windows is not None:
+            return any(start <= ts <= end for start, end in windows)
+        return any(word in path.name.lower() for word in FAILURE_NAMES)
+
+    @staticmethod
+    def checkpoint_done(path):
+        """True si le point de reprise correspond à une exécution terminée"""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return RunState.DONE in json.load(f).get('completed', [])
+        except (OSError, ValueError, AttributeError):
+            return False
+
+    def candidates(self, cutoff, checkpoint_cutoff, unfinished_cutoff):
+        """Artefacts libres antérieurs à cutoff (captures, logs secondaires) et anciens points de reprise
+
+        Un point de reprise terminé est conservé jusqu'à checkpoint_cutoff (mention "déjà traité"
+        lors d'un rattrapage), un point de reprise inachevé jusqu'à unfinished_cutoff (reprise).
+        """
+        paths = list(self.logs_dir.glob('*.png'))
+        # Index du visualiseur de log: reconstruit à la demande, jamais archivé
+        paths += [path for path in self.logs_dir.glob('*.log*')
+                  if path.name != MAIN_LOG and not ROTATED_LOG.match(path.name)
+                  and not path.name.endswith('.idx.json')]
+        for path in paths:
+            if path.is_file():
+                ts = self.file_time(path)
+                if ts < cutoff:
+                    yield path, ts
+
+        for path in (self.logs_dir / 'checkpoints').glob('*.json'):
+            if path.is_file():
+                ts = self.file_time(path)
+                if ts < (checkpoint_cutoff if self.checkpoint_done(path) else unfinished_cutoff):
+                    yield path, ts
+
+    def _open_archive(self, path):
+        """Ouvrir une archive tar en écriture (flux zstd ou gzip)"""
+        if zstandard:
+            raw = open(path, 'wb')
+            stream = zstandard.ZstdCompressor(level=10).stream_writer(raw)
+            return tarfile.open(fileobj=stream, mode='w|'), [stream, raw]
+        return tarfile.open(path, 'w:gz'), []
+
+    def write_archive(self, day, kind, members, manifest, dry_run=False):
+        """Créer l'archive d'une journée pour un type d'artefacts (succes / echec)"""
+        base = f"{day}_{kind}"
+        existing = {entry['archive'] for entry in manifest['archives']}
+        name = base + self.extension
+        part = 2
+        while name in existing or (self.archive_dir / name).exists():
+            name = f"{base}_{part}{self.extension}"
+            part += 1
+
+        entry = {
+            'archive': name,
+            'day': day,
+            'kind': kind,
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'files': [{'name': arcname, 'size': len(data) if isinstance(data, bytes) else data.stat().st_size}
+                      for arcname, data in members]
+        }
+        if dry_run:
+            self.logger.info("[simulation] Archive %s: %d fichier(s)", name, len(members))
+            return entry
+
+        self.archive_dir.mkdir(parents=True, exist_ok=True)
+        archive_path = self.archive_dir / name
+        tmp_path = archive_path.with_name(name + '.tmp')
+        tar, streams = self._open_archive(tmp_path)
+        try:
+            for arcname, data in members:
+                if isinstance(data, bytes):
+                    info = tarfile.TarInfo(arcname)
+                    info.size = len(data)
+                    info.mtime = int(datetime.now().timestamp())
+                    tar.addfile(info, io.BytesIO(data))
+                else:
+                    tar.add(str(data), arcname=arcname)
+        finally:
+            tar.close()
+            for stream in streams:
+                stream.close()
+        os.replace(tmp_path, archive_path)
+
+        entry['size'] = archive_path.stat().st_size
+        # Supprimer les originaux seulement une fois l'archive complète sur disque
+        for _, data in members:
+            if not isinstance(data, bytes):
+                try:
+                    data.unlink()
+                except OSError as e:
+                    self.logger.warning("Impossible de supprimer %s: %s", data, str(e))
+        return entry
+
+    def rotate_main_log(self, now):
+        """Renommer le log principal s'il dépasse LOG_MAX_MB; retourne la partie renommée (ou None)
+
+        Le fichier n'est jamais réécrit en place: les processus qui l'ont ouvert (exécution,
+        service --serve) écrivent via WatchedFileHandler et rouvrent un fichier neuf au
+        message suivant. Sous Windows, un log ouvert ailleurs ne peut pas être renommé: la
+        rotation est alors reportée à la passe suivante.
+        """
+        if not self.main_log.exists() or self.main_log.stat().st_size <= self.log_max_bytes:
+            return None
+
+        rotated = self.main_log.with_name(f"{MAIN_LOG}.{now.strftime('%Y%m%d_%H%M%S')}")
+        try:
+            os.rename(self.main_log, rotated)
+        except OSError as e:
+            self.logger.warning("Rotation du log principal reportée: %s", str(e))
+            return None
+
+        # Les index dépendant des positions dans le log sont reconstruits au prochain accès
+        index_file = self.main_log.with_suffix('.idx.json')
+        if index_file.exists():
+            index_file.unlink()
+        self.logger.info("Log principal renommé en %s (%d octet(s))", rotated.name, rotated.stat().st_size)
+        return rotated
+
+    @staticmethod
+    def split_log(path, cutoff_day):
+        """Journées d'une partie de log antérieures à cutoff_day
+
+        Returns:
+            tuple: ({jour: contenu}, position du premier octet à conserver)
+        """
+        cutoff = cutoff_day.strftime('%Y-%m-%d').encode()
+        days = {}
+        day = None
+        position = 0
+        with open(path, 'rb') as f:
+            for raw in f:
+                match = LOG_DAY.match(raw)
+                if match:
+                    day = match.group(1)
+                if day is not None and day >= cutoff:
+                    break
+                days.setdefault((day or b'0000-00-00').decode(), []).append(raw)
+                position += len(raw)
+
+        return {day: b''.join(lines) for day, lines in days.items()}, position
+
+    def trim_rotated_log(self, path, keep_from):
+        """Retirer d'une partie renommée les journées archivées (plus aucun processus n'y écrit)"""
+        if keep_from >= path.stat().st_size:
+            path.unlink()
+            return
+        tmp_path = path.with_name(path.name + '.tmp')
+        with open(path, 'rb') as source, open(tmp_path, 'wb') as target:
+            source.seek(keep_from)
+            target.write(source.read())
+        os.replace(tmp_path, path)
+
+    def archive(self, manifest, now, dry_run=False):
+        """Archiver les artefacts des journées terminées"""
+        today = datetime(now.year, now.month, now.day)
+        cutoff = today - timedelta(days=self.archive_after_days - 1)
+        checkpoint_cutoff = today - timedelta(days=max(self.checkpoint_archive_days, self.archive_after_days) - 1)
+        unfinished_cutoff = today - timedelta(days=max(self.retention_days, self.checkpoint_archive_days) - 1)
+        windows = self.failure_windows()
+
+        groups = {}
+        for path, ts in self.candidates(cutoff, checkpoint_cutoff, unfinished_cutoff):
+            kind = 'echec' if self.is_failure(path, ts, windows) else 'succes'
+            arcname = path.relative_to(self.logs_dir).as_posix()
+            groups.setdefault((ts.strftime('%Y-%m-%d'), kind), []).append((arcname, path))
+
+        # Historique ingéré avant la rotation: les exécutions du log renommé restent connues
+        if not dry_run:
+            self.rotate_main_log(now)
+        parts = sorted(path for path in self.logs_dir.glob(MAIN_LOG + '.*') if ROTATED_LOG.match(path.name))
+        if dry_run and self.main_log.exists() and self.main_log.stat().st_size > self.log_max_bytes:
+            parts.append(self.main_log)
+
+        log_days = {}
+        trims = []
+        for path in parts:
+            days, keep_from = self.split_log(path, cutoff)
+            for day, content in days.items():
+                log_days[day] = log_days.get(day, b'') + content
+            if keep_from:
+                trims.append((path, keep_from))
+
+        failure_days = {start.strftime('%Y-%m-%d') for start, _ in windows or []}
+        log_kinds = {}
+        for day, content in sorted(log_days.items()):
+            log_kinds[day] = 'echec' if day in failure_days else 'succes'
+            groups.setdefault((day, log_kinds[day]), []).append((f"{MAIN_LOG}.{day}", content))
+
+        created = []
+        log_archived = True
+        for (day, kind), members in sorted(groups.items()):
+            try:
+                entry = self.write_archive(day, kind, members, manifest, dry_run)
+            except Exception as e:
+                self.logger.error("Erreur lors de l'archivage du %s (%s): %s", day, kind, str(e))
+                if log_kinds.get(day) == kind:
+                    log_archived = False
+                continue
+            if not dry_run:
+                manifest['archives'].append(entry)
+            created.append(entry)
+
+        # Les parties renommées ne sont raccourcies que si leurs journées sont en sécurité dans une archive
+        if log_archived and not dry_run:
+            for path, keep_from in trims:
+                self.trim_rotated_log(path, keep_from)
+        if trims:
+            self.logger.info("Log principal: %d octet(s) archivé(s)", sum(keep_from for _, keep_from in trims))
+        return created
+
+    def directory_size(self):
+        """Taille totale du dossier logs/ (archives comprises)"""
+        return sum(path.stat().st_size for path in self.logs_dir.rglob('*') if path.is_file())
+
+    def enforce_retention(self, manifest, now, dry_run=False):
+        """Supprimer les archives expirées puis les plus anciennes au-delà du budget de taille"""
+        today = now.date()
+        limits = {'succes': self.retention_days, 'echec': self.failure_retention_days}
+        removed = []
+
+        def remove(entry):
+            if not dry_run:
+                try:
+                    (self.archive_dir / entry['archive']).unlink()
+                except FileNotFoundError:
+                    pass
+                manifest['archives'].remove(entry)
+            removed.append(entry)
+
+        for entry in list(manifest['archives']):
+            age = (today - datetime.strptime(entry['day'], '%Y-%m-%d').date()).days
+            if age > limits.get(entry['kind'], self.retention_days):
+                remove(entry)
+
+        excess = self.directory_size() - self.max_bytes
+        if excess > 0:
+            # Succès d'abord, du plus ancien au plus récent; les échecs en dernier recours
+            ordered = sorted((entry for entry in manifest['archives'] if entry not in removed),
+                             key=lambda entry: (entry['kind'] == 'echec', entry['day']))
+            for entry in ordered:
+                if excess <= 0:
+                    break
+                excess -= entry.get('size', 0)
+                remove(entry)
+            if excess > 0:
+                self.logger.warning("Budget de %d Mo dépassé malgré la rétention (fichiers du jour)",
+                                    self.max_bytes // (1024 * 1024))
+        return removed
+
+    def run(self, dry_run=False, now=None):
+        """Passe incrémentale: archivage des journées terminées puis rétention"""
+        now = now or datetime.now()
+        if not self.logs_dir.exists():
+            return 0
+
+        manifest = self.load_manifest()
+        created = self.archive(manifest, now, dry_run)
+        removed = self.enforce_retention(manifest, now, dry_run)
+        if not dry_run and (created or removed):
+            self.save_manifest(manifest)
+
+        if created or removed:
+            self.logger.info("Rétention: %d archive(s) créée(s), %d supprimée(s), %.1f Mo dans logs/",
+                             len(created), len(removed), self.directory_size() / (1024 * 1024))
+        return 0
+
+    def print_status(self):
+        """Afficher le contenu du manifeste et l'occupation disque"""
+        manifest = self.load_manifest()
+        print(f"{'Journée':<12} {'Type':<8} {'Fichiers':>8} {'Taille':>10}  Archive")
+        for entry in sorted(manifest['archives'], key=lambda item: item['archive']):
+            print(f"{entry['day']:<12} {entry['kind']:<8} {len(entry['files']):>8} "
+                  f"{entry.get('size', 0) / 1024:>8.0f}Ko  {entry['archive']}")
+        print(f"Occupation de logs/: {self.directory_size() / (1024 * 1024):.1f} Mo "
+              f"(budget {self.max_bytes // (1024 * 1024)} Mo)")
+
+
+def main():
+    """Point d'entrée en ligne de commande"""
+    parser = argparse.ArgumentParser(description="Archivage et rétention des fichiers de logs Satelix")
+    parser.add_argument('--dry-run', action='store_true', help="Afficher les actions sans les appliquer")
+    parser.add_argument('--status', action='store_true', help="Afficher les archives et l'occupation disque")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    retention = SatelixRetention()
+    if args.status:
+        retention.print_status()
+        return 0
+    return retention.run(dry_run=args.dry_run)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Machine à états et points de reprise des exécutions Satelix
+Chaque transition est persistée pour reprendre après un arrêt brutal
+"""
+
+import os
+import json
+from datetime import datetime
+from pathlib import Path
+
+
+class RunState:
+    """États successifs d'une exécution de création d'inventaire"""
+
+    VALIDATE = 'validate'
+    DRIVER = 'driver'
+    LOGIN = 'login'
+    NAVIGATE = 'navigate'
+    SCAN = 'scan'
+    CREATE = 'create'
+    VERIFY = 'verify'
+    ACTIVATE_DRAFT = 'activate_draft'
+    DONE = 'done'
+
+    ORDER = [VALIDATE, DRIVER, LOGIN, NAVIGATE, SCAN, CREATE, VERIFY, ACTIVATE_DRAFT, DONE]
+
+    # Branche de mise à jour groupée (--all / --days), après NAVIGATE
+    BULK_UPDATE = 'bulk_update'
+
+    # États dont l'effet survit à la fermeture du navigateur (côté serveur Satelix)
+    DURABLE = {CREATE, VERIFY, ACTIVATE_DRAFT, DONE}
+
+
+class RunCheckpoint:
+    """Point de reprise persistant d'une exécution pour une date cible"""
+
+    def __init__(self, checkpoint_dir, target_date, resume=True, prefix='inventaire'):
+        """Initialisation; charge le point de reprise existant si resume est vrai"""
+        self.path = Path(checkpoint_dir) / f"{prefix}_{target_date.strftime('%Y-%m-%d')}.json"
+        self.target_date = target_date.strftime('%d/%m/%Y')
+        self.data = None
+
+        if resume:
+            self.data = self._load()
+        self.resumed = self.data is not None
+        # Dernier état atteint par l'exécution précédente (avant toute nouvelle transition)
+        self.previous = self.data.get('current') if self.resumed else None
+
+        if self.data is None:
+            self.data = {
+                'target_date': self.target_date,
+                'current': None,
+                'completed': [],
+                'values': {},
+                'updated_at': None
+            }
+
+    def _load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('target_date') == self.target_date:
+                return data
+        except (OSError, ValueError):
+            pass
+        return None
+
+    def _save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.data['updated_at'] = datetime.now().isoformat(timespec='seconds')
+        tmp_file = self.path.with_suffix('.tmp')
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(self.data, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_file, self.path)
+
+    @property
+    def current(self):
+        """Dernier état entré (terminé ou non)"""
+        return self.data.get('current')
+
+    def enter(self, state):
+        """Persister l'entrée dans un état"""
+        self.data['current'] = state
+        self._save()
+
+    def complete(self, state, **values):
+        """Persister la fin d'un état et les valeurs associées"""
+        if state not in self.data['completed']:
+            self.data['completed'].append(state)
+        self.data['values'].update(values)
+        self._save()
+
+    def is_completed(self, state):
+        """True si l'état a été terminé lors de cette exécution ou d'une précédente"""
+        return state in self.data['completed']
+
+    def was_interrupted_in(self, state):
+        """True si une exécution précédente s'est arrêtée au milieu de cet état"""
+        return self.previous == state and not self.is_completed(state)
+
+    def resume_from(self):
+        """Dernier état durable terminé lors d'une exécution précédente"""
+        durable = [state for state in RunState.ORDER
+                   if state in RunState.DURABLE and self.is_completed(state)]
+        return durable[-1] if durable else None
+
+    def get(self, key, default=None):
+        """Lire une valeur persistée"""
+        return self.data['values'].get(key, default)
@@ -5,8 +5,12 @@ Modifie la date d'inventaires existants et les actualise automatiquement
 """
 
 import os
+import re
 import sys
+import time
 import logging
+import logging.handlers
+from collections import deque
 from datetime import datetime, timedelta
 from pathlib import Path
 from dotenv import load_dotenv
@@ -18,12 +22,48 @@ from selenium.webdriver.chrome.options import Options
 from selenium.common.exceptions import TimeoutException, NoSuchElementException, WebDriverException
 from selenium.webdriver.common.keys import Keys
 
+from locks import FileLock
+from step_policy import StepPolicy, CircuitBreaker, StepRunner
+from run_state import RunState, RunCheckpoint
+from inventory_table import InventoryRecord, InventoryTableReader, InventoryQuery
+from retention import SatelixRetention
+from chrome_watchdog import ChromeWatchdog
+from browser_backend import create_backend
+from driver_cache import DriverCache
+from chrome_profile import PersistentProfile, tenant_name
+from host_resolver import HostResolver
+from preflight import probe_login_page, log_probe
+from job_queue import JobQueue
+from replay import ActionRecorder, ReplayEngine, ReplayError, load_script, save_script, present, hidden
+from page_text import PageTextIndex, fold_text
+from field_finder import FieldFinder
+from login_flow import FastLogin, LOGIN_USER, LOGIN_PASSWORD, LOGGED_IN
+from adaptive_timeout import AdaptiveTimeouts
+
+
+def configure_logging():
+    """Configuration du système de logging (fichier + console)"""
+    logs_dir = Path('logs')
+    logs_dir.mkdir(exist_ok=True)
+
+    log_file = logs_dir / 'satelix_update_inventory_dates.log'
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        handlers=[
+            # Rouvert après une rotation par retention.py (plusieurs processus écrivent ce log)
+            logging.handlers.WatchedFileHandler(log_file, encoding='utf-8'),
+            logging.StreamHandler(sys.stdout)
+        ]
+    )
+
 
 class SatelixInventoryDateUpdater:
     """Classe principale pour la mise à jour des dates d'inventaires Satelix"""
 
-    def __init__(self, target_date=None):
-        """Initialisation avec date cible optionnelle"""
+    def __init__(self, target_date=None, depot=None, intitule=None):
+        """Initialisation avec date cible, dépôt et intitulé optionnels (défauts du fichier .env)"""
         # Chargement du fichier .env
         load_dotenv()
 
@@ -39,10 +79,93 @@ class SatelixInventoryDateUpdater:
         # Configuration
         self.headless = os.getenv('HEADLESS', 'true').lower() == 'true'
         self.timeout = int(os.getenv('TIMEOUT', '30'))
+        # Délai de chaque attente appris des exécutions précédentes (TIMEOUT tant que l'historique est court)
+        self.wait_timeouts = AdaptiveTimeouts(self.timeout)
+
+        # Profil mémoire réduite pour les petits serveurs
+        self.low_memory = os.getenv('LOW_MEMORY', 'false').lower() == 'true'
+        self.js_heap_mb = int(os.getenv('LOW_MEMORY_JS_HEAP_MB', '256'))
+
+        # Politique de reprise des étapes
+        self.step_retries = int(os.getenv('STEP_RETRIES', '2'))
+        self.step_backoff = float(os.getenv('STEP_BACKOFF', '2'))
+        self.max_run_seconds = int(os.getenv('RUN_MAX_SECONDS', '600'))
+        self.breaker = CircuitBreaker(
+            Path('logs') / 'circuit_breaker.json',
+            failure_threshold=int(os.getenv('CIRCUIT_FAILURE_THRESHOLD', '3')),
+            open_seconds=int(os.getenv('CIRCUIT_OPEN_SECONDS', '900'))
+        )
+
+        # Limites dures: au-delà, l'arbre de processus Chrome est arrêté
+        self.watchdog = ChromeWatchdog(
+            run_seconds=int(os.getenv('WATCHDOG_RUN_SECONDS', str(self.max_run_seconds + 300))),
+            step_seconds=int(os.getenv('WATCHDOG_STEP_SECONDS', '300'))
+        )
+
+        # chromedriver en cache local: démarrage sans Selenium Manager ni réseau
+        self.driver_cache = DriverCache()
+
+        # Adresse du serveur résolue une fois et transmise à Chrome (DNS_PINNING=false pour désactiver)
+        self.host_resolver = HostResolver.from_env(self.login_url)
+
+        # Pré-vérification HTTP de la page de connexion avant de lancer Chrome
+        self.preflight_enabled = os.getenv('PREFLIGHT', 'true').lower() == 'true'
+        self.preflight_timeout = float(os.getenv('PREFLIGHT_TIMEOUT', '3'))
+
+        # File d'attente des créations empêchées par une panne du serveur (OFFLINE_QUEUE=false pour désactiver)
+        self.job_queue = JobQueue() if os.getenv('OFFLINE_QUEUE', 'true').lower() == 'true' else None
+        self.offline = False
+        # Verrou d'exécution détenu par une autre exécution: demande fusionnée, pas un échec
+        self.lock_busy = False
+
+        # Paramètres du formulaire de création; un dépôt explicite a son propre point de reprise
+        self.job_depot = depot
+        self.intitule = intitule or os.getenv('INVENTAIRE_INTITULE', 'Inventaire filtres')
+        self.depot = depot or os.getenv('INVENTAIRE_DEPOT', 'DEPOT')
+        self.checkpoint_prefix = 'inventaire' + ('_' + re.sub(r'[^A-Za-z0-9]+', '_', depot) if depot else '')
+
+        # Profil Chrome persistant (cache HTTP conservé entre les exécutions), sur demande
+        self.chrome_profile = None
+        if os.getenv('CHROME_PROFILE_PERSISTENT', 'false').lower() == 'true':
+            self.chrome_profile = PersistentProfile(
+                os.getenv('CHROME_PROFILE_DIR', 'profiles'),
+                tenant_name(self.login_url, self.username),
+                max_cache_mb=float(os.getenv('CHROME_PROFILE_CACHE_MB', '200')),
+                reset_days=int(os.getenv('CHROME_PROFILE_RESET_DAYS', '7'))
+            )
 
-        # Driver Selenium
+        # Driver Selenium et moteur d'automatisation (BROWSER_BACKEND=selenium|playwright)
         self.driver = None
         self.wait = None
+        self.browser = None
+        self.backend_name = os.getenv('BROWSER_BACKEND', 'selenium').lower()
+
+        # État de l'exécution en cours (voir run)
+        self.runner = None
+        self.policies = None
+        self.template_inventory = None
+        self.inventory_records = []
+        self.table_reader = None
+        self.inventory_query = None
+        self.server_side_search = os.getenv('INVENTORY_SERVER_SEARCH', 'true').lower() == 'true'
+        self.max_pages = int(os.getenv('INVENTORY_MAX_PAGES', '0')) or None
+        self.bulk_mode = False
+        self.days_range = None
+
+        # Rejeu du parcours de création enregistré lors de la dernière découverte réussie
+        self.replay_enabled = os.getenv('REPLAY_ENABLED', 'true').lower() == 'true'
+        self.replay_step_timeout = float(os.getenv('REPLAY_STEP_TIMEOUT', '5'))
+        self.replay_file = Path('logs') / 'replay' / 'create_inventory.json'
+        self.recorder = None
+        self.page_text = None
+        self.field_finder = None
+
+        # Connexion rapide (soumission scriptée), le parcours heuristique restant en repli
+        self.fast_login = os.getenv('LOGIN_FAST', 'true').lower() == 'true'
+        self.fast_login_timeout = float(os.getenv('LOGIN_FAST_TIMEOUT', '10'))
+
+        # Archivage et rétention des fichiers de logs après chaque exécution
+        self.retention_after_run = os.getenv('RETENTION_AFTER_RUN', 'true').lower() == 'true'
 
         # Date cible (par défaut: aujourd'hui)
         if target_date:
@@ -59,20 +182,7 @@ class SatelixInventoryDateUpdater:
 
     def setup_logging(self):
         """Configuration du système de logging"""
-        logs_dir = Path('logs')
-        logs_dir.mkdir(exist_ok=True)
-
-        log_file = logs_dir / 'satelix_update_inventory_dates.log'
-
-        logging.basicConfig(
-            level=logging.INFO,
-            format='%(asctime)s - %(levelname)s - %(message)s',
-            handlers=[
-                logging.FileHandler(log_file, encoding='utf-8'),
-                logging.StreamHandler(sys.stdout)
-            ]
-        )
-
+        configure_logging()
         self.logger = logging.getLogger(__name__)
 
     def validate_environment(self):
@@ -98,9 +208,19 @@ class SatelixInventoryDateUpdater:
 
     def setup_driver(self):
         """Configuration et initialisation du driver Chrome"""
+        try:
+            self.watchdog.reap_leftovers()
+        except Exception as e:
+            self.logger.warning("Nettoyage des processus Chrome orphelins impossible: %s", str(e))
+
         try:
             options = Options()
 
+            # Profil persistant verrouillé, sinon profil temporaire identifiable,
+            # supprimé en fin d'exécution ou au prochain démarrage
+            profile_dir = self.chrome_profile.acquire() if self.chrome_profile else None
+            persistent = bool(profile_dir)
+
             if self.headless:
                 options.add_argument('--headless=new')
                 self.logger.info("Mode headless activé")
@@ -109,12 +229,35 @@ class SatelixInventoryDateUpdater:
             options.add_argument('--no-sandbox')
             options.add_argument('--disable-dev-shm-usage')
             options.add_argument('--disable-gpu')
-            options.add_argument('--window-size=1920,1080')
+            if self.low_memory:
+                self.add_low_memory_options(options, persistent)
+            else:
+                options.add_argument('--window-size=1920,1080')
             options.add_argument('--disable-blink-features=AutomationControlled')
             options.add_experimental_option("excludeSwitches", ["enable-automation"])
             options.add_experimental_option('useAutomationExtension', False)
 
-            self.driver = webdriver.Chrome(options=options)
+            if persistent:
+                self.watchdog.kill_profile_users(profile_dir)
+                for argument in self.chrome_profile.cache_arguments():
+                    options.add_argument(argument)
+            else:
+                profile_dir = self.watchdog.create_profile_dir()
+            options.add_argument(f'--user-data-dir={profile_dir}')
+
+            # Serveur épinglé sur l'adresse résolue (ou la dernière valide), vérifiée par une connexion TCP
+            if self.host_resolver is not None and self.host_resolver.resolve():
+                self.host_resolver.prewarm()
+                for argument in self.host_resolver.chrome_arguments():
+                    options.add_argument(argument)
+
+            service = self.driver_cache.apply(options)
+            if service is not None:
+                self.driver = webdriver.Chrome(options=options, service=service)
+            else:
+                self.driver = webdriver.Chrome(options=options)
+            self.browser = None
+            self.watchdog.attach(self.driver)
             self.driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
             self.wait = WebDriverWait(self.driver, self.timeout)
 
@@ -125,6 +268,73 @@ class SatelixInventoryDateUpdater:
             self.logger.error("Erreur lors de l'initialisation du driver Chrome: %s", str(e))
             return False
 
+    def add_low_memory_options(self, options, persistent_profile=False):
+        """Options Chrome limitant la mémoire (serveurs de 1 à 2 Go partagés)
+
+        persistent_profile: profil persistant effectivement obtenu (pas le repli sur un profil temporaire)
+        """
+        # Un seul site est utilisé: pas d'isolation par site, peu de processus de rendu
+        options.add_argument('--renderer-process-limit=1')
+        options.add_argument('--disable-site-isolation-trials')
+        options.add_argument('--window-size=1280,800')
+        options.add_argument(f'--js-flags=--max-old-space-size={self.js_heap_mb}')
+
+        # Caches et fonctionnalités inutiles pour l'automatisation
+        # (le cache disque d'un profil persistant est conservé: il ne coûte pas de mémoire)
+        if not persistent_profile:
+            options.add_argument('--disk-cache-size=1')
+        options.add_argument('--media-cache-size=1')
+        options.add_argument('--disable-extensions')
+        options.add_argument('--disable-background-networking')
+        options.add_argument('--disable-component-update')
+        options.add_argument('--disable-default-apps')
+        options.add_argument('--disable-sync')
+        options.add_argument('--no-first-run')
+        options.add_argument('--mute-audio')
+        options.add_argument('--disable-features=Translate,MediaRouter,OptimizationHints,'
+                             'BackForwardCache,IsolateOrigins,site-per-process')
+
+        self.logger.info("Mode mémoire réduite activé (tas JS limité à %d Mo)", self.js_heap_mb)
+
+    def build_step_policies(self):
+        """Politiques de reprise de chaque étape de l'automatisation"""
+        return {
+            'login': StepPolicy(retries=self.step_retries, backoff=self.step_backoff,
+                                trips_breaker=True),
+            'navigate': StepPolicy(retries=self.step_retries, backoff=self.step_backoff,
+                                   trips_breaker=True),
+            # La création n'est rejouée que si l'inventaire n'existe pas déjà
+            'create': StepPolicy(retries=1, backoff=self.step_backoff, idempotent=False,
+                                 already_done=self._target_inventory_exists,
+                                 recover=self.navigate_to_inventaires)
+        }
+
+    def _target_inventory_exists(self):
+        """Vérifier si un inventaire à la date cible est déjà présent dans la liste"""
+        return self.find_inventory_by_date(self.target_date_str) is not None
+
+    def _browser(self):
+        """Moteur d'automatisation attaché au driver courant (créé à la première utilisation)"""
+        if self.browser is None:
+            self.browser = create_backend(self.backend_name, self.driver, self.timeout)
+        return self.browser
+
+    def _wait(self, key, condition, tolerated=False):
+        """Attente Selenium avec le délai appris (tolerated: dépassement ignoré par l'appelant)"""
+        return self.wait_timeouts.until(key, lambda timeout: WebDriverWait(self.driver, timeout).until(condition),
+                                        tolerated)
+
+    def _wait_for_any(self, key, selectors):
+        """Attente du moteur de navigation avec le délai appris pour cette attente"""
+        browser = self._browser()
+        return self.wait_timeouts.until(key, lambda timeout: browser.wait_for_any(selectors, timeout))
+
+    def close_browser(self):
+        """Détacher le moteur d'automatisation avant la fermeture du driver"""
+        if self.browser is not None:
+            self.browser.close()
+            self.browser = None
+
     def take_screenshot(self, name):
         """Prendre une capture d'écran et la sauvegarder"""
         try:
@@ -132,7 +342,7 @@ class SatelixInventoryDateUpdater:
             timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
             screenshot_path = logs_dir / f"{name}_{timestamp}.png"
 
-            self.driver.save_screenshot(str(screenshot_path))
+            self._browser().screenshot(screenshot_path)
             self.logger.info("Capture d'écran sauvegardée: %s", screenshot_path)
             return str(screenshot_path)
 
@@ -141,66 +351,41 @@ class SatelixInventoryDateUpdater:
             return None
 
     def login(self):
-        """Connexion à Satelix"""
+        """Connexion à Satelix (rapide, puis parcours heuristique en repli)"""
+        started = time.monotonic()
         try:
             self.logger.info("Début de la connexion à Satelix")
-            self.driver.get(self.login_url)
+            browser = self._browser()
+            browser.navigate(self.login_url)
+            self._wait_for_any('page_connexion', [LOGIN_USER])
 
-            # Champs de connexion Satelix
-            username_field = self.wait.until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, "input[placeholder='Utilisateur / adresse mail']"))
-            )
-            password_field = self.driver.find_element(By.CSS_SELECTOR, "input[placeholder='Mot de passe']")
-
-            # Bouton de connexion
-            login_button = None
-            selectors = [
-                (By.XPATH, "//button[contains(text(), 'Se connecter')]"),
-                (By.XPATH, "//*[contains(text(), 'Se connecter')]"),
-                (By.CSS_SELECTOR, "input[type='submit']"),
-                (By.CSS_SELECTOR, "button[type='submit']"),
-                (By.CSS_SELECTOR, "button")
-            ]
-
-            for by_type, selector in selectors:
+            method = 'heuristique'
+            if self.fast_login:
+                fast = FastLogin(browser, self.fast_login_timeout)
                 try:
-                    login_button = self.driver.find_element(by_type, selector)
-                    if login_button:
-                        self.logger.info("Bouton de connexion trouvé avec: %s = %s", by_type, selector)
-                        break
-                except NoSuchElementException:
-                    continue
-
-            if not login_button:
-                raise NoSuchElementException("Aucun bouton de connexion trouvé")
-
-            # Saisie des identifiants
-            username_field.clear()
-            username_field.send_keys(self.username)
-            password_field.clear()
-            password_field.send_keys(self.password)
-
-            self.take_screenshot("before_login")
-            login_button.click()
-
-            # Attendre la connexion - chercher des éléments spécifiques à l'interface connectée
-            self.wait.until(
-                EC.any_of(
-                    # Chercher le nom d'utilisateur affiché (GEOFFROY)
-                    EC.presence_of_element_located((By.XPATH, "//*[contains(text(), 'GEOFFROY')]")),
-                    # Chercher des éléments du menu principal
-                    EC.presence_of_element_located((By.XPATH, "//a[contains(text(), 'Inventaire')]")),
-                    EC.presence_of_element_located((By.XPATH, "//a[contains(text(), 'Dossier')]")),
-                    # Chercher la sidebar de navigation
-                    EC.presence_of_element_located((By.CSS_SELECTOR, ".sidebar, nav, [role='navigation']")),
-                    # Chercher des éléments spécifiques vus dans la capture
-                    EC.presence_of_element_located((By.XPATH, "//*[contains(text(), 'Écarts de stock')]")),
-                    EC.presence_of_element_located((By.XPATH, "//*[contains(text(), 'Tableau de bord')]"))
-                )
-            )
+                    signal = fast.login(self.username, self.password)
+                except Exception as e:
+                    self.logger.warning("Connexion rapide en échec: %s", str(e))
+                    signal = None
+                if signal:
+                    method = f"rapide, {signal}"
+                elif fast.session_open():
+                    # Formulaire soumis, session ouverte après LOGIN_FAST_TIMEOUT (serveur lent)
+                    method = "rapide, tardive"
+                else:
+                    # Repli: page de connexion rechargée (une session ouverte entre-temps en redirige)
+                    browser.navigate(self.login_url)
+                    found = self._wait_for_any('page_connexion_repli', [LOGIN_USER] + LOGGED_IN)
+                    if found != LOGIN_USER and fast.session_open():
+                        method = "rapide, tardive"
+                    else:
+                        self._wait_for_any('page_connexion', [LOGIN_USER])
+                        self._heuristic_login(browser)
+            else:
+                self._heuristic_login(browser)
 
-            self.take_screenshot("after_login")
             self.logger.info("Connexion réussie")
+            self.logger.info("Durée de connexion: %.2f s (%s)", time.monotonic() - started, method)
             return True
 
         except Exception as e:
@@ -208,21 +393,57 @@ class SatelixInventoryDateUpdater:
             self.take_screenshot("login_error")
             return False
 
+    def _heuristic_login(self, browser):
+        """Connexion par recherche du bouton, saisie champ par champ et attente de l'interface"""
+        # Bouton de connexion
+        login_button = None
+        selectors = [
+            "xpath=//button[contains(text(), 'Se connecter')]",
+            "xpath=//*[contains(text(), 'Se connecter')]",
+            "input[type='submit']",
+            "button[type='submit']",
+            "button"
+        ]
+
+        for selector in selectors:
+            if browser.query(selector):
+                login_button = selector
+                self.logger.info("Bouton de connexion trouvé avec: %s", selector)
+                break
+
+        if not login_button:
+            raise NoSuchElementException("Aucun bouton de connexion trouvé")
+
+        # Saisie des identifiants
+        browser.fill(LOGIN_USER, self.username)
+        browser.fill(LOGIN_PASSWORD, self.password)
+
+        self.take_screenshot("before_login")
+        browser.click(login_button)
+
+        # Attendre la connexion - chercher des éléments spécifiques à l'interface connectée
+        self._wait_for_any('interface_connectee', LOGGED_IN + [".sidebar, nav, [role='navigation']"])
+        self.take_screenshot("after_login")
+
     def navigate_to_inventaires(self):
         """Navigation vers la page Inventaires"""
         try:
             self.logger.info("Navigation vers la page Inventaires")
-            self.driver.get(self.inventaires_url)
+            browser = self._browser()
+            browser.navigate(self.inventaires_url)
 
             # Attendre le chargement de la page
-            self.wait.until(
-                EC.any_of(
-                    EC.presence_of_element_located((By.XPATH, "//h1[contains(text(), 'Inventaire')]")),
-                    EC.presence_of_element_located((By.XPATH, "//button[contains(., 'Nouvelle capture')]")),
-                    EC.presence_of_element_located((By.CSS_SELECTOR, "table")),
-                    EC.presence_of_element_located((By.XPATH, "//*[contains(text(), 'inventaire')]"))
-                )
-            )
+            self._wait_for_any('page_inventaires', [
+                "xpath=//h1[contains(text(), 'Inventaire')]",
+                "xpath=//button[contains(., 'Nouvelle capture')]",
+                "table",
+                "xpath=//*[contains(text(), 'inventaire')]"
+            ])
+
+            if self.table_reader is not None:
+                self.table_reader.current_page = 1
+            if self.inventory_query is not None:
+                self.inventory_query.reset_state()
 
             self.take_screenshot("inventaires_page")
             self.logger.info("Page Inventaires chargée avec succès")
@@ -234,136 +455,142 @@ class SatelixInventoryDateUpdater:
             return False
 
     def find_existing_inventories(self):
-        """Rechercher les inventaires existants"""
+        """Rechercher les inventaires existants (liste d'InventoryRecord)"""
         try:
             self.logger.info("Recherche des inventaires existants")
             inventories = []
 
-            # Stratégie 1: Table HTML principale
+            # Stratégie 1: Table HTML principale (page affichée, lue en un seul aller-retour)
             try:
-                table_rows = self.driver.find_elements(By.CSS_SELECTOR, "table tr")
-                for i, row in enumerate(table_rows):
-                    if i == 0:  # Skip header
-                        continue
-
-                    cells = row.find_elements(By.CSS_SELECTOR, "td")
-                    if cells and len(cells) > 1:
-                        # Chercher une date dans les cellules
-                        date_cell = None
-                        action_button = None
+                for record in self._table_reader().iter_page():
+                    inventories.append(record)
+                    self.logger.info("Inventaire trouvé: %s", record.date_str)
+            except WebDriverException:
+                pass
 
-                        for cell in cells:
+            # Stratégie 2: Recherche dans toutes les tables de la page (mises en page atypiques)
+            try:
+                all_tables = self.driver.find_elements(By.CSS_SELECTOR, "table") if not inventories else []
+                for table_index, table in enumerate(all_tables):
+                    rows = table.find_elements(By.CSS_SELECTOR, "tr")
+                    for row_index, row in enumerate(rows):
+                        cells = row.find_elements(By.CSS_SELECTOR, "td")
+                        for cell_index, cell in enumerate(cells):
                             cell_text = cell.text.strip()
-                            if '/' in cell_text and len(cell_text) == 10:  # Format DD/MM/YYYY
+                            if '/' in cell_text and len(cell_text) == 10:
                                 try:
                                     inventory_date = datetime.strptime(cell_text, '%d/%m/%Y')
-                                    date_cell = cell
-
-                                    # Chercher le bouton d'action dans la même ligne
-                                    try:
-                                        action_button = row.find_element(By.CSS_SELECTOR, "button, a.btn, .btn, [class*='btn']")
-                                    except:
-                                        pass
-
-                                    inventories.append({
-                                        'date': inventory_date,
-                                        'date_str': cell_text,
-                                        'row_element': row,
-                                        'date_element': date_cell,
-                                        'action_button': action_button
-                                    })
-                                    self.logger.info("Inventaire trouvé: %s", cell_text)
+                                    # Vérifier qu'on n'a pas déjà cet inventaire
+                                    if not any(inv.date_str == cell_text for inv in inventories):
+                                        inventories.append(InventoryRecord(
+                                            inventory_date, cell_text, 'table_secondaire',
+                                            By.XPATH, f"((//table)[{table_index + 1}]//tr)[{row_index + 1}]",
+                                            cell_index=cell_index
+                                        ))
+                                        self.logger.info("Inventaire trouvé dans table secondaire: %s", cell_text)
                                     break
                                 except ValueError:
                                     continue
-            except NoSuchElementException:
-                pass
-
-            # Stratégie 2: Recherche dans toutes les tables de la page
-            try:
-                all_tables = self.driver.find_elements(By.CSS_SELECTOR, "table")
-                for table in all_tables:
-                    if table not in [row.find_element(By.XPATH, ".//ancestor::table") for inv in inventories for row in [inv.get('row_element')] if row]:
-                        rows = table.find_elements(By.CSS_SELECTOR, "tr")
-                        for row in rows:
-                            cells = row.find_elements(By.CSS_SELECTOR, "td")
-                            for cell in cells:
-                                cell_text = cell.text.strip()
-                                if '/' in cell_text and len(cell_text) == 10:
-                                    try:
-                                        inventory_date = datetime.strptime(cell_text, '%d/%m/%Y')
-                                        # Vérifier qu'on n'a pas déjà cet inventaire
-                                        if not any(inv['date_str'] == cell_text for inv in inventories):
-                                            inventories.append({
-                                                'date': inventory_date,
-                                                'date_str': cell_text,
-                                                'row_element': row,
-                                                'date_element': cell,
-                                                'action_button': None
-                                            })
-                                            self.logger.info("Inventaire trouvé dans table secondaire: %s", cell_text)
-                                        break
-                                    except ValueError:
-                                        continue
             except:
                 pass
 
             # Stratégie 3: Recherche de cartes ou divs d'inventaires
             try:
-                inventory_cards = self.driver.find_elements(By.CSS_SELECTOR, ".card, .panel, .inventory-item, [class*='inventaire']")
-                for card in inventory_cards:
+                card_selector = ".card, .panel, .inventory-item, [class*='inventaire']"
+                inventory_cards = self.driver.find_elements(By.CSS_SELECTOR, card_selector)
+                for card_index, card in enumerate(inventory_cards):
                     card_text = card.text
                     # Recherche de dates dans le texte de la carte
-                    import re
                     dates = re.findall(r'\b(\d{2}/\d{2}/\d{4})\b', card_text)
                     for date_str in dates:
                         try:
                             inventory_date = datetime.strptime(date_str, '%d/%m/%Y')
                             # Vérifier qu'on n'a pas déjà cet inventaire
-                            if not any(inv['date_str'] == date_str for inv in inventories):
-                                inventories.append({
-                                    'date': inventory_date,
-                                    'date_str': date_str,
-                                    'row_element': card,
-                                    'date_element': card,
-                                    'action_button': None
-                                })
+                            if not any(inv.date_str == date_str for inv in inventories):
+                                inventories.append(InventoryRecord(
+                                    inventory_date, date_str, 'carte',
+                                    By.CSS_SELECTOR, card_selector, index=card_index
+                                ))
                                 self.logger.info("Inventaire trouvé dans carte: %s", date_str)
                         except ValueError:
                             continue
             except:
                 pass
 
-            # Stratégie 2: Recherche de liens ou boutons d'édition
+            # Stratégie 4: Recherche de liens ou boutons d'édition
             try:
-                edit_links = self.driver.find_elements(By.XPATH, "//a[contains(@href, 'edit') or contains(text(), 'Modifier') or contains(text(), 'Éditer')]")
-                action_buttons = self.driver.find_elements(By.XPATH, "//button[contains(text(), 'Modifier') or contains(text(), 'Éditer') or contains(text(), 'Mettre à jour')]")
+                edit_xpath = ("//a[contains(@href, 'edit') or contains(text(), 'Modifier') or contains(text(), 'Éditer')]"
+                              " | //button[contains(text(), 'Modifier') or contains(text(), 'Éditer') or contains(text(), 'Mettre à jour')]")
+                edit_elements = self.driver.find_elements(By.XPATH, edit_xpath)
 
-                for element in edit_links + action_buttons:
+                for element_index, element in enumerate(edit_elements):
                     # Chercher une date dans le même contexte (parent, siblings)
                     parent = element.find_element(By.XPATH, "..")
                     if parent:
                         date_match = self._extract_date_from_text(parent.text)
                         if date_match:
-                            inventories.append({
-                                'date': date_match,
-                                'date_str': date_match.strftime('%d/%m/%Y'),
-                                'edit_element': element
-                            })
+                            inventories.append(InventoryRecord(
+                                date_match, date_match.strftime('%d/%m/%Y'), 'edition',
+                                By.XPATH, f"({edit_xpath})[{element_index + 1}]/..",
+                                action_locator=(By.XPATH, edit_xpath, element_index)
+                            ))
                             self.logger.info("Inventaire modifiable trouvé: %s", date_match.strftime('%d/%m/%Y'))
             except:
                 pass
 
             self.logger.info("Total inventaires trouvés: %d", len(inventories))
+            # Les enregistrements ne tiennent aucun WebElement: réutilisables entre étapes
+            self.inventory_records = inventories
             return inventories
 
         except Exception as e:
             self.logger.error("Erreur lors de la recherche d'inventaires: %s", str(e))
             return []
 
+    def _table_reader(self):
+        """Lecteur de la table des inventaires, partagé entre les étapes"""
+        if self.table_reader is None or self.table_reader.driver is not self.driver:
+            self.table_reader = InventoryTableReader(self.driver, reset_page=self.navigate_to_inventaires)
+        return self.table_reader
+
+    def iter_inventories(self, max_pages=None):
+        """Parcourir les inventaires de toutes les pages de la table (générateur)"""
+        reader = self._table_reader()
+        if reader.current_page > 1 and not reader.show_page(1):
+            return
+        yield from reader.iter_inventories(max_pages or self.max_pages)
+
+    def _inventory_query(self):
+        """Critères de recherche / tri de la liste, partagés entre les étapes"""
+        reader = self._table_reader()
+        if self.inventory_query is None or self.inventory_query.reader is not reader:
+            self.inventory_query = InventoryQuery(self.driver, reader)
+        return self.inventory_query
+
+    def find_inventory_by_date(self, date_str, intitule=None):
+        """Premier inventaire à la date donnée, sans lire le reste de l'historique"""
+        target = datetime.strptime(date_str, '%d/%m/%Y')
+        sorted_desc = False
+
+        if self.server_side_search:
+            # Restreindre la liste avec les contrôles de la page avant de la lire
+            query = self._inventory_query()
+            query.narrow(date=target, text=intitule)
+            sorted_desc = query.sort_newest_first()
+
+        scanned = 0
+        for record in self.iter_inventories():
+            scanned += 1
+            if record.date_str == date_str:
+                self.logger.info("Inventaire trouvé: %s (page %d, %d ligne(s) lue(s))", date_str, record.page, scanned)
+                return record
+            if sorted_desc and record.date < target:
+                # Tri décroissant confirmé par l'en-tête: la date cible ne peut plus apparaître
+                break
+        return None
+
     def _extract_date_from_text(self, text):
         """Extraire une date au format DD/MM/YYYY d'un texte"""
-        import re
         date_pattern = r'\b(\d{2}/\d{2}/\d{4})\b'
         match = re.search(date_pattern, text)
         if match:
@@ -374,15 +601,148 @@ class SatelixInventoryDateUpdater:
         return None
 
     def create_new_inventory(self, template_inventory=None):
+        """Créer un nouvel inventaire: rejeu du parcours enregistré, sinon découverte"""
+        with_template = template_inventory is not None
+
+        if self.replay_enabled:
+            script = load_script(self.replay_file)
+            if script and script.get('template') == with_template:
+                if self._replay_new_inventory(script):
+                    return True
+                # Repartir d'une liste propre sans dupliquer un inventaire déjà enregistré
+                self.navigate_to_inventaires()
+                if self._target_inventory_exists():
+                    self.logger.info("Inventaire enregistré malgré l'échec du rejeu, découverte inutile")
+                    return True
+            self.recorder = ActionRecorder(self.driver)
+
+        try:
+            created = self._discover_new_inventory(template_inventory)
+        finally:
+            recorder, self.recorder = self.recorder, None
+
+        if created and recorder is not None:
+            if recorder.complete:
+                save_script(self.replay_file, recorder.steps, template=with_template)
+                self.logger.info("Parcours de création enregistré (%d actions): %s",
+                                 len(recorder.steps), self.replay_file)
+            else:
+                self.logger.warning("Parcours de création non enregistré: élément sans localisateur unique")
+        return created
+
+    def _replay_params(self):
+        """Paramètres d'exécution substitués dans le parcours enregistré"""
+        return {
+            'date_iso': self.target_date.strftime('%Y-%m-%d'),
+            'date_fr': self.target_date_str,
+            'intitule': self.intitule,
+            'depot': self.depot
+        }
+
+    def _replay_new_inventory(self, script):
+        """Rejouer le parcours de création enregistré"""
+        self.logger.info("Rejeu du parcours de création enregistré le %s (%d actions)",
+                         script.get('recorded_at'), len(script['steps']))
+        try:
+            WebDriverWait(self.driver, self.replay_step_timeout).until(
+                EC.invisibility_of_element_located((By.ID, "modalSpinner"))
+            )
+        except Exception:
+            pass
+
+        engine = ReplayEngine(self.driver, step_timeout=self.replay_step_timeout, wait_timeout=self.timeout)
+        try:
+            engine.play(script['steps'], self._replay_params())
+        except ReplayError as e:
+            self.logger.warning("Rejeu interrompu, retour à la découverte: %s", str(e))
+            self.take_screenshot("replay_error")
+            return False
+
+        self.logger.info("Nouvel inventaire créé par rejeu")
+        return True
+
+    def _record(self, action, element, **details):
+        """Enregistrer une action résolue pendant la découverte (sans effet hors enregistrement)"""
+        if self.recorder is not None:
+            self.recorder.record(action, element, **details)
+
+    def _page_text(self):
+        """Index du texte de la page courante (recréé si le driver a été relancé)"""
+        if self.page_text is None or self.page_text.driver is not self.driver:
+            self.page_text = PageTextIndex(self.driver)
+        return self.page_text
+
+    def _field_finder(self):
+        """Classement des champs du formulaire (recréé si le driver a été relancé)"""
+        if self.field_finder is None or self.field_finder.driver is not self.driver:
+            self.field_finder = FieldFinder(self.driver)
+        return self.field_finder
+
+    def _check_checkbox_from_index(self, checkbox_name, keywords):
+        """Cocher une checkbox via l'index du texte; None si l'index est indisponible"""
+        index = self._page_text()
+
+        # Méthode 1: label ou span portant un mot-clé (sans accents, casse ignorée)
+        for keyword in keywords:
+            hits = index.find(keyword, tags=('label', 'span'))
+            if hits is None:
+                return None
+            for hit in hits:
+                try:
+                    if hit.control is not None:
+                        self._record('check', hit.control)
+                        if not hit.control.is_selected():
+                            hit.control.click()
+                            self.logger.info(f"✅ Checkbox '{checkbox_name}' cochée via label")
+                        else:
+                            self.logger.info(f"✅ Checkbox '{checkbox_name}' déjà cochée")
+                        return True
+                    self._record('click', hit.element)
+                    hit.element.click()
+                    self.logger.info(f"✅ Checkbox '{checkbox_name}' cochée via clic sur label")
+                    return True
+                except Exception:
+                    continue
+
+        checkboxes = index.checkboxes() or []
+
+        # Méthode 2: attribut name/id contenant un mot-clé
+        for keyword in keywords:
+            folded = fold_text(keyword)
+            for entry in checkboxes:
+                if folded in entry.name.lower() or folded in entry.id.lower():
+                    self._record('check', entry.element)
+                    if not entry.checked:
+                        entry.element.click()
+                        self.logger.info(f"✅ Checkbox '{checkbox_name}' cochée par attribut")
+                    else:
+                        self.logger.info(f"✅ Checkbox '{checkbox_name}' déjà cochée")
+                    return True
+
+        # Méthode 3: tous les mots-clés présents dans le contexte de la case
+        folded_keywords = [fold_text(keyword) for keyword in keywords]
+        for entry in checkboxes:
+            if all(keyword in entry.context for keyword in folded_keywords):
+                self._record('check', entry.element)
+                if not entry.checked:
+                    entry.element.click()
+                    self.logger.info(f"✅ Checkbox '{checkbox_name}' cochée par contexte: {entry.context[:50]}...")
+                else:
+                    self.logger.info(f"✅ Checkbox '{checkbox_name}' déjà cochée")
+                return True
+
+        self.logger.warning(f"❌ Checkbox '{checkbox_name}' non trouvée")
+        return False
+
+    def _discover_new_inventory(self, template_inventory=None):
         """Créer un nouvel inventaire basé sur un inventaire existant"""
         try:
             self.logger.info("Création d'un nouvel inventaire avec la date %s", self.target_date_str)
 
             # Attendre que les modals/spinners disparaissent
-            import time
             try:
-                self.wait.until(
-                    EC.invisibility_of_element_located((By.ID, "modalSpinner"))
+                self._wait('spinner_creation',
+                    EC.invisibility_of_element_located((By.ID, "modalSpinner")), tolerated=True
                 )
             except:
                 pass
@@ -430,11 +790,15 @@ class SatelixInventoryDateUpdater:
             # Cliquer sur le bouton de création
             self.driver.execute_script("arguments[0].scrollIntoView();", create_button)
             time.sleep(1)
+            self._record('click', create_button, wait_for=[
+                present(".modal-body"), present("form"), present("input[type='date']"),
+                present("xpath=//input[contains(@placeholder, 'date')]")
+            ])
             create_button.click()
             self.logger.info("Bouton de création cliqué")
 
             # Attendre l'ouverture du formulaire de création
-            self.wait.until(
+            self._wait('formulaire_creation',
                 EC.any_of(
                     EC.presence_of_element_located((By.CSS_SELECTOR, ".modal-body")),
                     EC.presence_of_element_located((By.CSS_SELECTOR, "form")),
@@ -484,16 +848,15 @@ class SatelixInventoryDateUpdater:
     def _fill_inventory_form_from_template(self, template_inventory):
         """Remplir le formulaire avec toutes les données spécifiées"""
         try:
-            import time
 
-            # 1. Définir l'intitulé: "Inventaire filtres"
-            self.logger.info("📝 Définition de l'intitulé: Inventaire filtres")
-            self._fill_form_field("intitule", "Inventaire filtres")
+            # 1. Définir l'intitulé (INVENTAIRE_INTITULE, défaut: "Inventaire filtres")
+            self.logger.info("📝 Définition de l'intitulé: %s", self.intitule)
+            self._fill_form_field("intitule", self.intitule)
             time.sleep(1)
 
-            # 2. Sélectionner "DEPOT" dans le champ dépôts
-            self.logger.info("🏢 Sélection du dépôt: DEPOT")
-            self._select_dropdown_option("depot", "DEPOT")
+            # 2. Sélectionner le dépôt (INVENTAIRE_DEPOT, défaut: "DEPOT")
+            self.logger.info("🏢 Sélection du dépôt: %s", self.depot)
+            self._select_dropdown_option("depot", self.depot)
             time.sleep(1)
 
             # 3. Sélectionner "CMUP" dans type de valorisation
@@ -522,6 +885,15 @@ class SatelixInventoryDateUpdater:
             # Prendre une capture d'écran pour débugger
             self.take_screenshot(f"searching_{field_type}")
 
+            # Relevé de tous les champs en un script, classés par pertinence
+            ranked = self._field_finder().rank(field_type)
+            for candidate in (ranked or [])[:3]:
+                self.logger.info(f"Champ candidat: {candidate.describe()}")
+                if self._type_into_field(candidate.element, field_type, value):
+                    return True
+            if ranked is not None:
+                self.logger.info(f"Aucun champ noté pour {field_type}, recherche par sélecteurs...")
+
             # Pour l'intitulé, recherche exhaustive
             if field_type == "intitule":
                 # Sélecteurs CSS très larges pour l'intitulé
@@ -567,33 +939,8 @@ class SatelixInventoryDateUpdater:
                             field_placeholder = field.get_attribute('placeholder') or ""
 
                             self.logger.info(f"Champ trouvé: name='{field_name}', id='{field_id}', placeholder='{field_placeholder}'")
-
-                            # Scroll vers le champ
-                            self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", field)
-                            import time
-                            time.sleep(0.5)
-
-                            # Remplir le champ
-                            field.clear()
-                            field.send_keys(value)
-
-                            # Vérifier que la valeur a été saisie
-                            time.sleep(0.5)
-                            actual_value = field.get_attribute('value')
-                            if actual_value == value:
-                                self.logger.info(f"SUCCÈS! Champ {field_type} rempli avec: '{value}'")
+                            if self._type_into_field(field, field_type, value):
                                 return True
-                            else:
-                                self.logger.warning(f"Valeur partiellement saisie: '{actual_value}' au lieu de '{value}'")
-                                # Essayer à nouveau
-                                field.clear()
-                                time.sleep(0.2)
-                                field.send_keys(value)
-                                time.sleep(0.5)
-                                actual_value = field.get_attribute('value')
-                                if actual_value == value:
-                                    self.logger.info(f"SUCCÈS au 2e essai! Champ {field_type} rempli avec: '{value}'")
-                                    return True
 
                 except Exception as e:
                     self.logger.debug(f"Erreur avec sélecteur {selector}: {e}")
@@ -622,6 +969,7 @@ class SatelixInventoryDateUpdater:
                             field.send_keys(value)
                             time.sleep(0.5)
                             if field.get_attribute('value') == value:
+                                self._record('fill', field, value=value, param=field_type)
                                 self.logger.info(f"SUCCÈS avec premier input! {field_type} = '{value}'")
                                 return True
 
@@ -635,6 +983,61 @@ class SatelixInventoryDateUpdater:
             self.logger.error(f"Erreur lors du remplissage du champ {field_type}: {e}")
         return False
 
+    def _type_into_field(self, field, field_type, value):
+        """Saisir une valeur dans un champ et vérifier qu'elle a été prise (deux essais)"""
+        # Scroll vers le champ
+        self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", field)
+        time.sleep(0.5)
+
+        # Remplir le champ
+        field.clear()
+        field.send_keys(value)
+
+        # Vérifier que la valeur a été saisie
+        time.sleep(0.5)
+        actual_value = field.get_attribute('value')
+        if actual_value == value:
+            self._record('fill', field, value=value, param=field_type)
+            self.logger.info(f"SUCCÈS! Champ {field_type} rempli avec: '{value}'")
+            return True
+
+        self.logger.warning(f"Valeur partiellement saisie: '{actual_value}' au lieu de '{value}'")
+        # Essayer à nouveau
+        field.clear()
+        time.sleep(0.2)
+        field.send_keys(value)
+        time.sleep(0.5)
+        actual_value = field.get_attribute('value')
+        if actual_value == value:
+            self._record('fill', field, value=value, param=field_type)
+            self.logger.info(f"SUCCÈS au 2e essai! Champ {field_type} rempli avec: '{value}'")
+            return True
+        return False
+
+    def _select_in_dropdown(self, dropdown, dropdown_type, option_value):
+        """Choisir l'option dont le texte contient option_value, sinon l'option de cette valeur"""
+        from selenium.webdriver.support.ui import Select
+        select = Select(dropdown)
+
+        # Essayer de trouver l'option exacte
+        for option in select.options:
+            if option_value.upper() in option.text.upper():
+                select.select_by_visible_text(option.text)
+                self._record('select', dropdown, value=option.text,
+                             param=dropdown_type, requested=option_value)
+                self.logger.info(f"✅ Option '{option.text}' sélectionnée dans {dropdown_type}")
+                return True
+
+        # Si pas trouvé exactement, essayer par valeur
+        try:
+            select.select_by_value(option_value)
+            self._record('select', dropdown, value=select.first_selected_option.text,
+                         param=dropdown_type, requested=option_value)
+            self.logger.info(f"✅ Option '{option_value}' sélectionnée par valeur dans {dropdown_type}")
+            return True
+        except NoSuchElementException:
+            return False
+
     def _select_dropdown_option(self, dropdown_type, option_value):
         """Sélectionner une option dans un dropdown"""
         try:
@@ -653,28 +1056,21 @@ class SatelixInventoryDateUpdater:
 
             selectors = dropdown_selectors.get(dropdown_type, [f"select[name*='{dropdown_type}']", f"select[id*='{dropdown_type}']"])
 
+            # Listes classées par pertinence (libellé, name/id, ARIA) en un seul script
+            for candidate in self._field_finder().rank(dropdown_type) or []:
+                self.logger.info(f"Liste candidate: {candidate.describe()}")
+                try:
+                    if self._select_in_dropdown(candidate.element, dropdown_type, option_value):
+                        return True
+                except Exception:
+                    continue
+
             for selector in selectors:
                 try:
                     dropdown = self.driver.find_element(By.CSS_SELECTOR, selector)
                     if dropdown.is_displayed() and dropdown.is_enabled():
-                        from selenium.webdriver.support.ui import Select
-                        select = Select(dropdown)
-
-                        # Essayer de trouver l'option exacte
-                        for option in select.options:
-                            if option_value.upper() in option.text.upper():
-                                select.select_by_visible_text(option.text)
-                                self.logger.info(f"✅ Option '{option.text}' sélectionnée dans {dropdown_type}")
-                                return True
-
-                        # Si pas trouvé exactement, essayer par valeur
-                        try:
-                            select.select_by_value(option_value)
-                            self.logger.info(f"✅ Option '{option_value}' sélectionnée par valeur dans {dropdown_type}")
+                        if self._select_in_dropdown(dropdown, dropdown_type, option_value):
                             return True
-                        except:
-                            pass
-
                 except:
                     continue
 
@@ -694,6 +1090,8 @@ class SatelixInventoryDateUpdater:
                         for option in select.options:
                             if option_value.upper() in option.text.upper():
                                 select.select_by_visible_text(option.text)
+                                self._record('select', dropdown, value=option.text,
+                                             param=dropdown_type, requested=option_value)
                                 self.logger.info(f"✅ Option '{option.text}' sélectionnée dans {dropdown_type}")
                                 return True
                 except:
@@ -711,6 +1109,11 @@ class SatelixInventoryDateUpdater:
         try:
             self.logger.info(f"🔍 Recherche de la checkbox: {checkbox_name}")
 
+            # Recherche en mémoire sur l'index du texte; XPath seulement s'il est indisponible
+            found = self._check_checkbox_from_index(checkbox_name, keywords)
+            if found is not None:
+                return found
+
             # Méthode 1: Recherche par label contenant les mots-clés
             for keyword in keywords:
                 label_selectors = [
@@ -726,6 +1129,7 @@ class SatelixInventoryDateUpdater:
                                 # Chercher la checkbox associée
                                 try:
                                     checkbox = label.find_element(By.XPATH, ".//input[@type='checkbox']")
+                                    self._record('check', checkbox)
                                     if not checkbox.is_selected():
                                         checkbox.click()
                                         self.logger.info(f"✅ Checkbox '{checkbox_name}' cochée via label")
@@ -736,6 +1140,7 @@ class SatelixInventoryDateUpdater:
                                 except:
                                     # Essayer de cliquer sur le label lui-même
                                     try:
+                                        self._record('click', label)
                                         label.click()
                                         self.logger.info(f"✅ Checkbox '{checkbox_name}' cochée via clic sur label")
                                         return True
@@ -756,6 +1161,7 @@ class SatelixInventoryDateUpdater:
                         checkboxes = self.driver.find_elements(By.XPATH, selector)
                         for checkbox in checkboxes:
                             if checkbox.is_displayed() and checkbox.is_enabled():
+                                self._record('check', checkbox)
                                 if not checkbox.is_selected():
                                     checkbox.click()
                                     self.logger.info(f"✅ Checkbox '{checkbox_name}' cochée par attribut")
@@ -778,6 +1184,7 @@ class SatelixInventoryDateUpdater:
 
                             # Vérifier si tous les mots-clés sont présents dans le contexte
                             if all(keyword.lower() in context_text for keyword in keywords):
+                                self._record('check', checkbox)
                                 if not checkbox.is_selected():
                                     checkbox.click()
                                     self.logger.info(f"✅ Checkbox '{checkbox_name}' cochée par contexte: {context_text[:50]}...")
@@ -800,7 +1207,6 @@ class SatelixInventoryDateUpdater:
     def _set_inventory_date(self):
         """Définir la date d'inventaire dans le formulaire"""
         try:
-            import time
             # Rechercher le champ de date
             date_selectors = [
                 "input[type='date']",
@@ -811,6 +1217,12 @@ class SatelixInventoryDateUpdater:
             ]
 
             date_field = None
+            ranked = self._field_finder().rank('date')
+            if ranked and not ranked[0].weak:
+                self.logger.info(f"Champ de date trouvé: {ranked[0].describe()}")
+                date_field = ranked[0].element
+                date_selectors = []
+
             for selector in date_selectors:
                 try:
                     fields = self.driver.find_elements(By.CSS_SELECTOR, selector)
@@ -824,6 +1236,11 @@ class SatelixInventoryDateUpdater:
                 except:
                     continue
 
+            if not date_field and ranked:
+                # Seul indice: une classe CSS, retenue faute de mieux après les sélecteurs
+                self.logger.info(f"Champ de date trouvé: {ranked[0].describe()}")
+                date_field = ranked[0].element
+
             if not date_field:
                 self.logger.error("Champ de date non trouvé dans le formulaire")
                 return False
@@ -836,10 +1253,12 @@ class SatelixInventoryDateUpdater:
                 # Format ISO pour les champs date HTML5
                 iso_date = self.target_date.strftime('%Y-%m-%d')
                 date_field.send_keys(iso_date)
+                self._record('fill', date_field, value=iso_date, param='date_iso')
                 self.logger.info(f"Date définie (ISO): {iso_date}")
             else:
                 # Format DD/MM/YYYY pour les champs texte
                 date_field.send_keys(self.target_date_str)
+                self._record('fill', date_field, value=self.target_date_str, param='date_fr')
                 self.logger.info(f"Date définie (FR): {self.target_date_str}")
 
             time.sleep(1)
@@ -852,7 +1271,6 @@ class SatelixInventoryDateUpdater:
     def _save_new_inventory(self):
         """Sauvegarder le nouvel inventaire avec le bouton vert 'Ajouter'"""
         try:
-            import time
 
             # Prendre une capture d'écran avant de chercher le bouton
             self.take_screenshot("before_save_button_search")
@@ -879,6 +1297,13 @@ class SatelixInventoryDateUpdater:
             save_button = None
             self.logger.info("Recherche du bouton 'Ajouter' vert...")
 
+            # Index du texte: le bouton 'Ajouter' est trouvé en mémoire, les XPath ne servent plus
+            hits = self._page_text().find('ajouter', tags=('button', 'input'))
+            if hits:
+                save_button = hits[0].element
+                save_selectors = []
+                self.logger.info(f"✅ Bouton 'Ajouter' sélectionné: '{hits[0].text}'")
+
             for i, selector in enumerate(save_selectors):
                 try:
                     buttons = self.driver.find_elements(By.XPATH, selector)
@@ -921,17 +1346,24 @@ class SatelixInventoryDateUpdater:
 
             # Cliquer sur le bouton de sauvegarde
             self.logger.info(f"🖱️ Clic sur le bouton: '{save_button.text}'")
+            self._record('click', save_button, wait_optional=True, wait_for=[
+                present("xpath=//*[contains(translate(text(), 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'succès')]"),
+                present("xpath=//*[contains(translate(text(), 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'créé')]"),
+                hidden(".modal.show"),
+                present("xpath=//h1[contains(text(), 'Inventaire')]")
+            ])
             save_button.click()
 
             # Attendre la confirmation ou le retour à la liste
             try:
-                self.wait.until(
+                self._wait('confirmation_creation',
                     EC.any_of(
                         EC.presence_of_element_located((By.XPATH, "//*[contains(translate(text(), 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'succès')]")),
                         EC.presence_of_element_located((By.XPATH, "//*[contains(translate(text(), 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'créé')]")),
                         EC.invisibility_of_element_located((By.CSS_SELECTOR, ".modal.show")),
                         EC.presence_of_element_located((By.XPATH, "//h1[contains(text(), 'Inventaire')]"))  # Retour à la liste
-                    )
+                    ),
+                    tolerated=True
                 )
                 self.logger.info("✅ Sauvegarde confirmée")
                 return True
@@ -950,23 +1382,17 @@ class SatelixInventoryDateUpdater:
         try:
             self.logger.info("Recherche et validation du nouvel inventaire...")
 
-            # Chercher tous les inventaires sur la page
-            inventories = self.find_existing_inventories()
-
-            # Chercher l'inventaire avec la date cible
-            target_inventory = None
-            for inventory in inventories:
-                if inventory['date_str'] == self.target_date_str:
-                    target_inventory = inventory
-                    self.logger.info("Inventaire trouvé avec la date %s", self.target_date_str)
-                    break
+            # Chercher l'inventaire avec la date cible (arrêt à la première correspondance)
+            target_inventory = self.find_inventory_by_date(self.target_date_str)
+            if target_inventory:
+                self.logger.info("Inventaire trouvé avec la date %s", self.target_date_str)
 
             if not target_inventory:
                 self.logger.warning("Inventaire avec la date %s non trouvé", self.target_date_str)
                 return False
 
             # Chercher le bouton de validation/activation pour cet inventaire
-            row = target_inventory['row_element']
+            row = target_inventory.row(self.driver)
 
             # Boutons potentiels de validation
             validation_buttons = []
@@ -1002,7 +1428,6 @@ class SatelixInventoryDateUpdater:
                     actions.double_click(row).perform()
 
                     # Attendre l'ouverture
-                    import time
                     time.sleep(3)
 
                     # Chercher des boutons de validation dans la page/modal ouverte
@@ -1064,7 +1489,15 @@ class SatelixInventoryDateUpdater:
         validation_buttons = []
 
         try:
-            # Sélecteurs pour boutons de validation
+            index = self._page_text()
+            hits = index.find_any(['valider', 'activer', 'lancer', 'demarrer', 'confirmer'], tags=('button',))
+            if hits is not None:
+                hits += [hit for hit in index.find_any(['valider', 'activer'], tags=('a',)) if hit not in hits]
+                for hit in hits:
+                    self.logger.info(f"Bouton de validation trouvé dans la page: '{hit.text}'")
+                return [hit.element for hit in hits]
+
+            # Sélecteurs pour boutons de validation (index indisponible)
             validation_selectors = [
                 "//button[contains(translate(text(), 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'valider')]",
                 "//button[contains(translate(text(), 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'activer')]",
@@ -1103,37 +1536,45 @@ class SatelixInventoryDateUpdater:
                 ".btn[title*='reprendre']",
                 ".btn-success"  # Le bouton vert "Reprendre un inventaire archivé"
             ]
+            hits = self._page_text().find('reprendre', usable=False)
+            if hits is not None:
+                candidates = [("index", [hit.element for hit in hits if 'inventaire' in hit.text])]
+            else:
+                candidates = [(selector, None) for selector in archive_button_selectors]
 
-            for selector in archive_button_selectors:
+            for selector, buttons in candidates:
                 try:
-                    buttons = self.driver.find_elements(By.XPATH if selector.startswith("//") else By.CSS_SELECTOR, selector)
+                    if buttons is None:
+                        buttons = self.driver.find_elements(By.XPATH if selector.startswith("//") else By.CSS_SELECTOR, selector)
                     for button in buttons:
                         button_text = button.text.lower()
                         if 'reprendre' in button_text and 'inventaire' in button_text:
                             self.logger.info(f"Bouton 'Reprendre' trouvé: {button.text}")
                             button.click()
 
-                            import time
                             time.sleep(3)
 
                             # Chercher l'inventaire avec notre date dans la liste des archivés
-                            archived_inventories = self.find_existing_inventories()
-                            for inventory in archived_inventories:
-                                if inventory['date_str'] == self.target_date_str:
-                                    self.logger.info(f"Inventaire archivé trouvé: {inventory['date_str']}")
-
-                                    # Essayer de l'activer
-                                    if 'action_button' in inventory and inventory['action_button']:
-                                        inventory['action_button'].click()
-                                        time.sleep(2)
-                                        return True
-                                    elif 'row_element' in inventory:
-                                        # Double-clic sur la ligne
-                                        from selenium.webdriver.common.action_chains import ActionChains
-                                        actions = ActionChains(self.driver)
-                                        actions.double_click(inventory['row_element']).perform()
-                                        time.sleep(2)
-                                        return True
+                            self._table_reader().current_page = 1
+                            self._inventory_query().reset_state()
+                            inventory = self.find_inventory_by_date(self.target_date_str)
+                            if inventory:
+                                self.logger.info(f"Inventaire archivé trouvé: {inventory.date_str}")
+
+                                # Essayer de l'activer
+                                action_button = inventory.action_button(self.driver)
+                                row = inventory.row(self.driver)
+                                if action_button:
+                                    action_button.click()
+                                    time.sleep(2)
+                                    return True
+                                elif row is not None:
+                                    # Double-clic sur la ligne
+                                    from selenium.webdriver.common.action_chains import ActionChains
+                                    actions = ActionChains(self.driver)
+                                    actions.double_click(row).perform()
+                                    time.sleep(2)
+                                    return True
 
                             # Revenir à la page principale
                             self.navigate_to_inventaires()
@@ -1151,31 +1592,33 @@ class SatelixInventoryDateUpdater:
         """Mettre à jour la date d'un inventaire spécifique"""
         try:
             self.logger.info("Mise à jour de l'inventaire du %s vers %s",
-                           inventory_info['date_str'], self.target_date_str)
+                           inventory_info.date_str, self.target_date_str)
 
             # Attendre que tout modal/spinner disparaisse
             try:
-                self.wait.until(
-                    EC.invisibility_of_element_located((By.ID, "modalSpinner"))
+                self._wait('spinner_modification',
+                    EC.invisibility_of_element_located((By.ID, "modalSpinner")), tolerated=True
                 )
             except:
                 pass
 
             # Attendre qu'il n'y ait plus de modals ouverts
             try:
-                self.wait.until(
-                    EC.invisibility_of_element_located((By.CSS_SELECTOR, ".modal.show"))
+                self._wait('fermeture_modal',
+                    EC.invisibility_of_element_located((By.CSS_SELECTOR, ".modal.show")), tolerated=True
                 )
             except:
                 pass
 
             # Attendre un petit moment pour s'assurer que la page est stable
-            import time
             time.sleep(2)
 
+            # Résolution à la demande: la ligne est relocalisée même après une actualisation
+            row = inventory_info.row(self.driver) if inventory_info.action_locator is None else None
+            action_button = None if row is not None else inventory_info.action_button(self.driver)
+
             # Méthode principale: Double-clic sur la ligne de l'inventaire
-            if 'row_element' in inventory_info:
-                row = inventory_info['row_element']
+            if row is not None:
                 self.logger.info("Double-clic sur la ligne de l'inventaire")
 
                 # Scroll vers l'élément pour le rendre visible
@@ -1189,29 +1632,29 @@ class SatelixInventoryDateUpdater:
 
                 # Attendre l'ouverture de la modal d'édition
                 try:
-                    self.wait.until(
+                    self._wait('modal_edition_double_clic',
                         EC.any_of(
                             EC.presence_of_element_located((By.CSS_SELECTOR, ".modal-body")),
                             EC.presence_of_element_located((By.CSS_SELECTOR, "input[type='date']")),
                             EC.presence_of_element_located((By.CSS_SELECTOR, "input[placeholder*='date']")),
                             EC.presence_of_element_located((By.XPATH, "//input[contains(@name, 'date')]"))
-                        )
+                        ),
+                        tolerated=True
                     )
                     self.logger.info("Modal d'édition ouverte")
                 except:
                     self.logger.warning("Modal d'édition non détectée, tentative alternative")
 
             # Méthode alternative: Clic sur un bouton d'édition si présent
-            elif 'action_button' in inventory_info and inventory_info['action_button']:
-                action_button = inventory_info['action_button']
+            elif action_button:
                 self.driver.execute_script("arguments[0].scrollIntoView();", action_button)
 
                 # Attendre que l'élément soit cliquable
-                self.wait.until(EC.element_to_be_clickable(action_button))
+                self._wait('bouton_modification', EC.element_to_be_clickable(action_button))
                 action_button.click()
 
                 # Attendre l'ouverture de la modal/page d'édition
-                self.wait.until(
+                self._wait('modal_edition_bouton',
                     EC.any_of(
                         EC.presence_of_element_located((By.CSS_SELECTOR, "input[type='date']")),
                         EC.presence_of_element_located((By.CSS_SELECTOR, "input[placeholder*='date']")),
@@ -1241,7 +1684,7 @@ class SatelixInventoryDateUpdater:
                     for field in fields:
                         # Vérifier si le champ contient une date ou est vide et éditable
                         field_value = field.get_attribute('value') or ""
-                        if ('/' in field_value and len(field_value) == 10) or field_value == "" or "date" in field.get_attribute('name', '').lower():
+                        if ('/' in field_value and len(field_value) == 10) or field_value == "" or "date" in (field.get_attribute('name') or '').lower():
                             date_field = field
                             self.logger.info(f"Champ de date trouvé: {selector}, valeur actuelle: '{field_value}'")
                             break
@@ -1304,15 +1747,18 @@ class SatelixInventoryDateUpdater:
     def _save_changes(self):
         """Sauvegarder les modifications"""
         try:
-            import time
             # Essayer différentes méthodes de sauvegarde
 
             # Méthode 1: Bouton Sauvegarder/Enregistrer avec sélecteurs plus larges
-            save_buttons = [
-                "//button[contains(translate(text(), 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'sauvegarder')]",
-                "//button[contains(translate(text(), 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'enregistrer')]",
-                "//button[contains(translate(text(), 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'valider')]",
-                "//button[contains(translate(text(), 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'confirmer')]",
+            keywords = ['sauvegarder', 'enregistrer', 'valider', 'confirmer']
+            hits = self._page_text().find_any(keywords, tags=('button',))
+            if hits is not None:
+                candidates = [("index", [hit.element for hit in hits])]
+                save_buttons = []
+            else:
+                candidates = []
+                save_buttons = [f"//button[contains(translate(text(), 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), '{keyword}')]" for keyword in keywords]
+            save_buttons += [
                 "//button[contains(text(), 'OK')]",
                 "//input[@type='submit']",
                 "//button[@type='submit']",
@@ -1320,10 +1766,13 @@ class SatelixInventoryDateUpdater:
                 "//button[contains(@class, 'btn-success')]"
             ]
 
+            candidates += [(selector, None) for selector in save_buttons]
+
             self.logger.info("Recherche du bouton de sauvegarde...")
-            for selector in save_buttons:
+            for selector, buttons in candidates:
                 try:
-                    buttons = self.driver.find_elements(By.XPATH, selector)
+                    if buttons is None:
+                        buttons = self.driver.find_elements(By.XPATH, selector)
                     for button in buttons:
                         if button.is_displayed() and button.is_enabled():
                             self.logger.info(f"Bouton trouvé: {button.text} - {selector}")
@@ -1332,13 +1781,14 @@ class SatelixInventoryDateUpdater:
 
                             # Attendre la confirmation ou fermeture de modal
                             try:
-                                self.wait.until(
+                                self._wait('confirmation_modification',
                                     EC.any_of(
                                         EC.presence_of_element_located((By.XPATH, "//*[contains(translate(text(), 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'succès')]")),
                                         EC.presence_of_element_located((By.XPATH, "//*[contains(translate(text(), 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'modifié')]")),
                                         EC.presence_of_element_located((By.XPATH, "//*[contains(translate(text(), 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'enregistré')]")),
                                         EC.invisibility_of_element_located((By.CSS_SELECTOR, ".modal.show"))  # Modal fermée
-                                    )
+                                    ),
+                                    tolerated=True
                                 )
                                 self.logger.info("Confirmation de sauvegarde détectée")
                                 return True
@@ -1384,7 +1834,7 @@ class SatelixInventoryDateUpdater:
             self.driver.refresh()
 
             # Attendre le rechargement
-            self.wait.until(
+            self._wait('actualisation_liste',
                 EC.any_of(
                     EC.presence_of_element_located((By.XPATH, "//h1[contains(text(), 'Inventaire')]")),
                     EC.presence_of_element_located((By.CSS_SELECTOR, "table")),
@@ -1392,6 +1842,11 @@ class SatelixInventoryDateUpdater:
                 )
             )
 
+            if self.table_reader is not None:
+                self.table_reader.current_page = 1
+            if self.inventory_query is not None:
+                self.inventory_query.reset_state()
+
             self.take_screenshot("page_refreshed")
             self.logger.info("Page actualisée avec succès")
             return True
@@ -1400,119 +1855,97 @@ class SatelixInventoryDateUpdater:
             self.logger.error("Erreur lors de l'actualisation: %s", str(e))
             return False
 
-    def run(self, update_all=True, days_range=None):
+    def run(self, update_all=False, days_range=None, resume=True):
         """
         Méthode principale d'exécution du script
 
+        Sans update_all ni days_range, crée un inventaire à la date cible.
+
         Args:
-            update_all: Si True, met à jour tous les inventaires trouvés
+            update_all: Si True, met à jour la date de tous les inventaires trouvés
             days_range: Si spécifié, met à jour seulement les inventaires dans cette plage de jours
+            resume: Si True, reprend depuis le dernier point de reprise de la date cible
         """
+        self.bulk_mode = bool(update_all or days_range)
+        self.days_range = days_range
+
+        # Une seule exécution à la fois: les demandes concurrentes sont fusionnées
+        run_lock = FileLock(Path('logs') / 'satelix_run.lock')
+        if not run_lock.acquire():
+            self.lock_busy = True
+            owner = run_lock.owner() or {}
+            self.logger.warning("Exécution déjà en cours (PID %s), demande fusionnée", owner.get('pid'))
+            self.close_browser()
+            if self.driver:
+                self.driver.quit()
+                self.driver = None
+            self.watchdog.stop()
+            return 1
+
         try:
             self.logger.info("=== DÉBUT DE LA MISE À JOUR DES DATES D'INVENTAIRES ===")
+            self.watchdog.start_run()
+
+            checkpoint = RunCheckpoint(Path('logs') / 'checkpoints', self.target_date, resume=resume,
+                                       prefix=self.bulk_checkpoint_prefix() if self.bulk_mode
+                                       else self.checkpoint_prefix)
+            if checkpoint.is_completed(RunState.DONE) and self.bulk_mode:
+                self.logger.info("=== DÉJÀ TRAITÉ: mise à jour groupée (%s) vers le %s déjà effectuée ===",
+                                 self.bulk_selection_label(), self.target_date_str)
+                return 0
+            if checkpoint.is_completed(RunState.DONE):
+                self.logger.info("=== DÉJÀ TRAITÉ: inventaire du %s créé lors d'une exécution précédente ===",
+                                 self.target_date_str)
+                self._update_job_queue(succeeded=True)
+                return 0
+            if checkpoint.resumed:
+                self.logger.info("Reprise de l'exécution interrompue (dernier état: %s)", checkpoint.current)
+
+            self.runner = StepRunner(self.breaker, self.max_run_seconds)
+            self.policies = self.build_step_policies()
+
+            handlers = {
+                RunState.VALIDATE: self._state_validate,
+                RunState.DRIVER: self._state_driver,
+                RunState.LOGIN: self._state_login,
+                RunState.NAVIGATE: self._state_navigate,
+                RunState.SCAN: self._state_scan,
+                RunState.CREATE: self._state_create,
+                RunState.VERIFY: self._state_verify,
+                RunState.ACTIVATE_DRAFT: self._state_activate_draft,
+                RunState.BULK_UPDATE: self._state_bulk_update
+            }
 
-            # Validation des variables d'environnement
-            if not self.validate_environment():
-                return 2
-
-            # Initialisation du driver
-            if not self.setup_driver():
-                return 2
-
-            # Étapes d'automatisation
-            steps = [
-                ("Connexion", self.login),
-                ("Navigation vers Inventaires", self.navigate_to_inventaires)
-            ]
-
-            for step_name, step_func in steps:
-                self.logger.info("Étape: %s", step_name)
-                if not step_func():
-                    self.logger.error("Échec à l'étape: %s", step_name)
-                    return 2
-
-            # Rechercher les inventaires existants pour servir de template
-            inventories = self.find_existing_inventories()
-
-            if not inventories:
-                self.logger.warning("Aucun inventaire trouvé pour servir de template")
-                self.logger.info("Création d'un inventaire simple avec la date %s", self.target_date_str)
-
-                # Créer un inventaire sans template
-                if self.create_new_inventory():
-                    self.logger.info("=== SUCCÈS: 1 inventaire créé avec la date %s ===", self.target_date_str)
-                    return 0
-                else:
+            state = RunState.VALIDATE
+            while state != RunState.DONE:
+                checkpoint.enter(state)
+                # La mise à jour groupée est limitée inventaire par inventaire
+                with self.watchdog.step(state, seconds=0 if state == RunState.BULK_UPDATE else None):
+                    next_state = handlers[state](checkpoint)
+                if self.watchdog.breached:
+                    self.logger.error("=== ÉCHEC: exécution interrompue par le chien de garde (%s) ===",
+                                      self.watchdog.breached)
                     return 2
+                if isinstance(next_state, int):
+                    # Échec: le code de sortie remplace l'état suivant
+                    self._update_job_queue(succeeded=False)
+                    return next_state
+                checkpoint.complete(state)
+                state = next_state
 
-            # Utiliser le premier inventaire comme template
-            template_inventory = inventories[0]
-            self.logger.info("Utilisation de l'inventaire '%s' comme template",
-                           template_inventory.get('date_str', 'N/A'))
-
-            # Créer un nouvel inventaire basé sur le template
-            self.logger.info("Création d'un nouvel inventaire avec la date %s", self.target_date_str)
-
-            if self.create_new_inventory(template_inventory):
-                self.logger.info("Nouvel inventaire créé avec succès")
-
-                # Attendre plus longtemps pour que l'inventaire soit traité
-                import time
-                time.sleep(5)
-
-                # Actualiser plusieurs fois pour voir le nouvel inventaire
-                for i in range(3):
-                    self.refresh_inventories()
-                    time.sleep(3)
-
-                    # Vérifier si l'inventaire apparaît
-                    inventories = self.find_existing_inventories()
-                    for inventory in inventories:
-                        if inventory['date_str'] == self.target_date_str:
-                            self.logger.info("Inventaire trouvé après actualisation %d", i+1)
-                            break
-                    else:
-                        continue
-                    break
-
-                # L'inventaire a été créé avec succès
-                updated_count = 1
-                self.logger.info("Inventaire créé avec succès")
-
-                # Retourner à la page Inventaires pour vérification finale
-                self.navigate_to_inventaires()
-                time.sleep(2)
-
-                # Vérification finale - chercher l'inventaire créé
-                final_inventories = self.find_existing_inventories()
-                inventory_found = False
-                for inventory in final_inventories:
-                    if inventory['date_str'] == self.target_date_str:
-                        inventory_found = True
-                        self.logger.info("✅ Inventaire confirmé visible dans la liste: %s", self.target_date_str)
-                        break
-
-                if not inventory_found:
-                    # Chercher dans les archives/brouillons
-                    self.logger.info("Inventaire non visible dans la liste principale, recherche dans les brouillons...")
-                    if self.find_and_activate_draft_inventory():
-                        self.logger.info("✅ Inventaire trouvé et activé depuis les brouillons")
-                    else:
-                        self.logger.warning("⚠️  Inventaire créé mais non visible (peut être en attente de validation)")
-            else:
-                updated_count = 0
-                self.logger.error("Échec de la création du nouvel inventaire")
+            checkpoint.complete(RunState.DONE)
 
             # Actualiser la page pour voir les changements
             self.refresh_inventories()
 
-            if updated_count > 0:
-                self.logger.info("=== SUCCÈS: %d inventaire créé avec la date %s ===",
-                               updated_count, self.target_date_str)
+            if self.bulk_mode:
+                self.logger.info("=== SUCCÈS: %d inventaire(s) mis à jour avec la date %s ===",
+                                 len(checkpoint.get('processed', [])), self.target_date_str)
                 return 0
-            else:
-                self.logger.error("=== ÉCHEC: Aucun inventaire créé ===")
-                return 1
+
+            self._update_job_queue(succeeded=True)
+            self.logger.info("=== SUCCÈS: %d inventaire créé avec la date %s ===", 1, self.target_date_str)
+            return 0
 
         except Exception as e:
             self.logger.error("Erreur inattendue: %s", str(e))
@@ -1521,30 +1954,329 @@ class SatelixInventoryDateUpdater:
 
         finally:
             # Nettoyage
+            self.close_browser()
+            if self.watchdog.peak_rss:
+                self.logger.info("Pic mémoire du navigateur: %.0f Mo", self.watchdog.peak_rss / (1024 * 1024))
             if self.driver:
                 try:
                     self.driver.quit()
                     self.logger.info("Driver fermé proprement")
                 except Exception as e:
                     self.logger.error("Erreur lors de la fermeture du driver: %s", str(e))
+                self.driver = None
+            self.watchdog.stop()
+            self.wait_timeouts.save()
+            if self.chrome_profile is not None:
+                self.chrome_profile.release()
+            if self.retention_after_run:
+                try:
+                    SatelixRetention().run()
+                except Exception as e:
+                    self.logger.warning("Erreur lors de l'archivage des logs: %s", str(e))
+            run_lock.release()
+
+    # Chaque gestionnaire d'état retourne l'état suivant, ou un code de sortie en cas d'échec
+
+    def _state_validate(self, checkpoint):
+        """Validation de la configuration et de la disponibilité du serveur"""
+        if not self.validate_environment():
+            return 2
+
+        # Serveur jugé indisponible: ne pas lancer Chrome pour rien
+        if not self.breaker.allow():
+            self.logger.error("Disjoncteur ouvert: serveur Satelix indisponible, nouvelle tentative dans %d s",
+                              self.breaker.remaining_open_seconds())
+            self.offline = True
+            return 2
+
+        if not self.preflight():
+            return 2
+
+        return RunState.DRIVER
+
+    def preflight(self):
+        """Requête légère sur la page de connexion: une panne est constatée avant le lancement de Chrome"""
+        if not self.preflight_enabled:
+            return True
+        probe = probe_login_page(self.login_url, self.preflight_timeout, self.host_resolver)
+        log_probe(probe, self.logger)
+        if not probe.ok and probe.transient:
+            self.breaker.record_failure()
+            self.offline = True
+        return probe.ok
+
+    def _update_job_queue(self, succeeded):
+        """Mettre en attente une création empêchée par une panne du serveur, ou retirer un travail abouti"""
+        if self.job_queue is None or self.bulk_mode:
+            return
+        try:
+            if succeeded:
+                if self.job_queue.complete(self.target_date, self.job_depot):
+                    self.logger.info("Création du %s retirée de la file d'attente", self.target_date_str)
+            elif self.offline and self.job_queue.enqueue(self.target_date, self.job_depot, self.intitule,
+                                                          reason="serveur injoignable"):
+                self.logger.warning("Création du %s mise en file d'attente: elle sera exécutée au retour "
+                                    "du serveur", self.target_date_str)
+        except Exception as e:
+            self.logger.warning("File d'attente hors ligne indisponible: %s", str(e))
+
+    def _state_driver(self, checkpoint):
+        """Initialisation du driver (sauf s'il a été préchauffé par le planificateur)"""
+        if self.driver:
+            self.logger.info("Driver Chrome déjà initialisé, réutilisation")
+        elif not self.setup_driver():
+            return 2
+        return RunState.LOGIN
+
+    def _state_login(self, checkpoint):
+        """Connexion à Satelix"""
+        self.logger.info("Étape: %s", "Connexion")
+        if not self.runner.run_step("Connexion", self.login, self.policies['login']):
+            self.logger.error("Échec à l'étape: %s", "Connexion")
+            return 2
+        return RunState.NAVIGATE
+
+    def _state_navigate(self, checkpoint):
+        """Navigation vers la page Inventaires"""
+        self.logger.info("Étape: %s", "Navigation vers Inventaires")
+        if not self.runner.run_step("Navigation vers Inventaires", self.navigate_to_inventaires,
+                                    self.policies['navigate']):
+            self.logger.error("Échec à l'étape: %s", "Navigation vers Inventaires")
+            return 2
+
+        if self.bulk_mode:
+            return RunState.BULK_UPDATE
+
+        # L'inventaire a déjà été créé lors d'une exécution précédente: ne pas le recréer
+        resume_from = checkpoint.resume_from()
+        if resume_from is not None:
+            next_state = RunState.ORDER[RunState.ORDER.index(resume_from) + 1]
+            self.logger.info("Inventaire déjà créé lors d'une exécution précédente, reprise à l'état: %s",
+                             next_state)
+            return next_state
+
+        return RunState.SCAN
+
+    def _state_scan(self, checkpoint):
+        """Rechercher les inventaires existants pour servir de template"""
+        inventories = self.find_existing_inventories()
+
+        # Arrêt brutal pendant la création: ne pas créer de doublon si l'inventaire existe
+        if checkpoint.was_interrupted_in(RunState.CREATE):
+            if self.find_inventory_by_date(self.target_date_str) is not None:
+                self.logger.info("Inventaire du %s présent après interruption, création ignorée",
+                                 self.target_date_str)
+                checkpoint.complete(RunState.CREATE)
+                return RunState.VERIFY
+
+        if not inventories:
+            self.logger.warning("Aucun inventaire trouvé pour servir de template")
+            self.logger.info("Création d'un inventaire simple avec la date %s", self.target_date_str)
+            self.template_inventory = None
+        else:
+            # Utiliser le premier inventaire comme template
+            self.template_inventory = inventories[0]
+            self.logger.info("Utilisation de l'inventaire '%s' comme template",
+                           self.template_inventory.date_str)
+
+        checkpoint.complete(RunState.SCAN, has_template=self.template_inventory is not None)
+        return RunState.CREATE
+
+    def _state_create(self, checkpoint):
+        """Créer un nouvel inventaire basé sur le template"""
+        self.logger.info("Création d'un nouvel inventaire avec la date %s", self.target_date_str)
+
+        template_inventory = self.template_inventory
+        if not self.runner.run_step("Création de l'inventaire",
+                                    lambda: self.create_new_inventory(template_inventory),
+                                    self.policies['create']):
+            if template_inventory is None:
+                return 2
+            self.logger.error("Échec de la création du nouvel inventaire")
+            self.refresh_inventories()
+            self.logger.error("=== ÉCHEC: Aucun inventaire créé ===")
+            return 1
+
+        self.logger.info("Nouvel inventaire créé avec succès")
+        return RunState.VERIFY
+
+    def _state_verify(self, checkpoint):
+        """Vérifier que l'inventaire créé apparaît dans la liste"""
+
+        # Attendre plus longtemps pour que l'inventaire soit traité
+        time.sleep(5)
+
+        # Actualiser plusieurs fois pour voir le nouvel inventaire
+        for i in range(3):
+            self.refresh_inventories()
+            time.sleep(3)
+
+            # Vérifier si l'inventaire apparaît
+            if self.find_inventory_by_date(self.target_date_str) is not None:
+                self.logger.info("Inventaire trouvé après actualisation %d", i+1)
+                break
+
+        # Retourner à la page Inventaires pour vérification finale
+        self.navigate_to_inventaires()
+        time.sleep(2)
+
+        # Vérification finale - chercher l'inventaire créé
+        if self.find_inventory_by_date(self.target_date_str) is not None:
+            self.logger.info("✅ Inventaire confirmé visible dans la liste: %s", self.target_date_str)
+            return RunState.DONE
+
+        return RunState.ACTIVATE_DRAFT
+
+    def _state_activate_draft(self, checkpoint):
+        """Chercher l'inventaire dans les brouillons et l'activer"""
+        self.logger.info("Inventaire non visible dans la liste principale, recherche dans les brouillons...")
+        if self.find_and_activate_draft_inventory():
+            self.logger.info("✅ Inventaire trouvé et activé depuis les brouillons")
+        else:
+            self.logger.warning("⚠️  Inventaire créé mais non visible (peut être en attente de validation)")
+        return RunState.DONE
+
+    def _state_bulk_update(self, checkpoint):
+        """Mettre à jour la date des inventaires sélectionnés (--all / --days)"""
+        processed = set(checkpoint.get('processed', []))
+        failed = []
+
+        # Une seule lecture de la table: les enregistrements se relocalisent ensuite à la demande
+        queue = deque(record for record in self.select_inventories_for_update()
+                      if self._record_key(record) not in processed)
+
+        if processed:
+            self.logger.info("Reprise de la mise à jour groupée: %d inventaire(s) déjà traité(s)", len(processed))
+        if not queue:
+            self.logger.info("Aucun inventaire à mettre à jour")
+            return RunState.DONE
+
+        total = len(queue)
+        self.logger.info("Mise à jour groupée: %d inventaire(s) en file d'attente", total)
+
+        latencies = []
+        started = time.monotonic()
+        while queue:
+            record = queue.popleft()
+            item_started = time.monotonic()
+
+            with self.watchdog.step(f"inventaire du {record.date_str}"):
+                # Ligne lue sur une autre page de la table: l'afficher avant de la relocaliser
+                self._table_reader().show_page(record.page)
+                success = self.update_inventory_date(record)
+                if not success and not self.watchdog.breached:
+                    # Remise en état (modal bloquée, page expirée) puis une seule nouvelle tentative
+                    self.logger.warning("Nouvelle tentative pour l'inventaire du %s", record.date_str)
+                    if self.navigate_to_inventaires():
+                        success = self.update_inventory_date(record)
+
+            latency = time.monotonic() - item_started
+            latencies.append(latency)
+
+            if success:
+                processed.add(self._record_key(record))
+                checkpoint.complete(RunState.BULK_UPDATE, processed=sorted(processed))
+            else:
+                failed.append(record.date_str)
+
+            self.logger.info("Progression: %d/%d - inventaire du %s %s en %.1fs",
+                             total - len(queue), total, record.date_str,
+                             "mis à jour" if success else "en échec", latency)
+
+            if self.watchdog.breached:
+                # Navigateur arrêté: les inventaires restants seront traités à la reprise
+                break
+            if self.runner.remaining_seconds() <= 0:
+                self.logger.error("Budget de temps épuisé, %d inventaire(s) restant(s) pour la prochaine reprise",
+                                  len(queue))
+                break
+
+        elapsed = time.monotonic() - started
+        latencies.sort()
+        self.logger.info("Mise à jour groupée terminée: %d/%d en %.1fs (%.1f inventaires/min, "
+                         "latence médiane %.1fs, max %.1fs)",
+                         total - len(failed) - len(queue), total, elapsed,
+                         60 * len(latencies) / elapsed if elapsed else 0,
+                         latencies[len(latencies) // 2], latencies[-1])
+
+        if failed or queue:
+            self.logger.error("=== ÉCHEC PARTIEL: %d inventaire(s) non mis à jour: %s ===",
+                              len(failed) + len(queue), ', '.join(failed + [r.date_str for r in queue]))
+            return 1
+        return RunState.DONE
+
+    def bulk_checkpoint_prefix(self):
+        """Point de reprise propre à la sélection: --all et chaque --days N sont des traitements distincts"""
+        return f"mise_a_jour_jours{self.days_range}" if self.days_range else 'mise_a_jour_tous'
+
+    def bulk_selection_label(self):
+        return f"{self.days_range} dernier(s) jour(s)" if self.days_range else 'tous les inventaires'
+
+    def select_inventories_for_update(self):
+        """Sélectionner les inventaires à re-dater depuis une seule lecture de la table (toutes pages)"""
+        records = [record for record in self.iter_inventories()
+                   if record.date_str != self.target_date_str]
+
+        if self.days_range:
+            limit = datetime.now() - timedelta(days=self.days_range)
+            records = [record for record in records if record.date >= limit]
+
+        return records
+
+    @staticmethod
+    def _record_key(record):
+        """Identifiant stable d'un inventaire pour le point de reprise"""
+        return record.data_id or f"{record.date_str}|{record.locator}|{record.index}"
 
 
 def main():
     """Point d'entrée principal avec arguments en ligne de commande"""
     import argparse
 
-    parser = argparse.ArgumentParser(description='Mise à jour des dates d\'inventaires Satelix')
+    parser = argparse.ArgumentParser(
+        description='Mise à jour des dates d\'inventaires Satelix',
+        epilog='BROWSER_BACKEND=playwright ne concerne que la connexion, la navigation et les captures '
+               'd\'écran: la table des inventaires, les modales et les formulaires passent par Selenium.')
     parser.add_argument('--date', '-d',
                        help='Date cible au format DD/MM/YYYY (défaut: aujourd\'hui)')
     parser.add_argument('--days', '-n', type=int,
                        help='Mettre à jour seulement les inventaires des N derniers jours')
     parser.add_argument('--all', '-a', action='store_true',
-                       help='Mettre à jour tous les inventaires trouvés (défaut)')
+                       help='Mettre à jour la date de tous les inventaires trouvés')
     parser.add_argument('--update-today', action='store_true',
                        help='Créer un inventaire avec la date d\'aujourd\'hui')
+    parser.add_argument('--restart', action='store_true',
+                       help='Ignorer le point de reprise de la date cible et repartir de zéro')
+    parser.add_argument('--serve', action='store_true',
+                       help='Lancer le service de planification intégré (SCHEDULE_TIME / SCHEDULE_DAYS)')
+    parser.add_argument('--dates',
+                       help='Créer les inventaires de plusieurs dates (DD/MM/YYYY,DD/MM/YYYY,...) en parallèle')
+    parser.add_argument('--depots',
+                       help='Créer un inventaire par dépôt (DEPOT1,DEPOT2,...) en parallèle')
+    parser.add_argument('--contexts', type=int,
+                       help='Nombre de contextes navigateur concurrents (défaut: BROWSER_CONTEXTS)')
 
     args = parser.parse_args()
 
+    if args.serve:
+        from scheduler import SatelixScheduler
+        load_dotenv()
+        configure_logging()
+        sys.exit(SatelixScheduler().serve())
+
+    if args.dates or args.depots:
+        from context_pool import ContextPool
+        try:
+            dates = [datetime.strptime(item.strip(), '%d/%m/%Y')
+                     for item in (args.dates or args.date or datetime.now().strftime('%d/%m/%Y')).split(',')
+                     if item.strip()]
+        except ValueError:
+            print("Erreur: Format de date invalide. Utilisez DD/MM/YYYY[,DD/MM/YYYY...]")
+            sys.exit(1)
+        depots = [item.strip() for item in args.depots.split(',') if item.strip()] if args.depots else None
+        configure_logging()
+        sys.exit(ContextPool(args.contexts).run(dates, depots, resume=not args.restart))
+
     # Déterminer la date cible
     target_date = None
     if args.date:
@@ -1555,12 +2287,11 @@ def main():
             sys.exit(1)
     elif args.update_today:
         # Pour --update-today, utiliser la date d'aujourd'hui
-        from datetime import datetime
         target_date = datetime.now().strftime("%d/%m/%Y")
 
     # Initialiser et exécuter
     automation = SatelixInventoryDateUpdater(target_date)
-    exit_code = automation.run(update_all=args.all or not args.days, days_range=args.days)
+    exit_code = automation.run(update_all=args.all, days_range=args.days, resume=not args.restart)
     sys.exit(exit_code)
 
 
@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+Service de planification intégré pour Satelix (mode --serve)
+Garde les horaires configurés en mémoire, prépare un driver Chrome avant
+l'heure prévue et rattrape les exécutions manquées après un arrêt
+"""
+
+import os
+import json
+import time
+import logging
+from datetime import datetime, timedelta
+from pathlib import Path
+from dotenv import load_dotenv
+
+from job_queue import JobQueue, ConnectivityWatcher
+
+
+WEEKDAY_CODES = ['MON', 'TUE', 'WED', 'THU', 'FRI', 'SAT', 'SUN']
+
+
+class SatelixScheduler:
+    """Planificateur quotidien en processus avec rattrapage des exécutions manquées"""
+
+    def __init__(self):
+        """Initialisation à partir du fichier .env"""
+        load_dotenv()
+
+        self.logger = logging.getLogger(__name__)
+
+        self.times = self.parse_times(os.getenv('SCHEDULE_TIME', '08:00'))
+        self.days = self.parse_days(os.getenv('SCHEDULE_DAYS', 'MON,TUE,WED,THU,FRI'))
+        self.warmup_seconds = int(os.getenv('SCHEDULE_WARMUP', '120'))
+        self.catchup_days = int(os.getenv('SCHEDULE_CATCHUP_DAYS', '3'))
+        self.poll_seconds = int(os.getenv('SCHEDULE_POLL', '30'))
+        self.retry_minutes = int(os.getenv('SCHEDULE_RETRY_MINUTES', '30'))
+
+        self.state_file = Path('logs') / 'scheduler_state.json'
+
+        # Créations mises en attente pendant une panne, exécutées au retour du serveur
+        self.job_queue = JobQueue() if os.getenv('OFFLINE_QUEUE', 'true').lower() == 'true' else None
+        self.watcher = ConnectivityWatcher(os.getenv('SATELIX_URL_LOGIN'))
+        self.warm_updater = None
+        self.running = False
+
+    @staticmethod
+    def parse_times(value):
+        """Convertir 'HH:MM[,HH:MM...]' en liste triée de (heure, minute)"""
+        times = set()
+        for item in value.split(','):
+            item = item.strip()
+            if item:
+                parsed = datetime.strptime(item, '%H:%M')
+                times.add((parsed.hour, parsed.minute))
+        if not times:
+            raise ValueError("Aucune heure d'exécution configurée")
+        return sorted(times)
+
+    @staticmethod
+    def parse_days(value):
+        """Convertir 'MON,TUE,...' en ensemble d'indices de jours (lundi=0)"""
+        days = set()
+        for item in value.split(','):
+            code = item.strip().upper()
+            if code:
+                days.add(WEEKDAY_CODES.index(code))
+        if not days:
+            raise ValueError("Aucun jour d'exécution configuré")
+        return days
+
+    def load_state(self):
+        """Charger le dernier créneau traité"""
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            return datetime.fromisoformat(data['last_slot'])
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def load_retries(self):
+        """Charger les dates en échec à retenter (date -> heure de la prochaine tentative)"""
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            return {datetime.strptime(day, '%Y-%m-%d').date(): datetime.fromisoformat(retry_at)
+                    for day, retry_at in data.get('retries', {}).items()}
+        except (OSError, ValueError, AttributeError):
+            return {}
+
+    def save_state(self, last_slot, retries=None):
+        """Persister le dernier créneau traité et les dates en échec à retenter"""
+        self.state_file.parent.mkdir(exist_ok=True)
+        tmp_file = self.state_file.with_suffix('.tmp')
+        data = {'last_slot': last_slot.isoformat(timespec='minutes')}
+        if retries:
+            data['retries'] = {day.isoformat(): retry_at.isoformat(timespec='minutes')
+                               for day, retry_at in sorted(retries.items())}
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        os.replace(tmp_file, self.state_file)
+
+    def slots_between(self, start, end):
+        """Lister les créneaux planifiés dans l'intervalle ]start, end]"""
+        slots = []
+        day = start.date()
+        while day <= end.date():
+            if day.weekday() in self.days:
+                for hour, minute in self.times:
+                    slot = datetime(day.year, day.month, day.day, hour, minute)
+                    if start < slot <= end:
+                        slots.append(slot)
+            day += timedelta(days=1)
+        return slots
+
+    def next_slot(self, now):
+        """Prochain créneau strictement après maintenant"""
+        slots = self.slots_between(now, now + timedelta(days=8))
+        return slots[0] if slots else None
+
+    def pending_dates(self, now, last_slot):
+        """Dates à traiter: les créneaux manqués d'une même journée sont fusionnés"""
+        window_start = now - timedelta(days=self.catchup_days)
+        start = max(last_slot, window_start) if last_slot else now
+        slots = self.slots_between(start, now)
+        if not slots:
+            return [], None
+
+        dates = sorted({slot.date() for slot in slots})
+        return dates, slots[-1]
+
+    def prepare_warm_driver(self, slot):
+        """Lancer Chrome en avance pour que le créneau démarre sans latence"""
+        if self.warm_updater is not None:
+            return
+
+        from satelix_simple import SatelixInventoryDateUpdater
+
+        self.logger.info("Préchauffage du driver Chrome pour le créneau de %s", slot.strftime('%d/%m/%Y %H:%M'))
+        updater = SatelixInventoryDateUpdater(slot)
+        if updater.validate_environment() and updater.preflight() and updater.setup_driver():
+            self.warm_updater = updater
+        else:
+            self.logger.warning("Préchauffage impossible, le driver sera lancé à l'heure prévue")
+
+    def release_warm_driver(self):
+        """Fermer un driver préchauffé non utilisé"""
+        if self.warm_updater and self.warm_updater.driver:
+            try:
+                self.warm_updater.driver.quit()
+            except Exception as e:
+                self.logger.warning("Erreur lors de la fermeture du driver préchauffé: %s", str(e))
+        if self.warm_updater:
+            self.warm_updater.watchdog.stop()
+            if self.warm_updater.chrome_profile is not None:
+                self.warm_updater.chrome_profile.release()
+        self.warm_updater = None
+
+    def run_for_date(self, day):
+        """Exécuter la création d'inventaire pour une date donnée"""
+        from satelix_simple import SatelixInventoryDateUpdater
+
+        target = datetime(day.year, day.month, day.day)
+        updater = self.warm_updater
+        if updater is not None and updater.target_date.date() == day:
+            self.logger.info("Utilisation du driver préchauffé")
+            self.warm_updater = None
+        else:
+            self.release_warm_driver()
+            updater = SatelixInventoryDateUpdater(target)
+
+        started = time.monotonic()
+        exit_code = updater.run()
+        self.logger.info("Exécution planifiée du %s terminée (code %d) en %.1fs",
+                         target.strftime('%d/%m/%Y'), exit_code, time.monotonic() - started)
+        return exit_code
+
+    def flush_queue(self):
+        """Exécuter les créations en attente (par date croissante) dès que le serveur répond"""
+        if self.job_queue is None or not self.watcher.due() or not self.job_queue.pending():
+            return 0
+        if not self.watcher.check().ok:
+            return 0
+        # Le driver préchauffé sera relancé pour le prochain créneau
+        self.release_warm_driver()
+        return self.job_queue.flush()
+
+    def tick(self, now=None):
+        """Une itération de la boucle: exécuter les créneaux dus puis préchauffer"""
+        now = now or datetime.now()
+
+        last_slot = self.load_state()
+        if last_slot is None:
+            # Premier démarrage: pas de rattrapage sur un historique inconnu
+            self.save_state(now)
+            last_slot = now
+
+        self.flush_queue()
+
+        dates, newest_slot = self.pending_dates(now, last_slot)
+
+        # Dates en échec: retentées après SCHEDULE_RETRY_MINUTES, dans la fenêtre de rattrapage
+        retries = self.load_retries()
+        window_start = (now - timedelta(days=self.catchup_days)).date()
+        retries = {day: retry_at for day, retry_at in retries.items() if day >= window_start}
+        due = [day for day, retry_at in retries.items() if retry_at <= now and day not in dates]
+        if due:
+            self.logger.info("Nouvelle tentative pour %d date(s) en échec: %s", len(due),
+                             ', '.join(d.strftime('%d/%m/%Y') for d in sorted(due)))
+
+        if dates or due:
+            if len(dates) > 1:
+                self.logger.info("Rattrapage de %d exécution(s) manquée(s): %s", len(dates),
+                                 ', '.join(d.strftime('%d/%m/%Y') for d in dates))
+            for day in sorted(set(dates) | set(due)):
+                if self.run_for_date(day) == 0:
+                    retries.pop(day, None)
+                else:
+                    retries[day] = datetime.now() + timedelta(minutes=self.retry_minutes)
+                    self.logger.warning("Exécution du %s en échec, nouvelle tentative vers %s",
+                                        day.strftime('%d/%m/%Y'), retries[day].strftime('%H:%M'))
+            self.save_state(newest_slot or last_slot, retries)
+
+        next_slot = self.next_slot(datetime.now())
+        if next_slot is None:
+            return self.poll_seconds
+
+        remaining = (next_slot - datetime.now()).total_seconds()
+        if remaining <= self.warmup_seconds:
+            self.prepare_warm_driver(next_slot)
+
+        # Se réveiller au plus tard au début du préchauffage ou à l'heure prévue
+        until_warmup = remaining - self.warmup_seconds
+        wake = remaining if until_warmup <= 0 else until_warmup
+        return max(1, min(self.poll_seconds, wake))
+
+    def serve(self):
+        """Boucle principale du service"""
+        from locks import FileLock
+
+        service_lock = FileLock(Path('logs') / 'scheduler.lock')
+        if not service_lock.acquire():
+            owner = service_lock.owner() or {}
+            self.logger.error("Service de planification déjà actif (PID %s)", owner.get('pid'))
+            return 1
+
+        self.running = True
+        self.logger.info("Service de planification démarré - horaires: %s - jours: %s",
+                         ', '.join(f"{h:02d}:{m:02d}" for h, m in self.times),
+                         ', '.join(WEEKDAY_CODES[d] for d in sorted(self.days)))
+        try:
+            while self.running:
+                try:
+                    delay = self.tick()
+                except Exception as e:
+                    self.logger.error("Erreur dans la boucle de planification: %s", str(e))
+                    delay = self.poll_seconds
+                time.sleep(delay)
+        except KeyboardInterrupt:
+            self.logger.info("Arrêt du service de planification demandé")
+        finally:
+            self.running = False
+            self.release_warm_driver()
+            service_lock.release()
+
+        return 0
@@ -1,28 +1,25 @@
 @echo off
 cd /d "%~dp0.."
 
-echo Affichage des derniers logs...
-echo.
-
-REM Afficher le fichier de log principal
-if exist "data\logs\satelix_portable.log" (
-    echo === DERNIÈRES ACTIVITÉS ===
-    echo.
-
-    REM Afficher les 20 dernières lignes
-    for /f "skip=1 delims=" %%i in ('more +0 "data\logs\satelix_portable.log"') do (
-        echo %%i
-    ) | more +0
+if not exist "logs\satelix_update_inventory_dates.log" (
+    echo ❌ Aucun fichier de log trouvé.
+    echo Lancez d'abord une mise à jour pour créer des logs.
+    exit /b 0
+)
 
+REM Sans argument: liste des dernières exécutions puis détail de la dernière
+REM Exemples: show_logs.bat --run -2 --level WARNING ^| --date 19/09/2025 ^| --follow
+if "%~1"=="" (
+    python app\log_viewer.py --list
     echo.
-    echo === FIN DES LOGS ===
+    echo === DERNIÈRE EXÉCUTION ===
+    python app\log_viewer.py --run -1
 ) else (
-    echo ❌ Aucun fichier de log trouvé.
-    echo Lancez d'abord une mise à jour pour créer des logs.
+    python app\log_viewer.py %*
 )
 
 echo.
-echo Fichier complet: data\logs\satelix_portable.log
+echo Fichier complet: logs\satelix_update_inventory_dates.log
 echo.
 
-exit /b 0
\ No newline at end of file
+exit /b 0
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Politiques de reprise par étape pour l'automatisation Satelix
+Retries avec backoff, règles d'idempotence et disjoncteur (circuit breaker)
+"""
+
+import os
+import json
+import time
+import logging
+from datetime import datetime
+from pathlib import Path
+
+
+class StepPolicy:
+    """Politique de reprise d'une étape d'automatisation"""
+
+    def __init__(self, retries=0, backoff=2.0, backoff_factor=2.0, max_backoff=30.0,
+                 idempotent=True, already_done=None, recover=None, trips_breaker=False):
+        """
+        Args:
+            retries: nombre de nouvelles tentatives après le premier échec
+            backoff: attente (s) avant la première nouvelle tentative
+            backoff_factor: multiplicateur de l'attente entre deux tentatives
+            max_backoff: attente maximale (s) entre deux tentatives
+            idempotent: si False, l'étape n'est rejouée que si already_done le permet
+            already_done: fonction vérifiant si l'effet de l'étape est déjà acquis
+            recover: fonction remettant le navigateur dans un état connu avant de rejouer
+            trips_breaker: si True, l'échec définitif de l'étape alimente le disjoncteur
+        """
+        self.retries = retries
+        self.backoff = backoff
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.idempotent = idempotent
+        self.already_done = already_done
+        self.recover = recover
+        self.trips_breaker = trips_breaker
+
+    def delay(self, attempt):
+        """Attente avant la tentative numéro attempt (1 = première reprise)"""
+        return min(self.max_backoff, self.backoff * (self.backoff_factor ** (attempt - 1)))
+
+
+class CircuitBreaker:
+    """Disjoncteur persistant: évite de solliciter un serveur Satelix indisponible"""
+
+    def __init__(self, state_file, failure_threshold=3, open_seconds=900):
+        """Initialisation avec le fichier d'état partagé entre les exécutions"""
+        self.state_file = Path(state_file)
+        self.failure_threshold = failure_threshold
+        self.open_seconds = open_seconds
+        self.logger = logging.getLogger(__name__)
+
+    def _load(self):
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {'failures': 0, 'opened_at': None}
+
+    def _save(self, state):
+        self.state_file.parent.mkdir(exist_ok=True)
+        tmp_file = self.state_file.with_suffix('.tmp')
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(state, f)
+        os.replace(tmp_file, self.state_file)
+
+    def remaining_open_seconds(self):
+        """Secondes restantes avant une nouvelle tentative (0 si le disjoncteur est fermé)"""
+        opened_at = self._load().get('opened_at')
+        if not opened_at:
+            return 0
+        elapsed = (datetime.now() - datetime.fromisoformat(opened_at)).total_seconds()
+        return max(0, self.open_seconds - elapsed)
+
+    def allow(self):
+        """True si une tentative est autorisée (fermé ou semi-ouvert après le délai)"""
+        return self.remaining_open_seconds() == 0
+
+    def record_success(self):
+        """Refermer le disjoncteur après un succès"""
+        state = self._load()
+        if state.get('failures') or state.get('opened_at'):
+            self.logger.info("Disjoncteur refermé: serveur Satelix de nouveau joignable")
+            self._save({'failures': 0, 'opened_at': None})
+
+    def record_failure(self):
+        """Comptabiliser un échec et ouvrir le disjoncteur au-delà du seuil"""
+        state = self._load()
+        state['failures'] = state.get('failures', 0) + 1
+        if state['failures'] >= self.failure_threshold:
+            state['opened_at'] = datetime.now().isoformat(timespec='seconds')
+            self.logger.error("Disjoncteur ouvert après %d échec(s): pas de nouvelle tentative avant %d s",
+                              state['failures'], self.open_seconds)
+        self._save(state)
+
+
+class StepRunner:
+    """Exécute les étapes selon leur politique, dans un budget de temps global"""
+
+    def __init__(self, breaker=None, max_run_seconds=600):
+        """Initialisation avec un disjoncteur optionnel et la durée maximale d'exécution"""
+        self.breaker = breaker
+        self.max_run_seconds = max_run_seconds
+        self.started = time.monotonic()
+        self.logger = logging.getLogger(__name__)
+
+    def remaining_seconds(self):
+        """Temps restant dans le budget de l'exécution"""
+        return self.max_run_seconds - (time.monotonic() - self.started)
+
+    def run_step(self, step_name, step_func, policy=None):
+        """Exécuter une étape; retourne True si elle a abouti"""
+        policy = policy or StepPolicy()
+        attempt = 0
+
+        while True:
+            try:
+                success = step_func()
+            except Exception as e:
+                self.logger.error("Exception à l'étape %s: %s", step_name, str(e))
+                success = False
+
+            if success:
+                if policy.trips_breaker and self.breaker:
+                    self.breaker.record_success()
+                return True
+
+            attempt += 1
+            if attempt > policy.retries:
+                break
+
+            delay = policy.delay(attempt)
+            if self.remaining_seconds() < delay:
+                self.logger.error("Budget de temps épuisé, abandon de l'étape: %s", step_name)
+                break
+
+            if policy.trips_breaker and self.breaker and not self.breaker.allow():
+                break
+
+            self.logger.warning("Échec de l'étape %s, nouvelle tentative %d/%d dans %.1fs",
+                                step_name, attempt, policy.retries, delay)
+            time.sleep(delay)
+
+            if policy.recover:
+                try:
+                    policy.recover()
+                except Exception as e:
+                    self.logger.warning("Échec de la remise en état avant %s: %s", step_name, str(e))
+
+            # Étape non idempotente: ne la rejouer que si son effet n'est pas déjà acquis
+            if not policy.idempotent:
+                if policy.already_done is None:
+                    self.logger.error("Étape %s non rejouable sans contrôle d'idempotence", step_name)
+                    break
+                try:
+                    if policy.already_done():
+                        self.logger.info("Étape %s déjà effective, pas de nouvelle tentative", step_name)
+                        return True
+                except Exception as e:
+                    self.logger.warning("Contrôle d'idempotence impossible pour %s: %s", step_name, str(e))
+                    break
+
+        if policy.trips_breaker and self.breaker:
+            self.breaker.record_failure()
+        return False
@@ -75,12 +75,12 @@ fi
 echo "[*] Copie des fichiers..."
 # Ces fichiers doivent être copiés manuellement ou via SCP
 if [ -f "./satelix_simple.py" ]; then
-    cp ./satelix_simple.py "$INSTALL_DIR/"
+    cp ./*.py "$INSTALL_DIR/"
     cp ./requirements_portable.txt "$INSTALL_DIR/"
     chown "$SERVICE_USER:$SERVICE_USER" "$INSTALL_DIR"/*
 else
     echo "[!] Fichiers manquants. Copiez manuellement:"
-    echo "    - satelix_simple.py"
+    echo "    - satelix_simple.py (et les modules *.py associés)"
     echo "    - requirements_portable.txt"
     echo "    vers $INSTALL_DIR/"
 fi
@@ -111,6 +111,11 @@ SATELIX_PASSWORD=Crispin2025*
 # Configuration serveur
 HEADLESS=true
 TIMEOUT=30
+LOW_MEMORY=true
+
+# Service de planification intégré (python3 satelix_simple.py --serve)
+SCHEDULE_TIME=08:00
+SCHEDULE_DAYS=MON,TUE,WED,THU,FRI
 EOF
 
 chown "$SERVICE_USER:$SERVICE_USER" "$INSTALL_DIR/.env"
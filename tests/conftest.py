@@ -0,0 +1,39 @@
+"""
+Exécutions complètes du parcours sur le site Satelix factice (app/fake_driver.py)
+Chaque test travaille dans un dossier temporaire (logs/, points de reprise, parcours
+enregistré) avec une horloge virtuelle: aucune attente réelle ni accès réseau
+"""
+
+import sys
+import logging
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'app'))
+
+from fake_driver import FAKE_ENV, FakeSatelixServer, VirtualClock  # noqa: E402
+
+
+@pytest.fixture
+def satelix(tmp_path, monkeypatch, caplog):
+    """Serveur factice partagé par les exécutions du test"""
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'logs').mkdir()
+    for name, value in FAKE_ENV.items():
+        monkeypatch.setenv(name, value)
+    monkeypatch.setenv('OFFLINE_QUEUE', 'false')
+    caplog.set_level(logging.INFO)
+    with VirtualClock():
+        yield FakeSatelixServer()
+
+
+@pytest.fixture
+def run(satelix):
+    """Lancer une exécution sur le serveur factice; retourne le code de sortie"""
+    updater_class = satelix.updater_class()
+
+    def run_updater(target_date, **kwargs):
+        return updater_class(target_date).run(**kwargs)
+
+    return run_updater
@@ -0,0 +1,134 @@
+"""Parcours de création et de mise à jour groupée sur le site Satelix factice"""
+
+import json
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from run_state import RunState
+from satelix_simple import SatelixInventoryDateUpdater
+
+
+TARGET = datetime(2026, 3, 10)
+TARGET_STR = '10/03/2026'
+REPLAY_FILE = Path('logs') / 'replay' / 'create_inventory.json'
+
+# En-tête sans indicateur de tri (classe "description") et premières lignes décroissantes par hasard
+UNSORTED_DATES = ['20/03/2026', '19/03/2026', '01/01/2026', TARGET_STR, '15/02/2026']
+
+
+def write_checkpoint(target_date, current, completed, prefix='inventaire'):
+    path = Path('logs') / 'checkpoints' / f"{prefix}_{target_date.strftime('%Y-%m-%d')}.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps({'target_date': target_date.strftime('%d/%m/%Y'), 'current': current,
+                                'completed': completed, 'values': {}, 'updated_at': None}), encoding='utf-8')
+
+
+def test_creation_inventaire(satelix, run):
+    assert run(TARGET) == 0
+    assert satelix.created == 1
+    assert satelix.inventory_dates()[0] == TARGET_STR
+    assert REPLAY_FILE.exists()
+
+
+def test_execution_terminee_non_rejouee(satelix, run, caplog):
+    assert run(TARGET) == 0
+    assert run(TARGET) == 0
+    assert satelix.created == 1
+    assert "DÉJÀ TRAITÉ" in caplog.text
+
+
+def test_rejeu_du_parcours_enregistre(satelix, run, caplog):
+    assert run(datetime(2026, 3, 9)) == 0
+    assert run(TARGET) == 0
+    assert satelix.created == 2
+    assert "Nouvel inventaire créé par rejeu" in caplog.text
+    assert satelix.inventory_dates()[:2] == [TARGET_STR, '09/03/2026']
+
+
+def test_echec_du_rejeu_apres_enregistrement_sans_doublon(satelix, run, caplog):
+    assert run(datetime(2026, 3, 9)) == 0
+    # Le rejeu échoue après le clic sur "Ajouter": l'inventaire est déjà enregistré
+    script = json.loads(REPLAY_FILE.read_text(encoding='utf-8'))
+    script['steps'].append({'action': 'click', 'locator': '#introuvable', 'tag': 'button'})
+    REPLAY_FILE.write_text(json.dumps(script), encoding='utf-8')
+
+    assert run(TARGET) == 0
+    assert satelix.created == 2
+    assert satelix.inventory_dates().count(TARGET_STR) == 1
+    assert "Inventaire enregistré malgré l'échec du rejeu" in caplog.text
+
+
+def test_echec_du_rejeu_avant_enregistrement_decouverte(satelix, run, caplog):
+    assert run(datetime(2026, 3, 9)) == 0
+    script = json.loads(REPLAY_FILE.read_text(encoding='utf-8'))
+    script['steps'][0]['locator'] = '#introuvable'
+    REPLAY_FILE.write_text(json.dumps(script), encoding='utf-8')
+
+    assert run(TARGET) == 0
+    assert satelix.created == 2
+    assert satelix.inventory_dates().count(TARGET_STR) == 1
+    assert "Rejeu interrompu, retour à la découverte" in caplog.text
+
+
+def test_recherche_par_date_liste_non_triee(satelix):
+    satelix.set_inventories(UNSORTED_DATES, sort_attrs={'class': 'description'})
+    updater = SatelixInventoryDateUpdater(TARGET)
+    updater.driver = satelix.driver()
+    updater.driver.get(updater.inventaires_url)
+
+    record = updater.find_inventory_by_date(TARGET_STR)
+    assert record is not None and record.date_str == TARGET_STR
+
+
+def test_recherche_par_date_liste_triee(satelix):
+    satelix.set_inventories(['20/03/2026', '01/01/2026', TARGET_STR])
+    updater = SatelixInventoryDateUpdater(TARGET)
+    updater.driver = satelix.driver()
+    updater.driver.get(updater.inventaires_url)
+
+    # Tri décroissant confirmé par aria-sort: lecture arrêtée à la première date plus ancienne
+    assert updater.find_inventory_by_date(TARGET_STR) is None
+    assert updater.find_inventory_by_date('20/03/2026') is not None
+
+
+def test_reprise_apres_interruption_pendant_la_creation(satelix, run, caplog):
+    # L'exécution précédente a enregistré l'inventaire puis s'est arrêtée dans l'état CREATE
+    satelix.set_inventories(UNSORTED_DATES, sort_attrs={'class': 'description'})
+    write_checkpoint(TARGET, RunState.CREATE,
+                     [RunState.VALIDATE, RunState.DRIVER, RunState.LOGIN, RunState.NAVIGATE, RunState.SCAN])
+
+    assert run(TARGET) == 0
+    assert satelix.created == 0
+    assert "présent après interruption, création ignorée" in caplog.text
+
+
+def test_reprise_apres_creation_terminee(satelix, run, caplog):
+    satelix.set_inventories([TARGET_STR, '15/02/2026'])
+    write_checkpoint(TARGET, RunState.VERIFY, [RunState.VALIDATE, RunState.DRIVER, RunState.LOGIN,
+                                               RunState.NAVIGATE, RunState.SCAN, RunState.CREATE])
+
+    assert run(TARGET) == 0
+    assert satelix.created == 0
+    assert "reprise à l'état: verify" in caplog.text
+
+
+def test_selections_groupees_independantes(satelix, run, caplog):
+    today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    target = today + timedelta(days=1)
+    target_str = target.strftime('%d/%m/%Y')
+    recent, older, oldest = (today - timedelta(days=days) for days in (2, 10, 40))
+    satelix.set_inventories([day.strftime('%d/%m/%Y') for day in (recent, older, oldest)])
+
+    assert run(target, days_range=5) == 0
+    assert satelix.inventory_dates() == [target_str, older.strftime('%d/%m/%Y'), oldest.strftime('%d/%m/%Y')]
+
+    # Même sélection: déjà traitée
+    assert run(target, days_range=5) == 0
+    assert "DÉJÀ TRAITÉ" in caplog.text
+
+    # Autre sélection vers la même date: traitée entièrement
+    caplog.clear()
+    assert run(target, update_all=True) == 0
+    assert "DÉJÀ TRAITÉ" not in caplog.text
+    assert satelix.inventory_dates() == [target_str] * 3
+    assert satelix.created == 0